@@ -1,6 +1,10 @@
-from .utils import get_algorithm_by_path, points_to_df, runMethod
+from .utils import get_algorithm_by_path, clear_algorithm_cache, set_algorithm_cache_size, points_to_df, runMethod
 # from .industry_model import industry_model, get_parameter_df, get_vector_df
 from .model import Model
+from .scheduler import ProcedureScheduler
+from .executor import ProcessExecutor
+from .telemetry import telemetry
 from .tree_base import TreeBase
+from .flat_tree import FlatTreeBase
 from .node_base import NodeBase
 from .model_2 import ModelLib
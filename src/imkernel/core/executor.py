@@ -0,0 +1,241 @@
+"""
+进程池执行器
+
+算法在子进程中运行，不受主进程GIL限制。较大的NumPy数组通过 multiprocessing.shared_memory 传递：
+输入数组写入共享内存后子进程直接映射使用，输出数组由子进程写入共享内存，主进程读取后释放，不经过pickle管道。
+"""
+import atexit
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Iterable, List, Optional, Union
+
+import numpy as np
+
+from .utils import get_algorithm_by_path
+
+
+class _SharedArray:
+    """
+    共享内存中数组的引用（代替数组本身被pickle）
+    """
+
+    __slots__ = ("name", "shape", "dtype")
+
+    def __init__(self, name: str, shape: tuple, dtype: str):
+        self.name = name
+        self.shape = shape
+        self.dtype = dtype
+
+    def __getstate__(self):
+        return self.name, self.shape, self.dtype
+
+    def __setstate__(self, state):
+        self.name, self.shape, self.dtype = state
+
+
+def _pack(obj, threshold: int, segments: List[SharedMemory]):
+    """
+    将对象中不小于阈值的数值数组拷贝到共享内存，替换为引用
+    :param segments: 新建的共享内存，由调用方负责关闭
+    """
+    if isinstance(obj, np.ndarray) and obj.dtype.kind in "biufc" and obj.nbytes >= threshold:
+        shm = SharedMemory(create=True, size=obj.nbytes)
+        segments.append(shm)
+        view = np.ndarray(obj.shape, dtype=obj.dtype, buffer=shm.buf)
+        view[...] = obj
+        del view
+        return _SharedArray(shm.name, obj.shape, obj.dtype.str)
+    if isinstance(obj, np.ndarray) and not obj.flags.owndata:
+        # 视图可能指向共享内存，拷贝后再传递
+        return obj.copy()
+    if isinstance(obj, list):
+        return [_pack(item, threshold, segments) for item in obj]
+    if isinstance(obj, tuple):
+        return tuple(_pack(item, threshold, segments) for item in obj)
+    if isinstance(obj, dict):
+        return {k: _pack(v, threshold, segments) for k, v in obj.items()}
+    return obj
+
+
+def _unpack(obj, segments: List[SharedMemory], copy: bool):
+    """
+    将引用还原为数组
+    :param segments: 映射的共享内存，由调用方负责关闭
+    :param copy: 是否拷贝出共享内存（为False时返回直接映射共享内存的数组）
+    """
+    if isinstance(obj, _SharedArray):
+        shm = SharedMemory(name=obj.name)
+        segments.append(shm)
+        array = np.ndarray(obj.shape, dtype=np.dtype(obj.dtype), buffer=shm.buf)
+        return array.copy() if copy else array
+    if isinstance(obj, list):
+        return [_unpack(item, segments, copy) for item in obj]
+    if isinstance(obj, tuple):
+        return tuple(_unpack(item, segments, copy) for item in obj)
+    if isinstance(obj, dict):
+        return {k: _unpack(v, segments, copy) for k, v in obj.items()}
+    return obj
+
+
+def _close(segments: List[SharedMemory], unlink: bool = False) -> None:
+    for shm in segments:
+        try:
+            shm.close()
+        except BufferError:
+            # 算法仍持有映射的数组，映射随进程结束释放
+            pass
+        if unlink:
+            try:
+                shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _execute(method_body: str, method_name: str, packed_args: tuple, threshold: int):
+    """
+    子进程任务：映射输入、运行算法，并把输出中的大数组写入共享内存
+    """
+    function = get_algorithm_by_path(method_body, method_name)
+    if not function:
+        raise Exception(f"未能导入{method_name}")
+    attached: List[SharedMemory] = []
+    created: List[SharedMemory] = []
+    try:
+        func_result = function(*_unpack(packed_args, attached, copy=False))
+        packed_result = _pack(func_result, threshold, created)
+        del func_result
+        return packed_result
+    except BaseException:
+        _close(created, unlink=True)
+        created = []
+        raise
+    finally:
+        _close(attached)
+        # 输出由主进程读取后释放，这里只关闭本进程的映射
+        _close(created)
+
+
+class ProcessExecutor:
+    """
+    在进程池中运行算法
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, shared_memory_threshold: int = 1 << 20, mp_context=None):
+        """
+        :param max_workers: 进程数，默认为CPU核数
+        :param shared_memory_threshold: 数值数组字节数不小于该值时通过共享内存传递
+        :param mp_context: multiprocessing 上下文
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.shared_memory_threshold = shared_memory_threshold
+        # 子进程与主进程共用资源跟踪进程，共享内存的登记与注销才能对应
+        resource_tracker.ensure_running()
+        self._pool = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=mp_context)
+
+    def _submit(self, method_body: str, method_name: str, args: Iterable):
+        segments: List[SharedMemory] = []
+        try:
+            packed_args = _pack(tuple(args), self.shared_memory_threshold, segments)
+            return self._pool.submit(_execute, method_body, method_name, packed_args, self.shared_memory_threshold), segments
+        except BaseException:
+            _close(segments, unlink=True)
+            raise
+
+    @staticmethod
+    def _result(future, segments: List[SharedMemory]):
+        try:
+            packed_result = future.result()
+        finally:
+            _close(segments, unlink=True)
+        result_segments: List[SharedMemory] = []
+        try:
+            return _unpack(packed_result, result_segments, copy=True)
+        finally:
+            _close(result_segments, unlink=True)
+
+    def run(self, method_body: str, method_name: str, args: Iterable) -> Any:
+        """
+        在子进程中运行一次算法
+        :param method_body: 算法文件路径
+        :param method_name: 算法函数名
+        :param args: 位置参数
+        :return: 算法返回值
+        """
+        return self._result(*self._submit(method_body, method_name, args))
+
+    def map(self, method_body: str, method_name: str, args_list: Iterable[Iterable]) -> list:
+        """
+        以多组参数运行算法，同时提交的任务数不超过进程数的两倍，以限制共享内存占用
+        :param method_body: 算法文件路径
+        :param method_name: 算法函数名
+        :param args_list: 每次运行的位置参数
+        :return: 与 args_list 一一对应的算法返回值
+        """
+        results = []
+        running = deque()
+        try:
+            for args in args_list:
+                if len(running) >= self.max_workers * 2:
+                    results.append(self._result(*running.popleft()))
+                running.append(self._submit(method_body, method_name, args))
+            while running:
+                results.append(self._result(*running.popleft()))
+        finally:
+            # 出错时等待已提交的任务结束并释放共享内存
+            while running:
+                future, segments = running.popleft()
+                try:
+                    self._result(future, segments)
+                except BaseException:
+                    pass
+        return results
+
+    def bind(self, method_body: str, method_name: str):
+        """
+        返回在子进程中运行该算法的函数，调用方式与算法函数相同
+        """
+
+        def function(*args):
+            return self.run(method_body, method_name, args)
+
+        return function
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
+
+
+_default_executor: Optional[ProcessExecutor] = None
+_default_executor_lock = threading.Lock()
+
+
+def get_process_executor() -> ProcessExecutor:
+    """
+    获取默认的进程池执行器（首次使用时创建，进程退出时关闭）
+    """
+    global _default_executor
+    with _default_executor_lock:
+        if _default_executor is None:
+            _default_executor = ProcessExecutor()
+            atexit.register(_default_executor.shutdown)
+        return _default_executor
+
+
+def resolve_executor(executor: Optional[Union[str, ProcessExecutor]]) -> Optional[ProcessExecutor]:
+    """
+    将 executor 参数转换为执行器：None 表示在当前进程中运行，"process" 表示默认进程池
+    """
+    if executor is None or isinstance(executor, ProcessExecutor):
+        return executor
+    if executor == "process":
+        return get_process_executor()
+    raise ValueError(f"不支持的执行方式{executor}")
@@ -0,0 +1,292 @@
+"""
+数组存储的树
+
+与 TreeBase 接口相同（create_node、remove_node、find_node_by_id、print_id、print_desc、iter_tree_lines、write_tree），
+树结构保存在 parent / first_child / last_child / next_sibling / prev_sibling 整数数组中（-1 表示无），
+节点ID通过字典映射到数组下标。删除、遍历、打印均为迭代实现，不受递归深度限制（打印与 TreeBase 共用 TreePrintMixin）；
+父节点查询为常数时间，子树查询对整个数组向量化计算，整棵树可导出为数组保存。
+树结构只记录在数组中，不维护节点对象的 parent / children 属性。
+"""
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from .node_base import NodeBase
+from .tree_base import TreePrintMixin
+
+_NONE = -1
+_LINKS = ("parent", "first_child", "last_child", "next_sibling", "prev_sibling")
+
+
+class FlatTreeBase(TreePrintMixin):
+    def __init__(self, capacity: int = 1024):
+        """
+        :param capacity: 数组初始容量，节点数超过时自动扩容
+        """
+        self.roots: dict[str, NodeBase] = {}  # 用于存储森林中的根节点
+        self.nodes: dict[str, NodeBase] = {}  # 用于存储所有节点
+        self._index: Dict[str, int] = {}  # 节点ID -> 数组下标
+        self._node_list: List[Optional[NodeBase]] = []  # 数组下标 -> 节点
+        self._free: List[int] = []  # 已删除节点空出的下标
+        capacity = max(int(capacity), 1)
+        for name in _LINKS:
+            setattr(self, name, np.full(capacity, _NONE, dtype=np.int64))
+        self.alive = np.zeros(capacity, dtype=bool)
+
+    # region 存储
+    def _grow(self, size: int) -> None:
+        capacity = len(self.parent)
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        for name in _LINKS:
+            array = np.full(capacity, _NONE, dtype=np.int64)
+            old = getattr(self, name)
+            array[:len(old)] = old
+            setattr(self, name, array)
+        alive = np.zeros(capacity, dtype=bool)
+        alive[:len(self.alive)] = self.alive
+        self.alive = alive
+
+    def _allocate(self, node: NodeBase) -> int:
+        if self._free:
+            index = self._free.pop()
+            self._node_list[index] = node
+        else:
+            index = len(self._node_list)
+            self._grow(index + 1)
+            self._node_list.append(node)
+        self.alive[index] = True
+        return index
+
+    def index_of(self, node_id: str) -> int:
+        """
+        节点在数组中的下标
+        """
+        index = self._index.get(node_id)
+        if index is None:
+            raise KeyError(f"未找到名为{node_id}的节点")
+        return index
+
+    # endregion
+
+    # region 增删查
+    def create_node(self, node: NodeBase, parent_id: str = None) -> None:
+        if node.id in self._index:
+            raise ValueError(f"节点 {node.id} 已存在")
+        # 如果没有 parent_id，则该节点是根节点
+        if parent_id is None:
+            parent_index = _NONE
+        else:
+            parent_index = self._index.get(parent_id)
+            if parent_index is None:
+                raise ValueError(f"根节点 {parent_id} 未找到")
+
+        index = self._allocate(node)
+        self.parent[index] = parent_index
+        if parent_index == _NONE:
+            self.roots[node.id] = node
+        else:
+            # 追加为父节点的最后一个子节点
+            last = self.last_child[parent_index]
+            if last == _NONE:
+                self.first_child[parent_index] = index
+            else:
+                self.next_sibling[last] = index
+                self.prev_sibling[index] = last
+            self.last_child[parent_index] = index
+
+        # 添加到节点字典中
+        self._index[node.id] = index
+        self.nodes[node.id] = node
+
+    def remove_node(self, node: NodeBase) -> None:
+        """
+        删除节点及其所有子孙节点
+        """
+        index = self._index.get(node.id)
+        if index is None:
+            raise Exception(f"未找到名为{node.id}的节点")
+
+        # 从兄弟链表中摘除
+        parent_index = self.parent[index]
+        prev, next_ = self.prev_sibling[index], self.next_sibling[index]
+        if prev != _NONE:
+            self.next_sibling[prev] = next_
+        elif parent_index != _NONE:
+            self.first_child[parent_index] = next_
+        if next_ != _NONE:
+            self.prev_sibling[next_] = prev
+        elif parent_index != _NONE:
+            self.last_child[parent_index] = prev
+        if parent_index == _NONE:
+            del self.roots[node.id]
+
+        removed = list(self._iter_subtree(index))
+        for i in removed:
+            node_id = self._node_list[i].id
+            del self._index[node_id]
+            del self.nodes[node_id]
+            self._node_list[i] = None
+        removed = np.asarray(removed, dtype=np.int64)
+        for name in _LINKS:
+            getattr(self, name)[removed] = _NONE
+        self.alive[removed] = False
+        self._free.extend(removed.tolist())
+
+    def find_node_by_id(self, node_id) -> Optional[NodeBase]:
+        return self.nodes.get(node_id)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    # endregion
+
+    # region 结构查询
+    def _iter_children(self, index: int) -> Iterator[int]:
+        child = self.first_child[index]
+        while child != _NONE:
+            yield int(child)
+            child = self.next_sibling[child]
+
+    def _iter_subtree(self, index: int) -> Iterator[int]:
+        """
+        先序遍历子树（含自身）的下标
+        """
+        stack = [index]
+        while stack:
+            current = stack.pop()
+            yield current
+            # 子节点逆序入栈，保证按兄弟顺序出栈
+            child = self.last_child[current]
+            while child != _NONE:
+                stack.append(int(child))
+                child = self.prev_sibling[child]
+
+    def _root_indices(self) -> List[int]:
+        return [self._index[root_id] for root_id in self.roots]
+
+    def get_parent(self, node_id: str) -> Optional[NodeBase]:
+        """
+        父节点，根节点返回None
+        """
+        parent_index = self.parent[self.index_of(node_id)]
+        return None if parent_index == _NONE else self._node_list[parent_index]
+
+    def get_children(self, node_id: str) -> List[NodeBase]:
+        """
+        按添加顺序返回子节点
+        """
+        return [self._node_list[i] for i in self._iter_children(self.index_of(node_id))]
+
+    def walk(self, node_id: Optional[str] = None) -> Iterator[NodeBase]:
+        """
+        先序遍历节点
+        :param node_id: 子树根节点ID，None时依次遍历所有根节点
+        """
+        starts = self._root_indices() if node_id is None else [self.index_of(node_id)]
+        for start in starts:
+            for i in self._iter_subtree(start):
+                yield self._node_list[i]
+
+    def subtree_mask(self, node_ids) -> np.ndarray:
+        """
+        向量化计算子树成员：返回长度为数组容量的布尔数组，下标位于任一指定节点子树（含自身）中时为True。
+        通过父指针倍增计算，耗时 O(n·log(深度))。
+        :param node_ids: 节点ID或节点ID列表
+        """
+        if isinstance(node_ids, str):
+            node_ids = [node_ids]
+        mask = np.zeros(len(self.parent), dtype=bool)
+        mask[[self.index_of(i) for i in node_ids]] = True
+        up = self.parent.copy()
+        while True:
+            has_up = up != _NONE
+            if not has_up.any():
+                break
+            # mask[i] 覆盖距离 [0, 2^k) 的祖先，up[i] 为距离 2^k 的祖先
+            mask[has_up] |= mask[up[has_up]]
+            up[has_up] = up[up[has_up]]
+        return mask & self.alive
+
+    def descendants(self, node_id: str, include_self: bool = False) -> List[NodeBase]:
+        """
+        子孙节点（按数组下标顺序）
+        :param node_id: 节点ID
+        :param include_self: 是否包含节点自身
+        """
+        mask = self.subtree_mask(node_id)
+        if not include_self:
+            mask[self.index_of(node_id)] = False
+        return [self._node_list[i] for i in np.flatnonzero(mask)]
+
+    def depths(self) -> np.ndarray:
+        """
+        向量化计算每个下标的深度（根节点为0，已删除的下标为-1）
+        """
+        depth = (self.parent != _NONE).astype(np.int64)
+        up = self.parent.copy()
+        while True:
+            has_up = up != _NONE
+            if not has_up.any():
+                break
+            depth[has_up] += depth[up[has_up]]
+            up[has_up] = up[up[has_up]]
+        depth[~self.alive] = _NONE
+        return depth
+
+    # endregion
+
+    # region 数组导出
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """
+        按先序导出整棵树，可直接用 np.savez 保存
+        :return: id（节点ID）、desc（描述，None 保存为空字符串）、has_desc（描述是否为None之外的值）、parent（父节点在导出数组中的位置，根节点为-1）
+        """
+        order = [i for start in self._root_indices() for i in self._iter_subtree(start)]
+        position = np.full(len(self.parent), _NONE, dtype=np.int64)
+        position[order] = np.arange(len(order))
+        parent = self.parent[order]
+        parent = np.where(parent == _NONE, _NONE, position[np.maximum(parent, 0)])
+        nodes = [self._node_list[i] for i in order]
+        return {
+            "id": np.array([n.id for n in nodes], dtype=str),
+            "desc": np.array(["" if n.desc is None else n.desc for n in nodes], dtype=str),
+            "has_desc": np.array([n.desc is not None for n in nodes], dtype=bool),
+            "parent": parent,
+        }
+
+    @classmethod
+    def from_arrays(cls, arrays, node_factory: Callable[..., NodeBase] = NodeBase) -> "FlatTreeBase":
+        """
+        由 to_arrays 导出的数组重建树
+        :param arrays: to_arrays 的返回值或 np.load 读取的文件
+        :param node_factory: 以 (id, desc) 创建节点
+        """
+        ids = arrays["id"]
+        parent = np.asarray(arrays["parent"], dtype=np.int64)
+        descs = arrays["desc"] if "desc" in arrays else None
+        has_desc = arrays["has_desc"] if "has_desc" in arrays else None
+        tree = cls(capacity=len(ids))
+        for i, node_id in enumerate(ids.tolist()):
+            desc = None
+            if descs is not None and (has_desc is None or has_desc[i]):
+                desc = str(descs[i])
+            parent_index = parent[i]
+            tree.create_node(node_factory(node_id, desc), None if parent_index == _NONE else str(ids[parent_index]))
+        return tree
+
+    # endregion
+
+    # region 打印
+    def _line_roots(self, root_id: Optional[str]) -> List[int]:
+        return self._root_indices() if root_id is None else [self.index_of(root_id)]
+
+    def _line_node(self, handle: int) -> NodeBase:
+        return self._node_list[handle]
+
+    def _line_children(self, handle: int) -> List[int]:
+        return list(self._iter_children(handle))
+
+    # endregion
@@ -0,0 +1,239 @@
+"""
+模型变更日志
+
+快照之后的修改以追加方式写入 journal-{代}.log，每条记录为 (模型名, 方法名, 位置参数, 关键字参数)，
+加载快照时按代号顺序重放代号不小于快照代号的日志；压缩时把当前模型写成新一代快照并切换到新的日志文件。
+记录格式为 4 字节长度 + pickle 数据，进程中断导致的末尾残缺记录在读取和续写时丢弃。
+"""
+import functools
+import logging
+import os
+import pickle
+import struct
+import threading
+from pathlib import Path
+from typing import Iterator, Optional, Tuple, Union
+
+from .snapshot import JOURNAL_FILE, MANIFEST_FILE, commit_snapshot, list_journal_generations, next_generation, prepare_snapshot, read_manifest
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct("<I")
+
+# 当前线程是否正在执行被记录的操作（嵌套调用及重放时不重复记录）
+_state = threading.local()
+
+
+def _is_suspended() -> bool:
+    return getattr(_state, "suspended", False)
+
+
+class _Suspend:
+    """
+    在当前线程中暂停记录
+    """
+
+    def __enter__(self):
+        self.previous = _is_suspended()
+        _state.suspended = True
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        _state.suspended = self.previous
+
+
+def journaled(func):
+    """
+    装饰模型的修改方法：执行成功后把调用写入模型的变更日志。
+    参数在修改前序列化（无法序列化时不修改模型），修改与写入在日志锁内完成，
+    压缩不会在两者之间收集模型状态，修改后的模型不会与同一条记录同时进入新一代快照和新一代日志。
+    """
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        journal = self.journal
+        if journal is None or _is_suspended():
+            return func(self, *args, **kwargs)
+        payload = journal.encode(self.model_type.value.lower(), func.__name__, args, kwargs)
+        with journal.lock:
+            with _Suspend():
+                result = func(self, *args, **kwargs)
+            journal.write(payload)
+        return result
+
+    return wrapper
+
+
+def segment_path(path: Union[str, os.PathLike], generation: int) -> Path:
+    return Path(path) / JOURNAL_FILE.format(generation=generation)
+
+
+def _iter_segment(file_path: Path) -> Iterator[Tuple[int, tuple]]:
+    """
+    逐条读取日志文件
+    :return: (该条记录结束位置, 记录) 的迭代器，遇到残缺记录时停止
+    """
+    with file_path.open("rb") as f:
+        while True:
+            header = f.read(_HEADER.size)
+            if len(header) < _HEADER.size:
+                return
+            length = _HEADER.unpack(header)[0]
+            payload = f.read(length)
+            if len(payload) < length:
+                return
+            try:
+                record = pickle.loads(payload)
+            except Exception:
+                return
+            yield f.tell(), record
+
+
+class ModelJournal:
+    """
+    追加写入的变更日志
+    """
+
+    def __init__(self, path: Union[str, os.PathLike], generation: int, fsync: bool = False):
+        """
+        :param path: 快照目录
+        :param generation: 日志代号
+        :param fsync: 每条记录后是否同步到磁盘（默认只刷新到操作系统缓冲区）
+        """
+        self.path = Path(path)
+        self.generation = generation
+        self.fsync = fsync
+        self.lock = threading.RLock()
+        self._file = None
+        self._open(generation)
+
+    def _open(self, generation: int) -> None:
+        file_path = segment_path(self.path, generation)
+        if file_path.exists():
+            # 截掉末尾残缺的记录，保证续写的记录可以被读取
+            valid_length = 0
+            for valid_length, _ in _iter_segment(file_path):
+                pass
+            if valid_length != file_path.stat().st_size:
+                with file_path.open("r+b") as f:
+                    f.truncate(valid_length)
+        self._file = file_path.open("ab")
+        self.generation = generation
+
+    @staticmethod
+    def encode(model_name: str, op: str, args: tuple, kwargs: dict) -> bytes:
+        """
+        序列化一条记录
+        :param model_name: element / method / procedure
+        :param op: 方法名
+        :param args: 位置参数
+        :param kwargs: 关键字参数
+        """
+        return pickle.dumps((model_name, op, args, kwargs), protocol=pickle.HIGHEST_PROTOCOL)
+
+    def record(self, model_name: str, op: str, args: tuple, kwargs: dict) -> None:
+        """
+        写入一条记录
+        :param model_name: element / method / procedure
+        :param op: 方法名
+        :param args: 位置参数
+        :param kwargs: 关键字参数
+        """
+        self.write(self.encode(model_name, op, args, kwargs))
+
+    def write(self, payload: bytes) -> None:
+        """
+        写入一条已序列化的记录
+        """
+        with self.lock:
+            if self._file is None:
+                raise ValueError("变更日志已关闭")
+            self._file.write(_HEADER.pack(len(payload)) + payload)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+    def rotate(self, generation: int) -> None:
+        """
+        切换到新一代日志文件
+        """
+        with self.lock:
+            self._file.close()
+            self._open(generation)
+
+    def close(self) -> None:
+        with self.lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def replay_journal(model, path: Union[str, os.PathLike]) -> int:
+    """
+    按顺序重放快照之后的变更日志。记录以 pickle 读取，可执行任意代码，只能重放可信目录中的日志
+    :param model: 已从快照恢复的 Model
+    :param path: 快照目录
+    :return: 重放的记录条数
+    """
+    generation = read_manifest(path).get("generation", 0)
+    count = 0
+    with _Suspend():
+        for journal_generation in list_journal_generations(path):
+            if journal_generation < generation:
+                continue
+            for _, (model_name, op, args, kwargs) in _iter_segment(segment_path(path, journal_generation)):
+                getattr(getattr(model, model_name), op)(*args, **kwargs)
+                count += 1
+    return count
+
+
+def open_journal(model, path: Union[str, os.PathLike], save: bool = True, fsync: bool = False) -> ModelJournal:
+    """
+    为模型打开变更日志
+    :param model: Model
+    :param path: 快照目录
+    :param save: 是否先保存一份新快照；为False时续写目录中最新的日志（用于刚从该目录加载的模型）
+    :param fsync: 每条记录后是否同步到磁盘
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    if save or not (path / MANIFEST_FILE).exists():
+        generation = next_generation(path)
+        commit_snapshot(*prepare_snapshot(model, path, generation))
+    else:
+        generation = read_manifest(path).get("generation", 0)
+        journals = list_journal_generations(path)
+        if journals:
+            generation = max(generation, journals[-1])
+    return ModelJournal(path, generation, fsync=fsync)
+
+
+def compact(model, journal: ModelJournal, background: bool = False) -> Optional[threading.Thread]:
+    """
+    把当前模型写为新一代快照，并切换到新一代日志；新快照提交后删除旧的快照文件与日志。
+    模型状态在调用线程中同步收集，background 为True时文件写入在后台线程中进行。
+    :param model: Model
+    :param journal: 模型当前使用的变更日志
+    :param background: 是否在后台线程中写入
+    :return: 后台写入线程，同步写入时返回None
+    """
+    with journal.lock:
+        generation = next_generation(journal.path, at_least=journal.generation + 1)
+        writer, manifest = prepare_snapshot(model, journal.path, generation)
+        if background:
+            writer.freeze()
+        # 新快照提交前中断时，旧快照加上新旧两代日志仍能恢复出完整模型
+        journal.rotate(generation)
+        if not background:
+            # 写入器引用的是模型中的对象，释放锁后的修改会同时进入快照与新日志，因此持锁提交
+            commit_snapshot(writer, manifest)
+            return None
+
+    def run():
+        try:
+            commit_snapshot(writer, manifest)
+        except Exception:
+            logger.exception(f"模型快照压缩失败：{journal.path}")
+
+    thread = threading.Thread(target=run, name="imkernel-compact")
+    thread.start()
+    return thread
@@ -1,16 +1,32 @@
+import asyncio
+import functools
 import json
 import os
+import sys
+from collections.abc import Mapping, MutableMapping
 from pathlib import Path
 
-from typing import Optional, Union, List, Dict, Any
+from typing import Optional, Union, List, Dict, Any, TextIO
 from abc import ABC, abstractmethod
+import numpy as np
 import pandas as pd
 import time
 import copy
+import threading
+from concurrent.futures import ThreadPoolExecutor
 
 from . import get_algorithm_by_path
 from .tree_base import TreeBase
 from .node_base import NodeBase
+from .parameter_store import ColumnarParameterData
+from .serializer import LazyList, dump_json, iter_json
+from .snapshot import save_model, load_model
+from .scheduler import ProcedureScheduler
+from .search_index import SearchIndex
+from .result_cache import ResultCache
+from .executor import ProcessExecutor, resolve_executor
+from .telemetry import RunTrace, telemetry
+from .journal import ModelJournal, journaled, open_journal, replay_journal, compact
 from enum import Enum
 
 from .utils import remove_empty_members
@@ -27,12 +43,167 @@ class ModelType(Enum):
     Procedure = "Procedure"
 
 
+class ParameterGroup(MutableMapping):
+    """
+    参数组：名称 group_name、参数 parameters 及参数数据 parameter_data。
+    使用 __slots__ 存储以减少大量节点时的内存占用，同时保留字典的访问方式（pg["group_name"]、"parameter_data" in pg），
+    未设置参数数据时 parameter_data 视为不存在的键。
+    """
+
+    __slots__ = ("_group_name", "parameters", "parameter_data")
+    _KEYS = ("group_name", "parameters", "parameter_data")
+    # 创建之后修改参数组名称的次数，ParameterGroupIndex 据此判断索引是否过期
+    renames = 0
+
+    def __init__(self, group_name: str, parameters=None, **kwargs):
+        """
+        :param group_name: 参数组名称
+        :param parameters: 参数组包含的参数
+        """
+        self._group_name = group_name
+        self.parameters = [] if parameters is None else parameters
+        if "parameter_data" in kwargs:
+            self.parameter_data = kwargs.pop("parameter_data")
+        if kwargs:
+            raise KeyError(f"参数组不支持字段{list(kwargs)}")
+
+    @property
+    def group_name(self) -> str:
+        return self._group_name
+
+    @group_name.setter
+    def group_name(self, value: str) -> None:
+        self._group_name = value
+        ParameterGroup.renames += 1
+
+    def __getitem__(self, key: str):
+        if key in self._KEYS:
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                pass
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value) -> None:
+        if key not in self._KEYS:
+            raise KeyError(f"参数组不支持字段{key}")
+        setattr(self, key, value)
+
+    def __delitem__(self, key: str) -> None:
+        if key != "parameter_data" or not hasattr(self, key):
+            raise KeyError(key)
+        del self.parameter_data
+
+    def __contains__(self, key) -> bool:
+        return key in self._KEYS and hasattr(self, key)
+
+    def __iter__(self):
+        return (key for key in self._KEYS if hasattr(self, key))
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"ParameterGroup({dict(self)!r})"
+
+
+def _count_change(name: str):
+    """
+    包装 list 的修改方法，调用前增加修改次数
+    """
+    method = getattr(list, name)
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self.version += 1
+        return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class ParameterGroupList(list):
+    """
+    节点上有序的参数组列表，记录修改次数（version），ParameterGroupIndex 据此判断索引是否过期
+    """
+
+    version = 0
+
+    __setitem__ = _count_change("__setitem__")
+    __delitem__ = _count_change("__delitem__")
+    __iadd__ = _count_change("__iadd__")
+    __imul__ = _count_change("__imul__")
+    append = _count_change("append")
+    extend = _count_change("extend")
+    insert = _count_change("insert")
+    pop = _count_change("pop")
+    remove = _count_change("remove")
+    clear = _count_change("clear")
+    sort = _count_change("sort")
+    reverse = _count_change("reverse")
+
+
+class ParameterGroupIndex:
+    """
+    参数组名称到参数组的索引，与节点上有序的参数组列表配合使用。
+    列表为 ParameterGroupList 时按其修改次数与参数组改名次数判断是否需要重建，
+    列表被替换、元素被替换或参数组改名后的第一次查询时重建；普通列表无法跟踪修改，每次查询都重建。
+    """
+
+    __slots__ = ("_groups", "_version", "_index")
+
+    def __init__(self):
+        self._groups: Optional[list] = None
+        self._version: Optional[tuple] = None
+        self._index: Dict[str, Any] = {}
+
+    @staticmethod
+    def _version_of(groups: list) -> Optional[tuple]:
+        if not isinstance(groups, ParameterGroupList):
+            return None
+        return groups.version, ParameterGroup.renames
+
+    def _sync(self, groups: list) -> None:
+        version = self._version_of(groups)
+        if groups is self._groups and version is not None and version == self._version:
+            return
+        index = {}
+        for group in groups:
+            # 同名参数组以第一个为准，与顺序查找的结果一致
+            index.setdefault(group["group_name"], group)
+        self._groups, self._version, self._index = groups, version, index
+
+    def find(self, groups: list, group_name: str):
+        """
+        按名称查找参数组
+        :param groups: 节点当前的参数组列表
+        :param group_name: 参数组名称
+        """
+        self._sync(groups)
+        return self._index.get(group_name)
+
+    def add(self, groups: list, group_name: str):
+        """
+        添加参数组，已存在时直接返回已有的参数组
+        :param groups: 节点当前的参数组列表
+        :param group_name: 参数组名称
+        """
+        group = self.find(groups, group_name)
+        if group is None:
+            group = ParameterGroup(group_name)
+            groups.append(group)
+            self._index[group_name] = group
+            self._version = self._version_of(groups)
+        return group
+
+
 class ElementNode(NodeBase):
     """
     单元对象，继承自NodeBase，增加了模型类型、标签标识和参数列表等属性。
     """
 
-    def __init__(self, model_type: ModelType, id: str, description: str = None, is_tag: bool = False) -> None:
+    __slots__ = ("model_type", "is_tag", "columnar", "parameter_list", "_parameter_group_index")
+
+    def __init__(self, model_type: ModelType, id: str, description: str = None, is_tag: bool = False, columnar: bool = False) -> None:
         """
         初始化 BaseSystemObject
 
@@ -40,21 +211,37 @@ class ElementNode(NodeBase):
         :param id: 标识符，继承自 NodeBase 的 identification。
         :param description: 描述，继承自 NodeBase 的 desc。
         :param is_tag: 是否为标签，默认值为 False。
+        :param columnar: 参数数据是否使用列式存储（ColumnarParameterData），默认值为 False。
         """
         super().__init__(identification=id, desc=description)
         self.model_type: ModelType = model_type  # 模型类型
         self.is_tag: bool = is_tag  # 是否为标签
-        # 列表中的每个元素是一个字典，字典的 key 表示参数组名称，value 是参数组包含的具体参数
-        self.parameter_list: List[Dict[str, List[str]]] = []
+        self.columnar: bool = columnar  # 是否使用列式参数数据
+        # 列表中的每个元素是一个参数组 ParameterGroup（参数组名称、包含的具体参数及参数数据）
+        self.parameter_list: List[ParameterGroup] = ParameterGroupList()
+        self._parameter_group_index = ParameterGroupIndex()
+
+    def create_parameter_data(self) -> Union[Dict[str, Any], ColumnarParameterData]:
+        """
+        创建空的参数数据容器
+        :return: 列式存储或 {str(data_index): data_list} 字典
+        """
+        return ColumnarParameterData() if self.columnar else {}
 
     def find_parameters_by_group(self, parameter_group_name):
-        # 遍历 parameter_list
-        for group in self.parameter_list:
-            # 检查 group_name 是否等于指定的 parameter_group_name
-            if group['group_name'] == parameter_group_name:
-                return group
-        # 如果找不到匹配的 group_name，返回 None
-        return None
+        """
+        按名称查找参数组，找不到时返回None
+        :param parameter_group_name: 参数组名称
+        """
+        return self._parameter_group_index.find(self.parameter_list, parameter_group_name)
+
+    def add_parameter_group(self, parameter_group_name: str):
+        """
+        添加参数组，已存在时不重复添加
+        :param parameter_group_name: 参数组名称
+        :return: 参数组
+        """
+        return self._parameter_group_index.add(self.parameter_list, parameter_group_name)
 
     def get_parameter_name_list(self):
         """
@@ -94,8 +281,10 @@ class ElementNode(NodeBase):
         combined_dict = {}
         for item in self.parameter_list:
             group_name = item['group_name']
-            parameter_data_dict: Dict = item['parameter_data']
-            data = parameter_data_dict.get(str(index))
+            parameter_data_dict: Mapping = item['parameter_data']
+            # 列式存储直接按整数索引取值，避免构造字符串键
+            key = index if isinstance(parameter_data_dict, ColumnarParameterData) else str(index)
+            data = parameter_data_dict.get(key)
             combined_dict[group_name] = data
 
         return combined_dict
@@ -113,19 +302,44 @@ class ElementNode(NodeBase):
             return
             # raise KeyError(f"{self.id}下没有{parameter_group_name}")
 
-        # 如果 pg['parameter_data'] 还不是字典，先初始化为空字典
+        # 如果 pg['parameter_data'] 还不是字典，先初始化为空容器
         if 'parameter_data' not in pg:
-            pg['parameter_data'] = {}
+            pg['parameter_data'] = self.create_parameter_data()
 
         # 根据 data_index 将 data_list 存储到字典中
         pg['parameter_data'][str(data_index)] = data_list
 
+    def set_parameter_data_many_by_group_name(self, parameter_group_name: str, data_indices, data_list_list):
+        """
+        批量增加参数数据
+        :param parameter_group_name:参数组名称
+        :param data_indices:data索引序列
+        :param data_list_list:与data索引一一对应的参数数据
+        """
+        pg = self.find_parameters_by_group(parameter_group_name)
+        if pg is None:
+            return
+
+        if 'parameter_data' not in pg:
+            pg['parameter_data'] = self.create_parameter_data()
+
+        parameter_data = pg['parameter_data']
+        if isinstance(parameter_data, ColumnarParameterData):
+            parameter_data.update_many(data_indices, data_list_list)
+        else:
+            if isinstance(data_list_list, np.ndarray):
+                data_list_list = data_list_list.tolist()
+            parameter_data.update(zip((str(i) for i in data_indices), data_list_list))
+
 
 class MethodNode(NodeBase):
     """
     方法对象，继承自NodeBase，增加了模型类型、标签标识和参数列表等属性。
     """
 
+    __slots__ = ("model_type", "is_tag", "program", "input_parameter_list", "output_parameter_list",
+                 "_input_group_index", "_output_group_index")
+
     def __init__(self, model_type: ModelType, id: str, description: str = None, is_tag: bool = False) -> None:
         """
         初始化 BaseSystemObject
@@ -139,9 +353,35 @@ class MethodNode(NodeBase):
         self.model_type: ModelType = model_type  # 模型类型
         self.is_tag: bool = is_tag  # 是否为标签
         self.program: list[str] = []
-        # 列表中的每个元素是一个字典，字典的 key 表示参数组名称，value 是参数组包含的具体参数
-        self.input_parameter_list: List[Dict[str, List[str]]] = []
-        self.output_parameter_list: List[Dict[str, List[str]]] = []
+        # 列表中的每个元素是一个参数组 ParameterGroup（参数组名称、包含的具体参数及参数数据）
+        self.input_parameter_list: List[ParameterGroup] = ParameterGroupList()
+        self.output_parameter_list: List[ParameterGroup] = ParameterGroupList()
+        self._input_group_index = ParameterGroupIndex()
+        self._output_group_index = ParameterGroupIndex()
+
+    def find_input_parameter_group(self, parameter_group_name: str):
+        """
+        按名称查找输入参数组，找不到时返回None
+        """
+        return self._input_group_index.find(self.input_parameter_list, parameter_group_name)
+
+    def find_output_parameter_group(self, parameter_group_name: str):
+        """
+        按名称查找输出参数组，找不到时返回None
+        """
+        return self._output_group_index.find(self.output_parameter_list, parameter_group_name)
+
+    def add_input_parameter_group(self, parameter_group_name: str):
+        """
+        添加输入参数组，已存在时不重复添加
+        """
+        return self._input_group_index.add(self.input_parameter_list, parameter_group_name)
+
+    def add_output_parameter_group(self, parameter_group_name: str):
+        """
+        添加输出参数组，已存在时不重复添加
+        """
+        return self._output_group_index.add(self.output_parameter_list, parameter_group_name)
 
     def get_parameter_data_list(self) -> list:
         """
@@ -172,6 +412,8 @@ class ProcedureNode(NodeBase):
     过程对象，继承自NodeBase，增加了模型类型、标签标识和参数列表等属性。
     """
 
+    __slots__ = ("model_type", "is_tag", "element_node", "method_node", "parameter_list", "_parameter_group_index")
+
     def __init__(self, model_type: ModelType, id: str, description: str = None, is_tag: bool = False) -> None:
         """
         初始化 BaseSystemObject
@@ -188,8 +430,21 @@ class ProcedureNode(NodeBase):
         self.method_node: Optional[MethodNode] = None
         # self.relative_method: MethodNode = None
         # self.relative_element: ElementNode = None
-        # 列表中的每个元素是一个字典，字典的 key 表示参数组名称，value 是参数组包含的具体参数
-        self.parameter_list: List[Dict[str, List[str]]] = []
+        # 列表中的每个元素是一个参数组 ParameterGroup（参数组名称、包含的具体参数及参数数据）
+        self.parameter_list: List[ParameterGroup] = ParameterGroupList()
+        self._parameter_group_index = ParameterGroupIndex()
+
+    def find_parameters_by_group(self, parameter_group_name: str):
+        """
+        按名称查找参数组，找不到时返回None
+        """
+        return self._parameter_group_index.find(self.parameter_list, parameter_group_name)
+
+    def add_parameter_group(self, parameter_group_name: str):
+        """
+        添加参数组，已存在时不重复添加
+        """
+        return self._parameter_group_index.add(self.parameter_list, parameter_group_name)
 
 
 class IndustryTree(TreeBase):
@@ -197,6 +452,37 @@ class IndustryTree(TreeBase):
         super().__init__()
         self.roots: Dict[str, Union[ElementNode, MethodNode, ProcedureNode]] = {}  # 用于存储森林中的根节点
         self.nodes: Dict[str, Union[ElementNode, MethodNode, ProcedureNode]] = {}  # 用于存储所有节点
+        # 非标签节点的有序索引（与 nodes 的插入顺序一致），以及节点ID到列位置的映射，None 表示需要重建
+        self._no_tag_nodes: Optional[List[Union[ElementNode, MethodNode, ProcedureNode]]] = []
+        self._no_tag_positions: Dict[str, int] = {}
+        # 先序遍历（欧拉序）索引：节点按先序排列，None 表示需要重建；
+        # 节点ID -> 槽位，_starts/_ends 按槽位保存进入位置与子树最后一个节点的位置（已删除的槽位为-1）
+        self._preorder: Optional[List[Union[ElementNode, MethodNode, ProcedureNode]]] = None
+        self._slots: Dict[str, int] = {}
+        self._slot_count = 0
+        self._free_slots: List[int] = []
+        self._starts = np.zeros(0, dtype=np.int64)
+        self._ends = np.zeros(0, dtype=np.int64)
+        # 索引建立后新建、尚未加入索引的节点，下次查询时加入
+        self._pending_preorder: List[Union[ElementNode, MethodNode, ProcedureNode]] = []
+        # 节点ID与描述的搜索索引，键为 (节点ID, "id" / "desc")
+        self._search_index = SearchIndex()
+
+    def _invalidate_no_tag_index(self) -> None:
+        """
+        使非标签节点索引失效，下次访问时重建
+        """
+        self._no_tag_nodes = None
+        self._no_tag_positions = {}
+
+    def _ensure_no_tag_index(self) -> List[Union[ElementNode, MethodNode, ProcedureNode]]:
+        """
+        获取非标签节点索引，失效时按 nodes 顺序重建
+        """
+        if self._no_tag_nodes is None:
+            self._no_tag_nodes = [node for node in self.nodes.values() if not node.is_tag]
+            self._no_tag_positions = {node.id: i for i, node in enumerate(self._no_tag_nodes)}
+        return self._no_tag_nodes
 
     def create_node(self, node: Union[ElementNode, MethodNode, ProcedureNode], parent_id: str = None) -> None:
         """
@@ -204,14 +490,33 @@ class IndustryTree(TreeBase):
         :param node: SystemNode 类型的节点
         :param parent_id: 父节点ID（可选）
         """
+        # 任意父节点下都不允许重复的ID，否则 nodes 与各索引中的旧节点会被覆盖
+        if node.id in self.nodes:
+            raise ValueError(f"节点 {node.id} 已存在")
         super().create_node(node, parent_id)  # 调用父类方法
+        if self._preorder is not None:
+            self._pending_preorder.append(node)
+            if len(self._pending_preorder) > self.PREORDER_INCREMENTAL_LIMIT:
+                # 批量创建时逐个插入的总开销为 O(n²)，改为在下次查询时重建一次
+                self._invalidate_preorder_index()
+        self._search_index.add((node.id, "id"), node.id)
+        self._search_index.add((node.id, "desc"), node.desc)
+        # 新节点总是追加在 nodes 末尾，索引有效时直接追加
+        if self._no_tag_nodes is not None and not node.is_tag:
+            self._no_tag_positions[node.id] = len(self._no_tag_nodes)
+            self._no_tag_nodes.append(node)
 
     def remove_node(self, node: Union[ElementNode, MethodNode, ProcedureNode]):
         """
         删除指定节点
         :param node: 要删除的节点
         """
+        # 先从先序索引中删除整个子树区间，父类递归删除子孙节点时不再处理
+        self._remove_preorder(node)
         super().remove_node(node)
+        self._invalidate_no_tag_index()
+        self._search_index.remove((node.id, "id"))
+        self._search_index.remove((node.id, "desc"))
 
     def set_node_tag(self, node_id: Union[str, List[str]], tag: bool) -> None:
         """
@@ -224,28 +529,252 @@ class IndustryTree(TreeBase):
         elif isinstance(node_id, list):
             for node_id_ in node_id:
                 self.nodes[node_id_].is_tag = tag
+        self._invalidate_no_tag_index()
+
+    def set_node_description(self, node_id: str, description: Optional[str]) -> None:
+        """
+        修改节点描述并更新搜索索引（直接修改 node.desc 不会更新索引）
+        :param node_id: 节点ID
+        :param description: 新描述，None表示没有描述
+        """
+        node = self.nodes[node_id]
+        node.desc = description
+        self._search_index.add((node.id, "desc"), description)
 
     def get_no_tag_nodes(self) -> List[Union[ElementNode, MethodNode, ProcedureNode]]:
         """
         获取所有未被标记为标签的节点
         :return: 未被标记为标签的节点列表
         """
-        return [node for node in self.nodes.values() if not node.is_tag]
+        return list(self._ensure_no_tag_index())
 
     def get_no_tag_nodes_id_list(self) -> List[str]:
         """
         获取所有未被标记为标签的节点ID列表
         :return: 未被标记为标签的节点列表
         """
-        return [node.id for node in self.nodes.values() if not node.is_tag]
+        self._ensure_no_tag_index()
+        return list(self._no_tag_positions)
 
-    def find_node_by_description(self, description: str) -> List[Union[ElementNode, MethodNode, ProcedureNode]]:
+    def get_no_tag_nodes_count(self) -> int:
         """
-        根据描述查找节点
+        获取未被标记为标签的节点数量
+        """
+        return len(self._ensure_no_tag_index())
+
+    def get_no_tag_node_by_index(self, index: int) -> Union[ElementNode, MethodNode, ProcedureNode]:
+        """
+        根据列位置获取未被标记为标签的节点
+        :param index: 列位置
+        """
+        return self._ensure_no_tag_index()[index]
+
+    def get_no_tag_node_index(self, node_id: str) -> int:
+        """
+        获取未被标记为标签的节点的列位置
+        :param node_id: 节点ID
+        :return: 列位置，节点不存在或为标签节点时返回-1
+        """
+        self._ensure_no_tag_index()
+        return self._no_tag_positions.get(node_id, -1)
+
+    # region 子树查询
+    # 查询时待加入先序索引的新节点数超过该值则整体重建，否则逐个插入
+    PREORDER_INCREMENTAL_LIMIT = 32
+
+    def _invalidate_preorder_index(self) -> None:
+        """
+        使先序索引失效，下次查询时重建
+        """
+        self._preorder = None
+        self._pending_preorder = []
+
+    def _ensure_preorder_index(self) -> List[Union[ElementNode, MethodNode, ProcedureNode]]:
+        """
+        获取先序遍历索引，失效时迭代重建：子树中的节点在先序中连续，子树查询转为区间查询。
+        索引建立后新建的少量节点在查询时逐个插入，数量较多时整体重建。
+        """
+        if self._pending_preorder:
+            pending, self._pending_preorder = self._pending_preorder, []
+            for node in pending:
+                self._insert_preorder(node)
+        if self._preorder is None:
+            preorder, slots = [], {}
+            starts = np.zeros(max(len(self.nodes), 8), dtype=np.int64)
+            ends = np.zeros_like(starts)
+            for root in self.roots.values():
+                # 栈中的 None 表示对应节点的子树已遍历完毕
+                stack = [root]
+                path = []
+                while stack:
+                    node = stack.pop()
+                    if node is None:
+                        ends[slots[path.pop().id]] = len(preorder) - 1
+                        continue
+                    slot = len(preorder)
+                    slots[node.id] = slot
+                    starts[slot] = slot
+                    preorder.append(node)
+                    path.append(node)
+                    stack.append(None)
+                    stack.extend(reversed(node.children))
+            self._preorder, self._slots, self._starts, self._ends = preorder, slots, starts, ends
+            self._slot_count, self._free_slots = len(preorder), []
+        return self._preorder
+
+    def _insert_preorder(self, node: Union[ElementNode, MethodNode, ProcedureNode]) -> None:
+        """
+        新节点（叶子，追加为父节点的最后一个子节点或最后一个根节点）加入先序索引：
+        插入到父节点子树末尾，之后的位置整体后移一位，父节点及其祖先的子树区间延长一位（数组整体运算，不重建）
+        """
+        if self._free_slots:
+            slot = self._free_slots.pop()
+        else:
+            slot = self._slot_count
+            self._slot_count += 1
+            if slot >= len(self._starts):
+                capacity = max(slot * 2, 8)
+                self._starts = np.resize(self._starts, capacity)
+                self._ends = np.resize(self._ends, capacity)
+        starts, ends = self._starts[:self._slot_count], self._ends[:self._slot_count]
+        if node.parent is None:
+            position = len(self._preorder)
+        else:
+            parent_slot = self._slots[node.parent.id]
+            parent_start, parent_end = starts[parent_slot], ends[parent_slot]
+            position = int(parent_end) + 1
+            # 需要延长区间的是之后的节点与祖先（含父节点），都在移动之前判断；用布尔值相加代替按掩码取值，减少临时数组
+            grow_end = (ends >= position) | ((ends == parent_end) & (starts <= parent_start))
+            starts += starts >= position
+            ends += grow_end
+        self._preorder.insert(position, node)
+        self._slots[node.id] = slot
+        self._starts[slot] = self._ends[slot] = position
+
+    def _remove_preorder(self, node: Union[ElementNode, MethodNode, ProcedureNode]) -> None:
+        """
+        从先序索引中删除节点及其子孙：删除该区间，之后的位置整体前移，祖先的子树区间缩短（数组整体运算，不重建）
+        """
+        if self._preorder is None:
+            return
+        if self._pending_preorder:
+            # 待插入的节点可能位于被删除的子树中，直接重建
+            self._invalidate_preorder_index()
+            return
+        slot = self._slots.get(node.id)
+        if slot is None:
+            return
+        starts, ends = self._starts[:self._slot_count], self._ends[:self._slot_count]
+        start, end = int(starts[slot]), int(ends[slot])
+        size = end - start + 1
+        for removed in self._preorder[start:end + 1]:
+            self._free_slots.append(self._slots.pop(removed.id))
+        del self._preorder[start:end + 1]
+        inside = (starts >= start) & (starts <= end)
+        # 区间末尾不在被删除区间之前的，除被删除的节点外只有之后的节点与祖先
+        ends -= np.where(ends >= end, size, 0)
+        starts -= np.where(starts > end, size, 0)
+        starts[inside] = ends[inside] = -1
+
+    def _get_interval(self, node_id: str) -> tuple:
+        self._ensure_preorder_index()
+        slot = self._slots.get(node_id)
+        if slot is None:
+            raise Exception(f"未找到名为{node_id}的节点")
+        return int(self._starts[slot]), int(self._ends[slot])
+
+    def get_descendants(self, node_id: str, include_self: bool = False, no_tag: bool = False) -> List[Union[ElementNode, MethodNode, ProcedureNode]]:
+        """
+        获取子孙节点（按先序排列）
+        :param node_id: 节点ID
+        :param include_self: 是否包含节点自身
+        :param no_tag: 是否只返回未被标记为标签的节点
+        """
+        start, end = self._get_interval(node_id)
+        nodes = self._preorder[start if include_self else start + 1:end + 1]
+        if no_tag:
+            nodes = [node for node in nodes if not node.is_tag]
+        return nodes
+
+    def is_descendant(self, node_id: str, ancestor_id: str) -> bool:
+        """
+        判断节点是否为另一节点的子孙节点（不含自身）
+        :param node_id: 节点ID
+        :param ancestor_id: 祖先节点ID
+        """
+        position = self._get_interval(node_id)[0]
+        start, end = self._get_interval(ancestor_id)
+        return start < position <= end
+
+    def get_path_to_root(self, node_id: str) -> List[Union[ElementNode, MethodNode, ProcedureNode]]:
+        """
+        获取从节点到根节点的路径（含两端）
+        :param node_id: 节点ID
+        """
+        node = self.nodes.get(node_id)
+        if node is None:
+            raise Exception(f"未找到名为{node_id}的节点")
+        path = []
+        while node is not None:
+            path.append(node)
+            node = node.parent
+        return path
+
+    def lowest_common_ancestor(self, node_id_a: str, node_id_b: str) -> Optional[Union[ElementNode, MethodNode, ProcedureNode]]:
+        """
+        获取两个节点的最近公共祖先（一个节点是另一个的祖先时返回该节点），不在同一棵树中时返回None
+        :param node_id_a: 节点ID
+        :param node_id_b: 节点ID
+        """
+        position = self._get_interval(node_id_b)[0]
+        for node in self.get_path_to_root(node_id_a):
+            start, end = self._get_interval(node.id)
+            if start <= position <= end:
+                return node
+        return None
+
+    # endregion
+
+    def find_node_by_description(self, description: str, mode: str = "substring", case_sensitive: bool = True) -> List[Union[ElementNode, MethodNode, ProcedureNode]]:
+        """
+        根据描述查找节点（没有描述的节点不参与查找）
         :param description: 描述
+        :param mode: substring 包含 / prefix 前缀 / fuzzy 模糊（按相似度排序，不区分大小写）
+        :param case_sensitive: 是否区分大小写
         :return: 节点列表
         """
-        return [node for node in self.nodes.values() if description in node.desc]
+        return self.search(description, mode=mode, field="desc", case_sensitive=case_sensitive)
+
+    def search(self, query: str, mode: str = "substring", field: str = "all", case_sensitive: bool = False,
+               limit: Optional[int] = None) -> List[Union[ElementNode, MethodNode, ProcedureNode]]:
+        """
+        通过索引按节点ID或描述查找节点
+        :param query: 查询串
+        :param mode: substring 包含 / prefix 前缀 / fuzzy 模糊（按相似度排序）
+        :param field: all / id / desc
+        :param case_sensitive: 是否区分大小写（fuzzy 模式始终不区分）
+        :param limit: 最多返回的节点数
+        :return: 节点列表，substring/prefix 按创建顺序排列
+        """
+        if field not in ("all", "id", "desc"):
+            raise ValueError(f"不支持的查找字段{field}")
+        if mode == "substring":
+            keys = self._search_index.iter_substring(query, case_sensitive=case_sensitive)
+        elif mode == "prefix":
+            keys = self._search_index.iter_prefix(query, case_sensitive=case_sensitive)
+        elif mode == "fuzzy":
+            keys = [key for key, _ in self._search_index.fuzzy(query, limit=None)]
+        else:
+            raise ValueError(f"不支持的查找方式{mode}")
+
+        result, seen = [], set()
+        for node_id, key_field in keys:
+            if (field == "all" or key_field == field) and node_id not in seen:
+                seen.add(node_id)
+                result.append(self.nodes[node_id])
+                if limit is not None and len(result) >= limit:
+                    break
+        return result
 
     def find_node_by_id(self, node_id: str) -> Optional[Union[ElementNode, MethodNode, ProcedureNode]]:
         """
@@ -325,7 +854,7 @@ class ProcedureTree(IndustryTree):
         获取所有未被标记为标签的节点
         :return: 未被标记为标签的节点列表
         """
-        return [node for node in self.nodes.values() if not node.is_tag]
+        return super().get_no_tag_nodes()
 
     def find_node_by_id(self, node_id: str) -> Optional[ProcedureNode]:
         """
@@ -347,6 +876,39 @@ def process_function_result(func_result):
         return [func_result]
 
 
+def _run_algorithm(function, method_body: str, method_name: str, real_input_list: list, result_cache: Optional[ResultCache], trace: Optional[RunTrace] = None):
+    """
+    运行算法，启用结果缓存且输入与之前某次运行完全相同时直接返回缓存结果
+    """
+    if result_cache is None:
+        return function(*real_input_list)
+    # 指纹在运行前计算，避免算法原地修改输入后指纹失效
+    key = result_cache.fingerprint(method_body, method_name, real_input_list)
+    hit, func_result = result_cache.get(key)
+    if hit:
+        telemetry.echo(f"{method_name}输入未变化，使用缓存结果")
+        if trace is not None:
+            trace.set(cache_hit=True)
+        return func_result
+    func_result = function(*real_input_list)
+    result_cache.put(key, func_result)
+    return func_result
+
+
+async def _run_in_thread(run, timeout: Optional[float], *args, **kwargs):
+    """
+    在事件循环的默认线程池中运行 run，超时或被取消时通知 run 不再写回结果
+    """
+    cancel_event = threading.Event()
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(None, functools.partial(run, *args, cancel_event=cancel_event, **kwargs))
+    try:
+        return await asyncio.wait_for(future, timeout)
+    except BaseException:
+        cancel_event.set()
+        raise
+
+
 class IndustryModel:
     """
     三维四层统一模型基类
@@ -364,10 +926,13 @@ class IndustryModel:
 
         self.model_type = model_type
         self.model_data = []
+        # 变更日志，由 Model.enable_journal 设置
+        self.journal: Optional[ModelJournal] = None
 
     def __str__(self):
         return f"{self.tree},{self.model_type}"
 
+    @journaled
     def create(self, id: str, description: str = None, parent_id: str = None, is_tag: bool = False):
         """
         创建对象节点
@@ -381,6 +946,7 @@ class IndustryModel:
         else:
             raise ValueError("类型错误")
 
+    @journaled
     def delete(self, id: str):
         """
         删除对象节点
@@ -392,17 +958,34 @@ class IndustryModel:
             return
         self.tree.remove_node(node)
 
-    def print_tree(self):
+    @journaled
+    def set_description(self, id: str, description: Optional[str]):
         """
-        打印Id树
+        修改对象节点的描述，按描述查找时使用新描述
+        :param id: 节点ID
+        :param description: 新描述
         """
-        print(self.tree.print_id())
+        if self.get_by_id(id) is None:
+            raise KeyError(f"未找到{id}")
+        self.tree.set_node_description(id, description)
 
-    def print_tree_desc(self):
+    def print_tree(self, root_id: str = None, max_depth: Optional[int] = None):
         """
-        打印描述树
+        打印Id树（逐行输出）
+        :param root_id: 只打印以该节点为根的子树
+        :param max_depth: 最大打印深度（根节点深度为0）
         """
-        print(self.tree.print_desc())
+        self.tree.write_tree(sys.stdout, "id", root_id=root_id, max_depth=max_depth)
+        sys.stdout.write("\n")
+
+    def print_tree_desc(self, root_id: str = None, max_depth: Optional[int] = None):
+        """
+        打印描述树（逐行输出）
+        :param root_id: 只打印以该节点为根的子树
+        :param max_depth: 最大打印深度（根节点深度为0）
+        """
+        self.tree.write_tree(sys.stdout, "desc", root_id=root_id, max_depth=max_depth)
+        sys.stdout.write("\n")
 
     def get_group_name_df(self):
         """
@@ -430,13 +1013,48 @@ class IndustryModel:
             return None
         return node
 
-    def get_by_description(self, desc: str) -> List[Union[ElementNode, MethodNode, ProcedureNode]]:
+    def get_by_description(self, desc: str, mode: str = "substring") -> List[Union[ElementNode, MethodNode, ProcedureNode]]:
         """
         根据描述查找节点
         :param desc:
+        :param mode: substring 包含 / prefix 前缀 / fuzzy 模糊
         :return:
         """
-        return self.tree.find_node_by_description(desc)
+        return self.tree.find_node_by_description(desc, mode=mode)
+
+    def search(self, query: str, mode: str = "substring", field: str = "all", limit: Optional[int] = None) -> List[Union[ElementNode, MethodNode, ProcedureNode]]:
+        """
+        按节点ID或描述查找节点（不区分大小写），用于边输入边搜索
+        :param query: 查询串
+        :param mode: substring 包含 / prefix 前缀 / fuzzy 模糊
+        :param field: all / id / desc
+        :param limit: 最多返回的节点数
+        """
+        return self.tree.search(query, mode=mode, field=field, limit=limit)
+
+    def get_descendants(self, id: str, include_self: bool = False, no_tag: bool = False) -> List[Union[ElementNode, MethodNode, ProcedureNode]]:
+        """
+        获取节点下的所有子孙节点（按先序排列）
+        :param id: 节点ID
+        :param include_self: 是否包含节点自身
+        :param no_tag: 是否只返回未被标记为标签的节点
+        """
+        return self.tree.get_descendants(id, include_self=include_self, no_tag=no_tag)
+
+    def get_path_to_root(self, id: str) -> List[Union[ElementNode, MethodNode, ProcedureNode]]:
+        """
+        获取从节点到根节点的路径（含两端）
+        :param id: 节点ID
+        """
+        return self.tree.get_path_to_root(id)
+
+    def get_common_ancestor(self, id_a: str, id_b: str) -> Optional[Union[ElementNode, MethodNode, ProcedureNode]]:
+        """
+        获取两个节点的最近公共祖先
+        :param id_a: 节点ID
+        :param id_b: 节点ID
+        """
+        return self.tree.lowest_common_ancestor(id_a, id_b)
 
     def _get_id_list(self) -> list[str]:
         return [node.id for node in self.tree.get_no_tag_nodes()]
@@ -449,13 +1067,11 @@ class IndustryModel:
         :param node: 节点
         :param group_name_list: 参数组名称列表
         """
-        # 遍历 group_name_list 并检查是否已经存在该参数组
+        # 已存在同名参数组时不重复添加
         for group_name in group_name_list:
-            # 检查是否已存在具有相同 group_name 的参数组
-            if not any(group_name == param_group["group_name"] for param_group in node.parameter_list):
-                # 如果不存在，则添加新的参数组
-                node.parameter_list.append({"group_name": group_name, "parameters": []})
+            node.add_parameter_group(group_name)
 
+    @journaled
     def set_parameter_group_by_id(self, id: str, group_name_list: list[str]):
         """
         根据Id设置参数组
@@ -477,11 +1093,12 @@ class IndustryModel:
             # 检查 index 是否在 node.parameter_list 范围内
             if index < len(node.parameter_list):
                 node.parameter_list[index]["parameters"] = group_name
-                node.parameter_list[index]["parameter_data"] = {}
+                node.parameter_list[index]["parameter_data"] = node.create_parameter_data() if isinstance(node, ElementNode) else {}
             else:
                 # 如果超出范围，则跳过
                 print(f"Index {index} exceeds the length of parameter_list. Skipping.")
 
+    @journaled
     def set_parameter_by_id(self, id: str, parameter_name_list_list: list[list[str]]):
         """
         根据节点Id设置参数
@@ -548,13 +1165,10 @@ class IndustryModel:
         根据id获取参数组列表
         :return:
         """
-        output_list = []
-
-        for node_id, node in self.tree.nodes.items():
-            node: Union[ElementNode, MethodNode, ProcedureNode]
-            if not node.is_tag and node_id == element_id:
-                output_list = [p["group_name"] for p in node.parameter_list]
-        return output_list
+        node: Union[ElementNode, MethodNode, ProcedureNode] = self.tree.find_node_by_id(element_id)
+        if node is None or node.is_tag:
+            return []
+        return [p["group_name"] for p in node.parameter_list]
 
     # endregion 参数层
 
@@ -600,16 +1214,96 @@ def filter_and_extract(data_list, index):
     def process_item(item):
         if isinstance(item, list):
             return [process_item(sub_item) for sub_item in item]
-        elif isinstance(item, dict):
+        elif isinstance(item, Mapping):
             return item.get(index, [])
         return []
 
     return process_item(data_list)
 
 
+def parameter_data_size(parameter_data) -> int:
+    """
+    参数数据的行数（最大data索引+1）
+    :param parameter_data: 列式存储或 {str(data_index): data_list} 字典
+    """
+    if isinstance(parameter_data, ColumnarParameterData):
+        return parameter_data.size
+    if not parameter_data:
+        return 0
+    return max(int(k) for k in parameter_data.keys()) + 1
+
+
+def get_parameter_data_by_index(parameter_data, index: int):
+    """
+    取参数数据中指定data索引的数据，不存在时返回None
+    :param parameter_data: 列式存储或 {str(data_index): data_list} 字典
+    :param index: data索引
+    """
+    if parameter_data is None:
+        return None
+    # 列式存储直接按整数索引取值，避免构造字符串键
+    return parameter_data.get(index if isinstance(parameter_data, ColumnarParameterData) else str(index))
+
+
+def get_parameter_array_by_index(parameter_data, index: int):
+    """
+    取参数数据中指定data索引的数据，列式数值存储时返回数组视图（用于进程池，较大的数组经共享内存传递），不存在时返回None
+    :param parameter_data: 列式存储或 {str(data_index): data_list} 字典
+    :param index: data索引
+    """
+    if isinstance(parameter_data, ColumnarParameterData):
+        return parameter_data.get_array(index)
+    return get_parameter_data_by_index(parameter_data, index)
+
+
+def take_parameter_data(parameter_data, indices: List[int], as_array: bool = False) -> list:
+    """
+    按data索引批量取参数数据，列式数值存储时整块切片后一次转换，不逐条取值，不存在的索引为None
+    :param parameter_data: 列式存储或 {str(data_index): data_list} 字典
+    :param indices: data索引列表
+    :param as_array: 为True时列式数值数据返回数组（用于进程池）
+    """
+    if isinstance(parameter_data, ColumnarParameterData) and parameter_data.is_numeric:
+        values, valid = parameter_data.take(indices)
+        rows = list(values) if as_array else values.tolist()
+        return [row if ok else None for row, ok in zip(rows, valid.tolist())]
+    get_data = get_parameter_array_by_index if as_array else get_parameter_data_by_index
+    return [get_data(parameter_data, index) for index in indices]
+
+
+def align_parameter_data(parameter_data, length: int) -> np.ndarray:
+    """
+    将参数数据对齐为按data索引排列的一维对象数组，缺失位置为None
+    :param parameter_data: 列式存储或 {str(data_index): data_list} 字典
+    :param length: 数组长度
+    """
+    if isinstance(parameter_data, ColumnarParameterData):
+        return parameter_data.to_object_array(length)
+    aligned = np.full(length, None, dtype=object)
+    if parameter_data:
+        for k, v in parameter_data.items():
+            index = int(k)
+            if index < length:
+                aligned[index] = v
+    return aligned
+
+
 class Element(IndustryModel):
-    def __init__(self):
+    def __init__(self, columnar: bool = False):
+        """
+        :param columnar: 新建单元节点的参数数据是否使用列式存储
+        """
         super().__init__(ModelType.Element)
+        self.columnar = columnar
+        # 运行结果可能由多个线程同时写回
+        self._write_lock = threading.RLock()
+
+    @journaled
+    def create(self, id: str, description: str = None, parent_id: str = None, is_tag: bool = False):
+        """
+        创建对象节点
+        """
+        self.tree.create_node(ElementNode(model_type=self.model_type, id=id, description=description, is_tag=is_tag, columnar=self.columnar), parent_id)
 
     def get_parameter_data_by_index(self, index: int) -> dict:
         data_list = []
@@ -632,17 +1326,19 @@ class Element(IndustryModel):
         return pd.DataFrame(self._get_id_list(), columns=["element type"])
 
     # region 数据层
+    @journaled
     def add_model_data(self, data_list: List[str]):
         """
         增加对象层数据
         :param data_list:数据列表
         """
-        nodes = self.tree.get_no_tag_nodes()
-        if len(nodes) == len(data_list):
+        nodes_count = self.tree.get_no_tag_nodes_count()
+        if nodes_count == len(data_list):
             self.model_data.append(data_list)
         else:
-            raise ValueError(f"对象数量为{len(nodes)}，与输入数量不匹配")
+            raise ValueError(f"对象数量为{nodes_count}，与输入数量不匹配")
 
+    @journaled
     def add_parameter_data(self, data_index: int, element_id: str, parameter_group_name: str, data_list):
         """
         增加参数数据
@@ -663,13 +1359,110 @@ class Element(IndustryModel):
         if pg is None:
             raise KeyError(f"{element.id}下没有{parameter_group_name}")
 
-        # 如果 pg['parameter_data'] 还不是字典，先初始化为空字典
+        # 如果 pg['parameter_data'] 还不是字典，先初始化为空容器
         if 'parameter_data' not in pg:
-            pg['parameter_data'] = {}
+            pg['parameter_data'] = element.create_parameter_data()
 
         # 根据 data_index 将 data_list 存储到字典中
         pg['parameter_data'][str(data_index)] = data_list
 
+    @staticmethod
+    def _to_rows(data, column_names: Optional[List[str]] = None) -> list:
+        """
+        将 DataFrame / NumPy 数组（含结构化数组）/ 行迭代器统一转换为行列表
+        :param data: 输入数据
+        :param column_names: 期望的列顺序，DataFrame列名或结构化数组字段名完全覆盖时按此顺序重排
+        """
+        if isinstance(data, pd.DataFrame):
+            if column_names is not None and set(column_names).issubset(data.columns):
+                data = data[column_names]
+            return data.to_numpy(dtype=object).tolist()
+        if isinstance(data, np.ndarray):
+            if data.dtype.names is not None:
+                names = list(data.dtype.names)
+                if column_names is not None and set(column_names).issubset(names):
+                    names = column_names
+                return [list(row) for row in zip(*(data[name].tolist() for name in names))]
+            return data.tolist()
+        return [list(row) if isinstance(row, (tuple, list, np.ndarray)) else row for row in data]
+
+    def add_model_data_many(self, rows) -> range:
+        """
+        批量增加对象层数据，只做一次校验
+        :param rows: DataFrame、NumPy数组（含结构化数组）或行的迭代器，列顺序与非标签节点一致；
+                     DataFrame列名/结构化数组字段名包含所有节点ID时按节点ID重排
+        :return: 新增数据的data索引范围
+        """
+        return self._add_model_rows(self._to_rows(rows, self.tree.get_no_tag_nodes_id_list()))
+
+    @journaled
+    def _add_model_rows(self, rows: list) -> range:
+        nodes_count = self.tree.get_no_tag_nodes_count()
+        bad = next((i for i, row in enumerate(rows) if len(row) != nodes_count), None)
+        if bad is not None:
+            raise ValueError(f"对象数量为{nodes_count}，与第{bad}行输入数量{len(rows[bad])}不匹配")
+        start = len(self.model_data)
+        self.model_data.extend(rows)
+        return range(start, len(self.model_data))
+
+    def add_parameter_data_bulk(self, element_id: str, parameter_group_name: str, data, start_index: int = 0) -> range:
+        """
+        批量增加参数数据，只做一次校验
+        :param element_id:单元唯一标识符
+        :param parameter_group_name:参数组名称
+        :param data:DataFrame（每行为一条参数数据）、NumPy数组（第一维为数据条数）或参数数据的迭代器
+        :param start_index:第一条数据对应的data索引
+        :return: 写入的data索引范围
+        """
+        # 数值型二维数组保持原样，交给列式存储整体写入
+        if not (isinstance(data, np.ndarray) and data.dtype.names is None):
+            data = self._to_rows(data)
+        return self._set_parameter_data_rows(element_id, parameter_group_name, data, start_index)
+
+    @journaled
+    def _set_parameter_data_rows(self, element_id: str, parameter_group_name: str, data, start_index: int) -> range:
+        element: ElementNode = self.tree.find_node_by_id(element_id)
+        if not element:
+            raise KeyError(f"未找到{element_id}")
+        if element.find_parameters_by_group(parameter_group_name) is None:
+            raise KeyError(f"{element.id}下没有{parameter_group_name}")
+        end_index = start_index + len(data)
+        if start_index < 0 or end_index > len(self.model_data):
+            raise KeyError(f"第{start_index}~{end_index - 1}条数据不存在")
+
+        data_indices = range(start_index, end_index)
+        element.set_parameter_data_many_by_group_name(parameter_group_name, data_indices, data)
+        return data_indices
+
+    @journaled
+    def _write_result(self, data_index: int, element_id_list: List[str], output_data: Dict[str, Any]):
+        """
+        将过程运行结果写回单元节点
+        :param data_index:data索引
+        :param element_id_list:单元唯一标识符列表
+        :param output_data:参数组名称到结果数据的字典
+        """
+        element_node_list = [self.tree.find_node_by_id(element_id) for element_id in element_id_list]
+        with self._write_lock:
+            for group_name, data in output_data.items():
+                for element_node in element_node_list:
+                    element_node.set_parameter_data_by_group_name_index(data_index=data_index, parameter_group_name=group_name, data_list=data)
+
+    @journaled
+    def _write_results(self, data_indices: List[int], element_id_list: List[str], output_data: Dict[str, list]):
+        """
+        将批量运行结果写回单元节点
+        :param data_indices:data索引列表
+        :param element_id_list:单元唯一标识符列表
+        :param output_data:参数组名称到结果数据列表（与data索引一一对应）的字典
+        """
+        element_node_list = [self.tree.find_node_by_id(element_id) for element_id in element_id_list]
+        with self._write_lock:
+            for group_name, data_list_list in output_data.items():
+                for element_node in element_node_list:
+                    element_node.set_parameter_data_many_by_group_name(group_name, data_indices, data_list_list)
+
+    @journaled
     def set_parameter_data_by_id_index(self, data_index: int, element_id: str, parameter_group_name: str, data_list):
         """
         增加参数数据
@@ -702,48 +1495,63 @@ class Element(IndustryModel):
         df.index = [f'element[{i}]' for i in range(len(df))]
         return df
 
-    def get_all_parameter_data_df(self) -> pd.DataFrame:
+    def get_all_parameter_data_df(self, long_format: bool = False) -> pd.DataFrame:
         """
         获取所有数据并返回DataFrame，修改索引格式为element
+        :param long_format: 为True时返回长表：行索引为 (element, group, data_index) 的MultiIndex，
+                            仅包含存在的数据，列 parameter_data 为参数数据
         """
+        nodes = self.tree.get_no_tag_nodes()
+        if long_format:
+            return self._get_parameter_data_long_df(nodes)
+
+        # 行数取所有参数组中最大的data索引+1
+        length = max((parameter_data_size(para.get('parameter_data')) for node in nodes for para in node.parameter_list), default=0)
+
+        # 逐列组装：每个参数组先对齐为长度一致的数组，再按行打包成该单元的列
+        columns = {}
+        for node in nodes:
+            group_arrays = [align_parameter_data(para.get('parameter_data'), length) for para in node.parameter_list]
+            if group_arrays:
+                columns[node.id] = [list(row) for row in zip(*group_arrays)]
+            else:
+                columns[node.id] = [[] for _ in range(length)]
 
-        def calc_row(dataa_list):
-            max_length = 0
-            for sublist in dataa_list:
-                for dic in sublist:
-                    if isinstance(dic, dict):
-                        max_length = max(max_length, len(dic))
-                    else:
-                        print("Error: Element is not a dictionary:", dic)
-            return max_length
-
-        nodes_id_list = self.tree.get_no_tag_nodes_id_list()
+        df = pd.DataFrame(columns, index=[f'element [{i}]' for i in range(length)], columns=[node.id for node in nodes])
+        return df
 
-        dataa_list = []
-        for node in self.tree.get_no_tag_nodes():
-            para_list = []
+    @staticmethod
+    def _get_parameter_data_long_df(nodes: List[ElementNode]) -> pd.DataFrame:
+        """
+        组装 (element, group, data_index) 长表
+        :param nodes: 非标签单元节点
+        """
+        element_level, group_level, index_level, value_list = [], [], [], []
+        for node in nodes:
             for para in node.parameter_list:
-                para_list.append(para.get('parameter_data'))
-            dataa_list.append(para_list)
-
-        max_le = calc_row(dataa_list)
-        new_dict = {}
-        for x in range(0, max_le):
-            new_dict[x] = []
-        for column in dataa_list:
-            for index in new_dict:
-                # Check if the key exists and append the value or None
-                #     new_dict[index].append(add_list)
-                l = []
-                for dic in column:
-                    l.append(dic.get(str(index), None))
-                new_dict[index].append(l)
-
-        # 转置字典以创建 DataFrame
-        df = pd.DataFrame.from_dict(new_dict, orient='index')
-        df.columns = nodes_id_list
-        df.index = [f'element [{i}]' for i in df.index]  # 设置索引
-        return df
+                parameter_data = para.get('parameter_data')
+                if isinstance(parameter_data, ColumnarParameterData):
+                    indices = np.flatnonzero(parameter_data.mask)
+                    values = parameter_data.to_object_array(parameter_data.size)[indices]
+                elif parameter_data:
+                    indices = np.fromiter((int(k) for k in parameter_data.keys()), dtype=np.int64, count=len(parameter_data))
+                    values = np.empty(len(indices), dtype=object)
+                    for i, v in enumerate(parameter_data.values()):
+                        values[i] = v
+                    order = np.argsort(indices, kind='stable')
+                    indices, values = indices[order], values[order]
+                else:
+                    continue
+                element_level.append(np.full(len(indices), node.id, dtype=object))
+                group_level.append(np.full(len(indices), para['group_name'], dtype=object))
+                index_level.append(indices)
+                value_list.append(values)
+
+        names = ['element', 'group', 'data_index']
+        if not value_list:
+            return pd.DataFrame({'parameter_data': []}, index=pd.MultiIndex.from_arrays([[], [], []], names=names))
+        index = pd.MultiIndex.from_arrays([np.concatenate(element_level), np.concatenate(group_level), np.concatenate(index_level)], names=names)
+        return pd.DataFrame({'parameter_data': np.concatenate(value_list)}, index=index)
 
     def get_parameter_data(self, element_data_index: int, element_id_or_index: Union[str, int], para_id_or_index: Optional[Union[str, int]] = None):
         """
@@ -751,22 +1559,20 @@ class Element(IndustryModel):
         :param element_data_index:单元模型整体数据索引
         :param element_id_or_index:单元模型ID/索引
         """
-        # 单元模型表头列表
-        element_id_list = self.tree.get_no_tag_nodes_id_list()
         element_id_index = -1
         # 索引
         if isinstance(element_id_or_index, int):
             # 有效
-            if element_id_or_index < len(element_id_list):
+            if element_id_or_index < self.tree.get_no_tag_nodes_count():
                 element_id_index = element_id_or_index
             else:
                 raise Exception(f"索引{element_id_or_index}超出范围")
         elif isinstance(element_id_or_index, str):
-            element_id_index = element_id_list.index(element_id_or_index)
+            element_id_index = self.tree.get_no_tag_node_index(element_id_or_index)
             if element_id_index < 0:
                 raise Exception(f"参数{element_id_or_index}不存在")
         # 获取指定单元ID
-        element_id = element_id_list[element_id_index]
+        element_id = self.tree.get_no_tag_node_by_index(element_id_index).id
         # 获取指定索引的参数值列表
         element_data_list = self.get_parameter_data_by_index(element_data_index)
         data_list = element_data_list[element_id_index]
@@ -801,10 +1607,8 @@ class Element(IndustryModel):
         :param element_data_index:单元索引
         :param id:参数Id
         """
-        # 表头列表
-        nodes_id_list = self.tree.get_no_tag_nodes_id_list()
         # 索引
-        c_index = nodes_id_list.index(id)
+        c_index = self.tree.get_no_tag_node_index(id)
         if c_index < 0:
             raise Exception(f"参数{id}不存在")
 
@@ -847,7 +1651,7 @@ class Element(IndustryModel):
         return combined_templates
 
     def get_parameter_group_name_data(self, element_name, element_data_index, element_name_index):
-        node_list = self.tree.get_no_tag_nodes()[element_name_index]
+        node_list = self.tree.get_no_tag_node_by_index(element_name_index)
 
         template = {
             'name': self.get_parameter_group_name_list_by_element_id(element_name),
@@ -867,45 +1671,44 @@ class Element(IndustryModel):
         # return r_list
         return template
 
-    def get_element_data(self, element_name, element_name_index):
-        template = {
-            'name': '',
-            'parameter_groups': ''
-        }
-        r_list = []
+    def iter_element_data(self, element_name, element_name_index):
+        """
+        逐条生成指定单元的数据
+        """
         for element_data_index in range(len(self.model_data)):
-            new_template = copy.deepcopy(template)
-            new_template['name'] = self.model_data[int(element_data_index)][element_name_index]
-            new_template['parameter_groups'] = self.get_parameter_group_name_data(element_name, element_data_index, element_name_index)
-            r_list.append(new_template)
-        return r_list
-
-    def model_to_dict(self):
-        template = {
-            'element_index': 0,
-            'name': '0',
-            'data': []
-        }
+            yield {
+                'name': self.model_data[int(element_data_index)][element_name_index],
+                'parameter_groups': self.get_parameter_group_name_data(element_name, element_data_index, element_name_index),
+            }
 
-        json_list = []
+    def get_element_data(self, element_name, element_name_index):
+        return list(self.iter_element_data(element_name, element_name_index))
 
+    def iter_model_dict(self, lazy: bool = False):
+        """
+        逐个单元生成模型数据
+        :param lazy: 为True时每个单元的data也延迟生成
+        """
         element_name_list = self.tree.get_no_tag_nodes_id_list()
         for i, element_name in enumerate(element_name_list):
-            new_template = copy.deepcopy(template)
-            new_template['element_index'] = i
-            new_template['name'] = element_name
-            new_template['data'] = self.get_element_data(element_name, i)
-            json_list.append(new_template)
-        return json_list
+            data = self.iter_element_data(element_name, i)
+            yield {
+                'element_index': i,
+                'name': element_name,
+                'data': LazyList(data) if lazy else list(data),
+            }
 
-    def to_json(self):
+    def model_to_dict(self):
+        return list(self.iter_model_dict())
+
+    def to_json(self, lazy: bool = False):
         """
         获取单元模型所有数据（json)
-        :param data_list:数据列表
+        :param lazy: 为True时model部分为LazyList，配合 serializer.dump_json 流式写出
         """
         r_json = {
             'tree': self.tree._tree_to_dict(),
-            'model': self.model_to_dict()
+            'model': LazyList(self.iter_model_dict(lazy=True)) if lazy else self.model_to_dict()
         }
 
         return r_json
@@ -924,29 +1727,41 @@ class Element(IndustryModel):
         }
         return template
 
-    def to_json_flat(self):
+    def iter_json_flat(self):
+        """
+        逐个单元生成扁平化模型数据
+        """
+        for i, v in enumerate(self.tree.get_no_tag_nodes()):
+            data = [x[i] for x in self.model_data]
+            yield self.element_model_todict(data, v)
+
+    def to_json_flat(self, lazy: bool = False):
         """
         获取单元模型所有数据（json)
-        :param data_list:数据列表
+        :param lazy: 为True时model部分为LazyList，配合 serializer.dump_json 流式写出
         """
+        model_list = self.iter_json_flat()
         r_json = {
             'tree': self.tree._tree_to_dict(),
-            'model': []
-
+            'model': LazyList(model_list) if lazy else list(model_list)
         }
-        a = self.tree.get_no_tag_nodes()
-        model_list = []
-        for i, v in enumerate(self.tree.get_no_tag_nodes()):
-            data = [x[i] for x in self.model_data]
-            model_list.append(self.element_model_todict(data, v))
-        r_json['model'] = model_list
 
         return r_json
 
+    def dump_json_flat(self, fp: TextIO, indent: Optional[int] = None) -> None:
+        """
+        将扁平化模型数据流式写入文件对象
+        :param fp: 可写的文本文件对象
+        :param indent: 缩进空格数
+        """
+        dump_json(self.to_json_flat(lazy=True), fp, indent=indent)
+
 
 class Method(IndustryModel):
     def __init__(self):
         super().__init__(ModelType.Method)
+        # 结果缓存，由 Model.enable_result_cache 设置
+        self.result_cache: Optional[ResultCache] = None
 
     # region 对象层
 
@@ -957,6 +1772,7 @@ class Method(IndustryModel):
         """
         return pd.DataFrame(self._get_id_list(), columns=["method type"])
 
+    @journaled
     def set_program(self, id: str, program: list[str]):
         node: MethodNode = self.tree.find_node_by_id(id)
         node.program = program
@@ -985,12 +1801,9 @@ class Method(IndustryModel):
         :param node: 节点
         :param group_name_list: 参数组名称列表
         """
-        # 遍历 group_name_list 并检查是否已经存在该参数组
+        # 已存在同名参数组时不重复添加
         for group_name in group_name_list:
-            # 检查是否已存在具有相同 group_name 的参数组
-            if not any(group_name == param_group["group_name"] for param_group in node.input_parameter_list):
-                # 如果不存在，则添加新的参数组
-                node.input_parameter_list.append({"group_name": group_name, "parameters": []})
+            node.add_input_parameter_group(group_name)
 
     @staticmethod
     def set_output_parameter_group(node: MethodNode, group_name_list: list[str]):
@@ -999,13 +1812,11 @@ class Method(IndustryModel):
         :param node: 节点
         :param group_name_list: 参数组名称列表
         """
-        # 遍历 group_name_list 并检查是否已经存在该参数组
+        # 已存在同名参数组时不重复添加
         for group_name in group_name_list:
-            # 检查是否已存在具有相同 group_name 的参数组
-            if not any(group_name == param_group["group_name"] for param_group in node.output_parameter_list):
-                # 如果不存在，则添加新的参数组
-                node.output_parameter_list.append({"group_name": group_name, "parameters": []})
+            node.add_output_parameter_group(group_name)
 
+    @journaled
     def set_input_parameter_group_by_id(self, id: str, group_name_list: list[str]):
         """
         根据Id设置方法模型输入参数组
@@ -1015,6 +1826,7 @@ class Method(IndustryModel):
         node = self.tree.find_node_by_id(id)
         self.set_input_parameter_group(node, group_name_list)
 
+    @journaled
     def set_output_parameter_group_by_id(self, id: str, group_name_list: list[str]):
         """
         根据Id设置方法模型输出参数组
@@ -1056,6 +1868,7 @@ class Method(IndustryModel):
                 # 如果超出范围，则跳过
                 print(f"索引 {index} 超出范围")
 
+    @journaled
     def set_input_parameter_by_id(self, id: str, parameter_name_list_list: list[list[str]]):
         """
         根据节点Id设置输入参数
@@ -1065,6 +1878,7 @@ class Method(IndustryModel):
         node = self.tree.find_node_by_id(id)
         self.set_input_parameter(node, parameter_name_list_list)
 
+    @journaled
     def set_output_parameter_by_id(self, id: str, parameter_name_list_list: list[list[str]]):
         """
         根据节点Id设置输出参数
@@ -1244,22 +2058,20 @@ class Method(IndustryModel):
         :param method_id_or_index:模型ID/索引
         :param para_id_or_index:模型参数名/索引
         """
-        # 方法模型表头列表
-        method_id_list = self.tree.get_no_tag_nodes_id_list()
         method_id_index = -1
         # 索引
         if isinstance(method_id_or_index, int):
             # 有效
-            if method_id_or_index < len(method_id_list):
+            if method_id_or_index < self.tree.get_no_tag_nodes_count():
                 method_id_index = method_id_or_index
             else:
                 raise Exception(f"索引{method_id_or_index}超出范围")
         elif isinstance(method_id_or_index, str):
-            method_id_index = method_id_list.index(method_id_or_index)
+            method_id_index = self.tree.get_no_tag_node_index(method_id_or_index)
             if method_id_index < 0:
                 raise Exception(f"参数{method_id_or_index}不存在")
         # 获取指定单元ID
-        method_id = method_id_list[method_id_index]
+        method_id = self.tree.get_no_tag_node_by_index(method_id_index).id
         data_list = self._get_all_parameter_data_list(2, 2)
         target_data_list = [x for x in data_list if x[0] == method_id_or_index]
 
@@ -1319,6 +2131,7 @@ class Method(IndustryModel):
         for index, par_dict in enumerate(parameter_list):
             par_dict['parameter_data'] = data_list[index] if index < len(data_list) else None
 
+    @journaled
     def set_input_parameter_data(self, id: str, data_list):
         """
         设置参数输入数据
@@ -1328,6 +2141,7 @@ class Method(IndustryModel):
         node = self.tree.find_node_by_id(id)
         self._add_parameter_data(node=node, id=id, type="input", data_list=data_list)
 
+    @journaled
     def set_output_parameter_data(self, id: str, data_list):
         """
         设置参数输出数据
@@ -1337,6 +2151,16 @@ class Method(IndustryModel):
         node = self.tree.find_node_by_id(id)
         self._add_parameter_data(node=node, id=id, type="output", data_list=data_list)
 
+    @journaled
+    def _write_result(self, id: str, format_result: List[Any]):
+        """
+        将运行结果写入方法节点的输出参数
+        :param id:唯一标识符
+        :param format_result: 格式化后的运行结果
+        """
+        node: MethodNode = self.tree.find_node_by_id(id)
+        node.set_parameter_data_list(format_result)
+
     def _get_all_parameter_data_list(self, max_input_len: int, max_output_len: int):
         """
         获取所有参数数据列表
@@ -1415,56 +2239,81 @@ class Method(IndustryModel):
     # endregion 数据层
     # region 分析方法
 
-    def run(self, id: str):
+    def run(self, id: str, executor: Optional[Union[str, ProcessExecutor]] = None, cancel_event: Optional[threading.Event] = None):
         """
-        使用方法模型数据运行方法
+        使用方法模型数据运行方法，各阶段耗时记录到 telemetry
         :param id: 方法名
-        """
-
-        node: MethodNode = self.tree.find_node_by_id(id)
-        if node.is_tag or node is None:
-            raise Exception("节点不存在")
-        program = self.get_program_by_id(node.id)
-
-        if program is None:
-            raise Exception("程序未指定")
-        # 分割py路径，函数名称
-        method_body, method_name = os.path.split(program[0])
-        if not method_body or not method_name:
-            raise Exception("方法体/方法获取失败")
-        input_par_list = [p.get('parameters', []) for p in node.input_parameter_list]
-        # input_data_list = [p.get('parameter_data', []) for p in node.input_parameter_list]
-        input_data_list = node.get_parameter_data_list()
-        print(f"方法体：{method_body}，方法：{method_name}")
-        print(f"参数：{input_par_list}")
-        print(f"参数值：{input_data_list}")
-
-        # print(f"尝试导入方法体")
-        # 获取算法
-        function = get_algorithm_by_path(method_body, method_name)
-        if not function:
-            raise Exception(f"未能导入{method_name}")
-        # print(f"成功导入算法: {method_name}")
-
-        # format_input = remove_empty_members(input_data_list)
-
-        # 开始计时
-        start_time = time.time()
-        func_result = function(*input_data_list)
-        format_result = process_function_result(func_result)
-
-        # 结束计时
-        end_time = time.time()
-
-        # 计算耗时
-        execution_time = end_time - start_time
-
-        node.set_parameter_data_list(format_result)
-
-        print(f"算法运行完毕，耗时：{execution_time:.4f}秒")
+        :param executor: None在当前进程中运行；"process"或 ProcessExecutor 在进程池中运行（大数组经共享内存传递）
+        :param cancel_event: 算法运行结束时若已被设置，则不写回结果
+        """
+        trace = telemetry.start("method", id)
+        input_data_list = format_result = None
+        try:
+            node: MethodNode = self.tree.find_node_by_id(id)
+            if node is None or node.is_tag:
+                raise Exception("节点不存在")
+            program = self.get_program_by_id(node.id)
+
+            if program is None:
+                raise Exception("程序未指定")
+            # 分割py路径，函数名称
+            method_body, method_name = os.path.split(program[0])
+            if not method_body or not method_name:
+                raise Exception("方法体/方法获取失败")
+            trace.set(method_name=method_name)
+            trace.mark("resolve")
+
+            # input_data_list = [p.get('parameter_data', []) for p in node.input_parameter_list]
+            input_data_list = node.get_parameter_data_list()
+            if telemetry.verbose:
+                print(f"方法体：{method_body}，方法：{method_name}")
+                print(f"参数：{[p.get('parameters', []) for p in node.input_parameter_list]}")
+                print(f"参数值：{input_data_list}")
+            trace.mark("match")
+
+            # 获取算法
+            process_executor = resolve_executor(executor)
+            if process_executor is not None:
+                function = process_executor.bind(method_body, method_name)
+            else:
+                function = get_algorithm_by_path(method_body, method_name)
+            if not function:
+                raise Exception(f"未能导入{method_name}")
+            trace.mark("import")
+
+            # format_input = remove_empty_members(input_data_list)
+
+            start_time = time.perf_counter()
+            func_result = _run_algorithm(function, method_body, method_name, input_data_list, self.result_cache, trace)
+            format_result = process_function_result(func_result)
+            execution_time = time.perf_counter() - start_time
+            trace.mark("execute")
+
+            if cancel_event is not None and cancel_event.is_set():
+                telemetry.echo(f"{method_name}已取消，结果未写回")
+                trace.set(cancelled=True)
+            else:
+                self._write_result(node.id, format_result)
+                trace.mark("write_back")
+        except BaseException as e:
+            trace.finish(inputs=input_data_list, outputs=format_result, error=e)
+            raise
+        trace.finish(inputs=input_data_list, outputs=format_result)
+
+        telemetry.echo(f"算法运行完毕，耗时：{execution_time:.4f}秒")
         # logger.info(result)
         return func_result
 
+    async def run_async(self, id: str, timeout: Optional[float] = None, executor: Optional[Union[str, ProcessExecutor]] = None):
+        """
+        异步运行方法，算法在线程（或进程池）中运行，不阻塞事件循环，可用 asyncio.gather 同时等待多个运行
+        超时（asyncio.TimeoutError）或被取消时，已开始的算法在后台运行结束后不再写回结果
+        :param id: 方法名
+        :param timeout: 超时时间（秒），None表示不限
+        :param executor: 同 run
+        """
+        return await _run_in_thread(self.run, timeout, id, executor=executor)
+
     # endregion
     name = get_group_name_df
     input_parameter_group = set_input_parameter_group_by_id
@@ -1487,6 +2336,9 @@ class Procedure(IndustryModel):
     def __init__(self, model):
         super().__init__(ModelType.Procedure)
         self.model: Model = model
+        self.scheduler = ProcedureScheduler(self)
+        # 结果缓存，由 Model.enable_result_cache 设置
+        self.result_cache: Optional[ResultCache] = None
 
     def get_all_data_df(self) -> pd.DataFrame:
         """
@@ -1506,6 +2358,7 @@ class Procedure(IndustryModel):
         """
         return pd.DataFrame(self._get_id_list(), columns=["procedure name"])
 
+    @journaled
     def relate(self, procedure_name: str, element_id: Optional[Union[list[str], str]], method_id: Optional[str]):
         procedure_node: ProcedureNode = self.get_by_id_no_tag(procedure_name)
         element_node_list = []
@@ -1545,15 +2398,14 @@ class Procedure(IndustryModel):
         df = pd.DataFrame(relation_list, columns=["procedure name", "element name", "method name"])
         return df
 
-    def run(self, id: str, element_index: int):
+    def _resolve(self, id: str):
         """
-        运行指定流程
+        解析流程绑定的单元节点、方法节点及程序路径
         :param id:唯一标识符
-        :param element_index:
+        :return: (单元节点列表, 方法节点, 方法体路径, 方法名)
         """
-
         procedure_node: ProcedureNode = self.tree.find_node_by_id(id)
-        if procedure_node.is_tag or procedure_node is None:
+        if procedure_node is None or procedure_node.is_tag:
             raise Exception("过程模型不存在")
         element_node_list = procedure_node.element_node
         method_node = procedure_node.method_node
@@ -1568,68 +2420,222 @@ class Procedure(IndustryModel):
         method_body, method_name = os.path.split(program[0])
         if not method_body or not method_name:
             raise Exception("方法体/方法获取失败")
+        return element_node_list, method_node, method_body, method_name
 
-        # 处理输入输出参数
-        method_input_group_name = [p.get('group_name', []) for p in method_node.input_parameter_list]
-        method_input = [p.get('parameters', []) for p in method_node.input_parameter_list]
-        method_output_group_name = [p.get('group_name', []) for p in method_node.output_parameter_list]
-        method_output = [p.get('parameters', []) for p in method_node.output_parameter_list]
-        element_input_group_name = [element_node.get_parameter_group_name_list() for element_node in element_node_list]
-        element_input = [element_node.get_data_list() for element_node in element_node_list]
-        print(min([len(e) for e in element_input]))
-        # 获取数据
-        if element_index > min([len(e) for e in element_input]):
-            raise Exception(f"数据索引{element_index}超出范围")
-        # real_data = element_input[element_index]
-
-        # 将所有单元模型的参数组字典合并为一个列表
-        real_data_list = {k: v for d in [e.get_data_by_index(element_index) for e in element_node_list] for k, v in d.items()}
-
-        # 使用字典推导式创建新的字典，只包含指定的键
-        matched_input_data = {key: real_data_list[key] for key in method_input_group_name if key in real_data_list}
-        print(f"方法体：{method_body}，方法：{method_name}")
-        print(f"方法模型输入参数组：{method_input_group_name}")
-        print(f"方法模型输出参数组：{method_output_group_name}")
-        print(f"单元模型参数组：{[k for k, v in real_data_list.items()]}")
-        print(f"匹配到{len(matched_input_data)}条输入参数组：{[k for k, v in matched_input_data.items()]}")
-
-        # 提取 matched_data 的值到一个列表
-        real_input_list = list(matched_input_data.values())
-
-        # print(f"参数：{input_par_list}")
-        # print(f"参数值：{input_data_list}")
-
-        print(f"尝试导入方法体")
-        # 获取算法
-        function = get_algorithm_by_path(method_body, method_name)
-        if not function:
-            raise Exception(f"未能导入{method_name}")
-        print(f"成功导入算法: {method_name}")
-
-        # format_input = remove_empty_members(real_input_list)
-
-        # 开始计时
-        start_time = time.time()
-        func_result = function(*real_input_list)
-        format_result = process_function_result(func_result)
-
-        # 结束计时
-        end_time = time.time()
-
-        # 计算耗时
-        execution_time = end_time - start_time
-
-        print(f"算法运行完毕，耗时：{execution_time:.4f}秒")
-        matched_output_data = dict(zip(method_output_group_name, format_result))
-        print(f"匹配到{len(matched_output_data)}条输出参数组：{[k for k, v in matched_output_data.items()]}")
-        # print(f"算法运行匹配结果：{matched_output_data}")
-        for group_name, data in matched_output_data.items():
-            for element_node in element_node_list:
-                element_node.set_parameter_data_by_group_name_index(data_index=element_index, parameter_group_name=group_name, data_list=data)
+    def run(self, id: str, element_index: int, executor: Optional[Union[str, ProcessExecutor]] = None, cancel_event: Optional[threading.Event] = None):
+        """
+        运行指定流程，各阶段耗时记录到 telemetry
+        :param id:唯一标识符
+        :param element_index:
+        :param executor: None在当前进程中运行；"process"或 ProcessExecutor 在进程池中运行（大数组经共享内存传递）
+        :param cancel_event: 算法运行结束时若已被设置，则不写回结果
+        """
+        trace = telemetry.start("procedure", id, element_index)
+        real_input_list = format_result = None
+        try:
+            element_node_list, method_node, method_body, method_name = self._resolve(id)
+            trace.set(method_name=method_name)
+
+            # 处理输入输出参数
+            method_input_group_name = [p.get('group_name', []) for p in method_node.input_parameter_list]
+            method_output_group_name = [p.get('group_name', []) for p in method_node.output_parameter_list]
+            trace.mark("resolve")
+
+            element_index = self._check_data_indices([element_index])[0]
+
+            # 进程池中运行时，列式数值数据以数组传递（较大的数组经共享内存传递，不转换为列表）
+            process_executor = resolve_executor(executor)
+            get_input = get_parameter_data_by_index if process_executor is None else get_parameter_array_by_index
+            # 按名称匹配输入参数组（多个单元模型有同名参数组时以后面的为准）
+            matched_input_data = {key: get_input(group.get('parameter_data'), element_index)
+                                  for key, group in self._match_input_groups(element_node_list, method_input_group_name).items()}
+            if telemetry.verbose:
+                print(f"方法体：{method_body}，方法：{method_name}")
+                print(f"方法模型输入参数组：{method_input_group_name}")
+                print(f"方法模型输出参数组：{method_output_group_name}")
+                print(f"单元模型参数组：{list(dict.fromkeys(g for e in element_node_list for g in e.get_parameter_group_name_list()))}")
+                print(f"匹配到{len(matched_input_data)}条输入参数组：{[k for k, v in matched_input_data.items()]}")
+
+            # 提取 matched_data 的值到一个列表
+            real_input_list = list(matched_input_data.values())
+            trace.mark("match")
+
+            # 获取算法
+            if process_executor is not None:
+                function = process_executor.bind(method_body, method_name)
+            else:
+                function = get_algorithm_by_path(method_body, method_name)
+            if not function:
+                raise Exception(f"未能导入{method_name}")
+            trace.mark("import")
+
+            # format_input = remove_empty_members(real_input_list)
+
+            start_time = time.perf_counter()
+            func_result = _run_algorithm(function, method_body, method_name, real_input_list, self.result_cache, trace)
+            format_result = process_function_result(func_result)
+            execution_time = time.perf_counter() - start_time
+            trace.mark("execute")
+
+            matched_output_data = dict(zip(method_output_group_name, format_result))
+            if telemetry.verbose:
+                print(f"算法运行完毕，耗时：{execution_time:.4f}秒")
+                print(f"匹配到{len(matched_output_data)}条输出参数组：{[k for k, v in matched_output_data.items()]}")
+            if cancel_event is not None and cancel_event.is_set():
+                telemetry.echo(f"{method_name}已取消，结果未写回")
+                trace.set(cancelled=True)
+            else:
+                self.model.element._write_result(element_index, [element_node.id for element_node in element_node_list], matched_output_data)
+                trace.mark("write_back")
+        except BaseException as e:
+            trace.finish(inputs=real_input_list, outputs=format_result, error=e)
+            raise
+        trace.finish(inputs=real_input_list, outputs=format_result)
 
         # logger.info(result)
         return func_result
 
+    def _check_data_indices(self, indices) -> List[int]:
+        """
+        检查数据索引，run 与 run_batch 共用：索引须在 [0, 单元模型数据条数) 内，不支持负数索引
+        :param indices: 数据索引序列
+        :return: 转换为整数的数据索引列表
+        """
+        indices = [int(i) for i in indices]
+        data_count = len(self.model.element.model_data)
+        bad = next((i for i in indices if i < 0 or i >= data_count), None)
+        if bad is not None:
+            raise Exception(f"数据索引{bad}超出范围")
+        return indices
+
+    @staticmethod
+    def _match_input_groups(element_node_list: List[ElementNode], group_name_list: List[str]) -> Dict[str, dict]:
+        """
+        按名称匹配方法模型输入参数组对应的单元参数组，多个单元节点有同名参数组时以列表中靠后的为准
+        :param element_node_list: 关联的单元节点
+        :param group_name_list: 方法模型输入参数组名称
+        :return: 参数组名称 -> 单元参数组（按 group_name_list 的顺序，未匹配到的名称不包含在内）
+        """
+        matched = {}
+        for group_name in group_name_list:
+            for element_node in reversed(element_node_list):
+                group = element_node.find_parameters_by_group(group_name)
+                if group is not None:
+                    matched[group_name] = group
+                    break
+        return matched
+
+    async def run_async(self, id: str, element_index: int, timeout: Optional[float] = None, executor: Optional[Union[str, ProcessExecutor]] = None):
+        """
+        异步运行指定流程，算法在线程（或进程池）中运行，不阻塞事件循环，可用 asyncio.gather 同时等待多个运行
+        超时（asyncio.TimeoutError）或被取消时，已开始的算法在后台运行结束后不再写回结果
+        :param id:唯一标识符
+        :param element_index:数据索引
+        :param timeout: 超时时间（秒），None表示不限
+        :param executor: 同 run
+        """
+        return await _run_in_thread(self.run, timeout, id, element_index, executor=executor)
+
+    def run_batch(self, id: str, indices, workers: Optional[int] = None, executor: Union[str, ProcessExecutor] = "thread") -> list:
+        """
+        对多个数据索引批量运行指定流程：程序解析、算法导入只做一次，结果按参数组批量写回单元节点
+        :param id:唯一标识符
+        :param indices:数据索引序列
+        :param workers:并行数，None或1时在当前线程中依次运行
+        :param executor:并行方式，thread（线程池）/process（workers个进程的进程池，大数组经共享内存传递）/ProcessExecutor
+        :return: 与 indices 一一对应的算法原始返回值
+        """
+        trace = telemetry.start("procedure_batch", id)
+        input_list = func_result_list = None
+        try:
+            element_node_list, method_node, method_body, method_name = self._resolve(id)
+            trace.set(method_name=method_name)
+            indices = self._check_data_indices(indices)
+
+            method_input_group_name = [p.get('group_name', []) for p in method_node.input_parameter_list]
+            method_output_group_name = [p.get('group_name', []) for p in method_node.output_parameter_list]
+            trace.mark("resolve")
+
+            # 参数组只匹配一次，再按索引提取输入数据；进程池中运行时列式数值数据以数组传递
+            use_process = isinstance(executor, ProcessExecutor) or executor == "process"
+            matched_data = [group.get('parameter_data') for group in self._match_input_groups(element_node_list, method_input_group_name).values()]
+            columns = [take_parameter_data(parameter_data, indices, as_array=use_process) for parameter_data in matched_data]
+            input_list = [list(row) for row in zip(*columns)] if columns else [[] for _ in indices]
+            trace.mark("match")
+
+            if use_process:
+                function = None
+            else:
+                function = get_algorithm_by_path(method_body, method_name)
+                if not function:
+                    raise Exception(f"未能导入{method_name}")
+            trace.mark("import")
+
+            func_result_list = [None] * len(indices)
+            pending = list(range(len(indices)))
+            keys = None
+            if self.result_cache is not None:
+                keys = [self.result_cache.fingerprint(method_body, method_name, real_input_list) for real_input_list in input_list]
+                pending = []
+                for i, key in enumerate(keys):
+                    hit, func_result_list[i] = self.result_cache.get(key)
+                    if not hit:
+                        pending.append(i)
+            pending_input_list = [input_list[i] for i in pending]
+
+            if isinstance(executor, ProcessExecutor):
+                pending_result_list = executor.map(method_body, method_name, pending_input_list)
+            elif executor == "process":
+                with ProcessExecutor(max_workers=workers) as process_executor:
+                    pending_result_list = process_executor.map(method_body, method_name, pending_input_list)
+            elif executor != "thread":
+                raise ValueError(f"不支持的并行方式{executor}，请指定thread/process")
+            elif not workers or workers == 1:
+                pending_result_list = [function(*real_input_list) for real_input_list in pending_input_list]
+            else:
+                with ThreadPoolExecutor(max_workers=workers) as pool:
+                    pending_result_list = list(pool.map(lambda real_input_list: function(*real_input_list), pending_input_list))
+            for i, func_result in zip(pending, pending_result_list):
+                func_result_list[i] = func_result
+                if keys is not None:
+                    self.result_cache.put(keys[i], func_result)
+            trace.set(cache_hit=len(pending) < len(indices))
+            trace.mark("execute")
+
+            # 按输出参数组汇总后批量写回；返回值个数少于输出参数组时，每个参数组只写回返回了该项结果的索引（与 run 相同）
+            output_indices = {group_name: [] for group_name in method_output_group_name}
+            output_data = {group_name: [] for group_name in method_output_group_name}
+            for index, func_result in zip(indices, func_result_list):
+                for group_name, data in zip(method_output_group_name, process_function_result(func_result)):
+                    output_indices[group_name].append(index)
+                    output_data[group_name].append(data)
+            # 索引相同的参数组一起写回，通常只需写回一次
+            batches: Dict[tuple, Dict[str, list]] = {}
+            for group_name, group_indices in output_indices.items():
+                if group_indices:
+                    batches.setdefault(tuple(group_indices), {})[group_name] = output_data[group_name]
+            element_id_list = [element_node.id for element_node in element_node_list]
+            for group_indices, group_data in batches.items():
+                self.model.element._write_results(list(group_indices), element_id_list, group_data)
+            trace.mark("write_back")
+        except BaseException as e:
+            trace.finish(inputs=input_list, outputs=func_result_list, error=e)
+            raise
+        record = trace.finish(inputs=input_list, outputs=func_result_list)
+        if record is not None:
+            telemetry.echo(f"{method_name}批量运行{len(indices)}次完毕（其中{len(indices) - len(pending)}次使用缓存结果），耗时：{record.total_ns / 1e9:.4f}秒")
+        return func_result_list
+
+    def run_all(self, element_index: int, workers: Optional[int] = None, changed: Optional[List[str]] = None) -> dict:
+        """
+        按依赖关系运行所有过程模型，相互独立的过程并行运行，各过程耗时见 scheduler.get_timings_df()
+        :param element_index:数据索引
+        :param workers:并行数，None或1时依次运行
+        :param changed:只重新运行受这些过程名称/参数组名称影响的过程及其下游
+        :return: 过程名称 -> 算法返回值
+        """
+        return self.scheduler.run(element_index, workers=workers, changed=changed)
+
     def to_json(self):
         """
         获取过程模型所有数据（json)
@@ -1642,22 +2648,141 @@ class Procedure(IndustryModel):
 
 
 class Model:
-    def __init__(self):
-        self.element = Element()
+    def __init__(self, columnar: bool = False):
+        """
+        :param columnar: 单元模型参数数据是否使用列式存储（大批量数据时显著降低内存占用）
+        """
+        self.element = Element(columnar=columnar)
         self.method = Method()
         self.procedure = Procedure(self)
+        self.journal: Optional[ModelJournal] = None
+        self._compaction: Optional[threading.Thread] = None
 
-    def to_json(self):
-        r_json = {
-            "element": self.element.to_json(),
+    def save(self, path: Union[str, os.PathLike]) -> Path:
+        """
+        保存二进制快照（树结构+参数元数据+参数数据），列式数值参数数据保存为可内存映射的npy文件
+        :param path: 快照目录；与已启用的变更日志目录相同时等同于 compact()
+        """
+        if self.journal is not None and Path(path).resolve() == self.journal.path.resolve():
+            self.compact()
+            return self.journal.path
+        return save_model(self, path)
+
+    @classmethod
+    def load(cls, path: Union[str, os.PathLike], mmap: bool = True, replay: bool = True) -> "Model":
+        """
+        从二进制快照加载模型。快照数据与变更日志以 pickle 读取，可执行任意代码，只能加载可信来源的快照目录
+        :param path: 快照目录
+        :param mmap: 是否内存映射数值参数数据（按需分页读取，修改不会写回快照）；
+                     单元节点字典形式的数值参数数据映射后以列式存储（ColumnarParameterData）加载，节点随之改为列式存储
+        :param replay: 是否重放快照之后的变更日志
+        """
+        model = load_model(cls(), path, mmap=mmap)
+        if replay:
+            replay_journal(model, path)
+        return model
+
+    # region 结果缓存
+    def enable_result_cache(self, max_size: int = 128, path: Optional[Union[str, os.PathLike]] = None) -> ResultCache:
+        """
+        启用算法结果缓存：程序文件与输入数据均未变化时，方法/过程模型运行直接使用上次的结果
+        :param max_size: 内存中保存的结果数量
+        :param path: 磁盘缓存目录，None时只缓存在内存中
+        """
+        result_cache = ResultCache(max_size=max_size, path=path)
+        self.method.result_cache = result_cache
+        self.procedure.result_cache = result_cache
+        return result_cache
+
+    def disable_result_cache(self) -> None:
+        """
+        关闭算法结果缓存
+        """
+        self.method.result_cache = None
+        self.procedure.result_cache = None
+
+    # endregion
+
+    # region 变更日志
+    def _set_journal(self, journal: Optional[ModelJournal]) -> None:
+        self.journal = journal
+        for industry_model in (self.element, self.method, self.procedure):
+            industry_model.journal = journal
+
+    def enable_journal(self, path: Union[str, os.PathLike], save: bool = True, fsync: bool = False) -> ModelJournal:
+        """
+        启用变更日志：之后通过模型方法进行的修改（创建/删除节点、设置参数、写入数据、关联、运行结果）
+        以追加方式写入日志，不必重写整个快照。直接修改节点对象或调用以节点为参数的静态方法不会被记录。
+        :param path: 快照目录
+        :param save: 是否先保存一份新快照；刚以 Model.load(path) 加载且尚未修改时可设为False，续写已有日志
+        :param fsync: 每条记录后是否同步到磁盘
+        """
+        self.disable_journal()
+        journal = open_journal(self, path, save=save, fsync=fsync)
+        self._set_journal(journal)
+        return journal
+
+    def disable_journal(self) -> None:
+        """
+        关闭变更日志
+        """
+        self.wait_compaction()
+        if self.journal is not None:
+            self.journal.close()
+        self._set_journal(None)
+
+    def compact(self, background: bool = False) -> Optional[threading.Thread]:
+        """
+        将当前模型压缩为新快照并清空变更日志
+        :param background: 是否在后台线程写入文件（模型状态仍在当前线程中收集）
+        :return: 后台写入线程
+        """
+        if self.journal is None:
+            raise Exception("未启用变更日志")
+        # 同一目录的压缩按顺序提交
+        self.wait_compaction()
+        self._compaction = compact(self, self.journal, background=background)
+        return self._compaction
+
+    def wait_compaction(self) -> None:
+        """
+        等待后台压缩完成
+        """
+        if self._compaction is not None:
+            self._compaction.join()
+            self._compaction = None
+
+    # endregion
+
+    def _to_lazy_json(self) -> dict:
+        return {
+            "element": self.element.to_json(lazy=True),
             "method": self.method.to_json(),
             "procedure": self.procedure.to_json(),
         }
-        current_working_directory = Path.cwd()
-        path = Path(current_working_directory)
-        # 指定保存路径
-        save_path = path / "data.json"
-        # 将数据写入文件
-        with save_path.open('w', encoding='utf-8') as f:
-            json.dump(r_json, f, ensure_ascii=False, indent=4)
-        return json.dumps(r_json)
+
+    def dump_json(self, fp: TextIO, indent: Optional[int] = None) -> None:
+        """
+        按单元、方法、过程模型的顺序流式写入JSON，不在内存中构造完整文本
+        :param fp: 可写的文本文件对象
+        :param indent: 缩进空格数
+        """
+        dump_json(self._to_lazy_json(), fp, indent=indent)
+
+    def to_json(self, fp: Optional[TextIO] = None, return_string: bool = True) -> Optional[str]:
+        """
+        导出模型JSON，流式写入，不在内存中构造完整文本
+        :param fp: 写入的文本文件对象，默认写入当前工作目录下的 data.json
+        :param return_string: 是否同时返回紧凑格式（与 json.dumps 相同）的JSON字符串，导出大模型时建议设为False
+        """
+        if fp is None:
+            # 指定保存路径
+            save_path = Path.cwd() / "data.json"
+            # 将数据写入文件
+            with save_path.open('w', encoding='utf-8') as f:
+                dump_json(self._to_lazy_json(), f, indent=4)
+        else:
+            dump_json(self._to_lazy_json(), fp, indent=4)
+        if not return_string:
+            return None
+        return "".join(iter_json(self._to_lazy_json(), ensure_ascii=True))
@@ -1,10 +1,8 @@
-from .utils import SnowflakeIDGenerator
+from imkernel.utils import idgen
 from . import NodeBase
 from . import TreeBase
 import pandas as pd
 
-id_generator = SnowflakeIDGenerator(datacenter_id=1, worker_id=1)
-
 
 class SubType:
     def __init__(self, subtype_name):
@@ -14,14 +12,14 @@ class SubType:
 class ParameterProperty:
     # 参数特性
     def __init__(self, name):
-        self.id = id_generator.generate_id()
+        self.id = idgen.next_id()
         self.name = name
 
 
 class Parameter:
     # 参数
     def __init__(self, name):
-        self.id: int = id_generator.generate_id()
+        self.id: int = idgen.next_id()
         self.name: str = name
         self.property_list: list[ParameterProperty] = []
 
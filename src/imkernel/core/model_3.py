@@ -9,35 +9,58 @@ from imkernel.utils import idgen
 from imkernel.utils.tree_utils import tree_to_df
 
 
+def _count_nodes(name, subname) -> int:
+    """
+    统计 system 需要创建的节点数，用于一次性预留ID
+    """
+    count = 1
+    if isinstance(name, str):
+        count += 1
+        if isinstance(subname, str):
+            count += 1
+        elif isinstance(subname, list):
+            count += sum(1 for sub in subname if sub is not None)
+    elif isinstance(name, list) and isinstance(subname, list):
+        for sub_list in subname[:len(name)]:
+            count += 1
+            if isinstance(sub_list, str):
+                count += 1
+            elif isinstance(sub_list, list):
+                count += len(sub_list)
+    return count
+
+
 def system(supname, name, subname) -> Tree:
     tree = Tree()
-    sup_node = tree.create_node(supname, idgen.next_id(), None, data=SUPER_MODEL_NAME)
+    # 所有节点的ID一次预留
+    next_id = iter(idgen.next_ids(_count_nodes(name, subname))).__next__
+    sup_node = tree.create_node(supname, next_id(), None, data=SUPER_MODEL_NAME)
 
     if isinstance(name, str):
         if not (isinstance(subname, str) or isinstance(subname, list)):
             raise ValueError("name为字符串时，subname必须是字符串或列表.")
-        sys_node = tree.create_node(name, idgen.next_id(), sup_node.identifier, data=SYSTEM_MODEL_NAME)
+        sys_node = tree.create_node(name, next_id(), sup_node.identifier, data=SYSTEM_MODEL_NAME)
         if isinstance(subname, str):
-            tree.create_node(subname, idgen.next_id(), sys_node.identifier, data=SUB_MODEL_NAME)
+            tree.create_node(subname, next_id(), sys_node.identifier, data=SUB_MODEL_NAME)
         elif isinstance(subname, list):
             for sub in subname:
                 if sub is not None:
-                    tree.create_node(sub, idgen.next_id(), sys_node.identifier, data=SUB_MODEL_NAME)
+                    tree.create_node(sub, next_id(), sys_node.identifier, data=SUB_MODEL_NAME)
     elif isinstance(name, list):
         if not isinstance(subname, list):
             raise ValueError("name为列表时，subname必须是对应长度的列表.")
         if len(name) != len(subname):
             raise ValueError(f"name与subname长度不匹配: name长度：{len(name)}, subname长度：{len(subname)}.")
         for i, sys in enumerate(name):
-            sys_node = tree.create_node(sys, idgen.next_id(), sup_node.identifier, data=SYSTEM_MODEL_NAME)
+            sys_node = tree.create_node(sys, next_id(), sup_node.identifier, data=SYSTEM_MODEL_NAME)
             sub_list = subname[i]
             if sub_list is None:
                 continue
             if isinstance(sub_list, str):
-                tree.create_node(sub_list, idgen.next_id(), sys_node.identifier, data=SUB_MODEL_NAME)
+                tree.create_node(sub_list, next_id(), sys_node.identifier, data=SUB_MODEL_NAME)
             elif isinstance(sub_list, list):
                 for sub in sub_list:
-                    tree.create_node(sub, idgen.next_id(), sys_node.identifier, data=SUB_MODEL_NAME)
+                    tree.create_node(sub, next_id(), sys_node.identifier, data=SUB_MODEL_NAME)
             else:
                 raise ValueError(f"subname的元素必须是None或列表，第{i + 1}个数组类型为{type(sub_list).__name__}")
     else:
@@ -8,6 +8,8 @@ class Node:
     树节点基类
     """
 
+    __slots__ = ("id", "name", "node_type", "parent", "parent_id", "children")
+
     def __init__(self, id, name, node_type, parent: Optional['Node'] = None):
         self.id = id
         self.name = name
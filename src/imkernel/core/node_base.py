@@ -6,6 +6,9 @@ class NodeBase:
     树节点基类
     """
 
+    # 使用 __slots__ 而不是实例字典，大型树中每个节点可节省一半以上内存；子类需声明各自的 __slots__
+    __slots__ = ("id", "desc", "data", "parent", "children")
+
     def __init__(self, identification: str, desc: str = None, data=None):
         """
         初始化
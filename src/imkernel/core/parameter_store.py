@@ -0,0 +1,296 @@
+from collections.abc import MutableMapping
+from typing import Any, Iterator, Optional
+
+import numpy as np
+
+
+class ColumnarParameterData(MutableMapping):
+    """
+    列式参数数据存储，一个参数组的所有数据索引共用一块连续的NumPy数组，并用有效位掩码标记缺失的索引。
+    对外保持与 {str(data_index): data_list} 字典相同的读写方式，原有的取值方法无需修改。
+    数据为形状一致、元素类型相同的数值列表（或数值数组）时使用定长数值数组，读取时转换为列表，修改读取结果不影响已保存的数据；
+    出现不规则、非数值或元素类型不同（如整数与浮点数混合）的数据时退化为对象数组，保证读取的值与写入时的类型一致。
+    """
+
+    # 数值型数组允许的dtype类别（布尔、有符号整数、无符号整数、浮点）
+    NUMERIC_KINDS = "biuf"
+
+    def __init__(self, capacity: int = 0):
+        """
+        初始化
+        :param capacity: 预分配的数据索引数量
+        """
+        self._capacity = max(int(capacity), 0)
+        self._values: Optional[np.ndarray] = None
+        self._mask = np.zeros(self._capacity, dtype=bool)
+        self._count = 0
+
+    @classmethod
+    def from_arrays(cls, values: np.ndarray, mask: np.ndarray) -> "ColumnarParameterData":
+        """
+        由已有数组构造（数组不拷贝，可为内存映射数组）
+        :param values: 数据数组，第一维为数据索引
+        :param mask: 有效位掩码
+        """
+        if len(values) != len(mask):
+            raise ValueError("数据数组与掩码长度不一致")
+        store = cls()
+        store._values = values
+        store._mask = np.asarray(mask, dtype=bool)
+        store._capacity = len(mask)
+        store._count = int(np.count_nonzero(store._mask))
+        return store
+
+    # region 存储管理
+    @property
+    def is_numeric(self) -> bool:
+        """
+        当前是否为定长数值数组存储
+        """
+        return self._values is not None and self._values.dtype.kind in self.NUMERIC_KINDS
+
+    @property
+    def array(self) -> Optional[np.ndarray]:
+        """
+        底层数据数组（不拷贝），第一维为数据索引，长度为当前容量
+        """
+        return self._values
+
+    @property
+    def mask(self) -> np.ndarray:
+        """
+        有效位掩码（不拷贝），mask[i] 为 True 表示第i条数据存在
+        """
+        return self._mask
+
+    @property
+    def size(self) -> int:
+        """
+        最大数据索引+1（包括中间缺失的索引）
+        """
+        valid = np.flatnonzero(self._mask)
+        return int(valid[-1]) + 1 if len(valid) else 0
+
+    def _grow(self, index: int) -> None:
+        """
+        扩容至可容纳指定索引，容量按倍数增长
+        :param index: 数据索引
+        """
+        if index < self._capacity:
+            return
+        new_capacity = max(index + 1, self._capacity * 2, 8)
+        mask = np.zeros(new_capacity, dtype=bool)
+        mask[:self._capacity] = self._mask
+        self._mask = mask
+        if self._values is not None:
+            values = self._empty(new_capacity, self._values.dtype, self._values.shape[1:])
+            values[:self._capacity] = self._values
+            self._values = values
+        self._capacity = new_capacity
+
+    @staticmethod
+    def _empty(capacity: int, dtype, shape: tuple) -> np.ndarray:
+        if np.dtype(dtype).kind == "O":
+            return np.full((capacity,) + tuple(shape), None, dtype=object)
+        return np.zeros((capacity,) + tuple(shape), dtype=dtype)
+
+    def _to_object(self) -> None:
+        """
+        退化为对象数组，已有数据逐条转换为Python列表保存
+        """
+        values = np.full(self._capacity, None, dtype=object)
+        if self._values is not None:
+            for i in np.flatnonzero(self._mask):
+                values[i] = self._values[i].tolist()
+        self._values = values
+
+    @staticmethod
+    def _scalar_type(data_list) -> Optional[type]:
+        """
+        列表（可嵌套）中所有元素的共同类型，类型不同或不是列表时返回None
+        """
+        if not isinstance(data_list, list):
+            return None
+        found = None
+        stack = [data_list]
+        while stack:
+            for item in stack.pop():
+                if isinstance(item, list):
+                    stack.append(item)
+                elif found is None:
+                    found = type(item)
+                elif type(item) is not found:
+                    return None
+        return found
+
+    @classmethod
+    def _as_sample(cls, data_list) -> Optional[np.ndarray]:
+        """
+        将一条数据转换为数值数组，无法转换（不规则、非数值或元素类型不同）时返回None
+        """
+        if isinstance(data_list, np.ndarray):
+            sample = data_list
+        else:
+            # 转换为数组会统一元素类型（如 [1, 2.5] 变为浮点数），类型不同时不转换
+            if cls._scalar_type(data_list) is None:
+                return None
+            try:
+                sample = np.asarray(data_list)
+            except (ValueError, TypeError):
+                return None
+        if sample.dtype.kind not in cls.NUMERIC_KINDS:
+            return None
+        return sample
+
+    def _prepare(self, sample: Optional[np.ndarray]) -> None:
+        """
+        根据即将写入的数据调整底层数组的类型与形状
+        :param sample: 数值数组，None表示只能以对象形式保存
+        """
+        if self._values is None:
+            if sample is None:
+                self._values = np.full(self._capacity, None, dtype=object)
+            else:
+                self._values = self._empty(self._capacity, sample.dtype, sample.shape)
+            return
+        if not self.is_numeric:
+            return
+        if sample is None or sample.shape != self._values.shape[1:] or sample.dtype.kind != self._values.dtype.kind:
+            # 类别不同（如整数与浮点数）时不提升类型，否则已写入的数据读取后类型会改变
+            self._to_object()
+            return
+        dtype = np.result_type(self._values.dtype, sample.dtype)
+        if dtype != self._values.dtype:
+            self._values = self._values.astype(dtype)
+
+    # endregion
+
+    # region 字典接口
+    @staticmethod
+    def _to_index(key) -> int:
+        index = int(key)
+        if index < 0:
+            raise KeyError(key)
+        return index
+
+    def __setitem__(self, key, data_list) -> None:
+        index = self._to_index(key)
+        self._grow(index)
+        sample = self._as_sample(data_list)
+        self._prepare(sample)
+        self._values[index] = sample if self.is_numeric else data_list
+        if not self._mask[index]:
+            self._mask[index] = True
+            self._count += 1
+
+    def __getitem__(self, key) -> Any:
+        try:
+            index = self._to_index(key)
+        except (TypeError, ValueError):
+            raise KeyError(key)
+        if index >= self._capacity or not self._mask[index]:
+            raise KeyError(key)
+        value = self._values[index]
+        return value.tolist() if self.is_numeric else value
+
+    def __delitem__(self, key) -> None:
+        index = self._to_index(key)
+        if index >= self._capacity or not self._mask[index]:
+            raise KeyError(key)
+        self._mask[index] = False
+        self._count -= 1
+        if not self.is_numeric:
+            self._values[index] = None
+
+    def __contains__(self, key) -> bool:
+        try:
+            index = self._to_index(key)
+        except (TypeError, ValueError, KeyError):
+            return False
+        return index < self._capacity and bool(self._mask[index])
+
+    def __iter__(self) -> Iterator[str]:
+        for index in np.flatnonzero(self._mask):
+            yield str(index)
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __repr__(self) -> str:
+        return f"ColumnarParameterData(count={self._count}, capacity={self._capacity}, numeric={self.is_numeric})"
+
+    # endregion
+
+    # region 列式访问
+    def get_array(self, key, default=None) -> Any:
+        """
+        取一条数据，数值存储时返回底层数组的视图（不转换为列表、不拷贝），其余与 get 相同
+        :param key: 数据索引
+        :param default: 不存在时的返回值
+        """
+        try:
+            index = self._to_index(key)
+        except (TypeError, ValueError, KeyError):
+            return default
+        if index >= self._capacity or not self._mask[index]:
+            return default
+        return self._values[index]
+
+    def update_many(self, indices, data_list_list) -> None:
+        """
+        批量写入多条数据，数值数组且形状一致时整体赋值
+        :param indices: 数据索引序列
+        :param data_list_list: 与索引一一对应的数据（第一维为数据条数）
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        if len(indices) == 0:
+            return
+        if indices.min() < 0:
+            raise KeyError(int(indices.min()))
+        block = data_list_list if isinstance(data_list_list, np.ndarray) else None
+        if block is None or block.dtype.kind not in self.NUMERIC_KINDS or len(block) != len(indices):
+            for index, data_list in zip(indices.tolist(), data_list_list):
+                self[index] = data_list
+            return
+        self._grow(int(indices.max()))
+        self._prepare(block[0])
+        if self.is_numeric:
+            self._values[indices] = block
+        else:
+            for index, row in zip(indices.tolist(), block.tolist()):
+                self._values[index] = row
+        self._mask[indices] = True
+        self._count = int(np.count_nonzero(self._mask))
+
+    def take(self, indices) -> tuple[np.ndarray, np.ndarray]:
+        """
+        按数据索引批量取值（数值存储时不经过Python循环）
+        :param indices: 数据索引序列
+        :return: (数据数组, 有效位掩码)，超出容量或缺失的位置掩码为False
+        """
+        indices = np.asarray(indices, dtype=np.int64)
+        in_range = (indices >= 0) & (indices < self._capacity)
+        safe = np.where(in_range, indices, 0)
+        valid = in_range & self._mask[safe] if self._capacity else np.zeros(len(indices), dtype=bool)
+        if self._values is None:
+            return np.full(len(indices), None, dtype=object), valid
+        return self._values[safe], valid
+
+    def to_object_array(self, length: Optional[int] = None) -> np.ndarray:
+        """
+        转换为按数据索引对齐的一维对象数组，缺失位置为None，可直接作为DataFrame的一列
+        :param length: 数组长度，默认为 size
+        """
+        length = self.size if length is None else length
+        result = np.full(length, None, dtype=object)
+        if self._values is None:
+            return result
+        valid = np.flatnonzero(self._mask[:length])
+        if self.is_numeric:
+            # 整块切片后一次转换为列表
+            result[valid] = np.fromiter(self._values[valid].tolist(), dtype=object, count=len(valid))
+        else:
+            result[valid] = self._values[valid]
+        return result
+
+    # endregion
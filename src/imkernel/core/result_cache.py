@@ -0,0 +1,183 @@
+import copy
+import hashlib
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Optional, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """
+    算法运行结果缓存：以程序文件（路径、修改时间、大小）、函数名及输入数据计算指纹，
+    输入完全相同时直接返回上次的结果。内存中按LRU淘汰，可选同时保存到磁盘目录。
+    结果以序列化后的字节保存，每次命中返回新的副本，修改节点数据不会影响缓存及其他命中。
+    """
+
+    def __init__(self, max_size: int = 128, path: Optional[Union[str, os.PathLike]] = None):
+        """
+        :param max_size: 内存中保存的结果数量
+        :param path: 磁盘缓存目录，None时只缓存在内存中
+        """
+        self.max_size = max(int(max_size), 0)
+        self.path = Path(path) if path is not None else None
+        if self.path is not None:
+            self.path.mkdir(parents=True, exist_ok=True)
+        self._results: "OrderedDict[str, Tuple[bool, Any]]" = OrderedDict()  # 指纹 -> (是否为pickle字节, 结果)
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    # region 指纹
+    @classmethod
+    def fingerprint(cls, method_body: str, method_name: str, inputs) -> str:
+        """
+        计算一次运行的指纹
+        :param method_body: 算法文件路径
+        :param method_name: 算法函数名
+        :param inputs: 输入参数列表
+        """
+        h = hashlib.blake2b(digest_size=20)
+        path = os.path.abspath(method_body)
+        stat = os.stat(path)
+        h.update(f"{path}\0{stat.st_mtime_ns}\0{stat.st_size}\0{method_name}\0".encode("utf-8"))
+        cls._update(h, inputs)
+        return h.hexdigest()
+
+    @classmethod
+    def _update(cls, h, obj) -> None:
+        if isinstance(obj, np.ndarray) and obj.dtype.kind in "biufc":
+            h.update(f"nd:{obj.dtype.str}:{obj.shape}:".encode("utf-8"))
+            # 连续数组直接哈希底层缓冲区，不拷贝
+            h.update(memoryview(np.ascontiguousarray(obj)).cast("B"))
+        elif isinstance(obj, np.ndarray):
+            h.update(f"ndo:{obj.shape}[".encode("utf-8"))
+            for item in obj.ravel():
+                cls._update(h, item)
+            h.update(b"]")
+        elif isinstance(obj, (list, tuple)):
+            h.update(f"{type(obj).__name__}:{len(obj)}[".encode("utf-8"))
+            for item in obj:
+                cls._update(h, item)
+            h.update(b"]")
+        elif isinstance(obj, Mapping):
+            h.update(f"map:{len(obj)}{{".encode("utf-8"))
+            for key in sorted(obj, key=str):
+                cls._update(h, key)
+                cls._update(h, obj[key])
+            h.update(b"}")
+        elif isinstance(obj, (str, int, float, bool, complex, type(None), np.generic)):
+            h.update(f"{type(obj).__name__}:{obj!r};".encode("utf-8"))
+        elif isinstance(obj, bytes):
+            h.update(f"bytes:{len(obj)}:".encode("utf-8"))
+            h.update(obj)
+        else:
+            h.update(b"pickle:")
+            h.update(pickle.dumps(obj, protocol=pickle.HIGHEST_PROTOCOL))
+
+    # endregion
+
+    # region 读写
+    @staticmethod
+    def _freeze(result) -> Tuple[bool, Any]:
+        """
+        结果转为缓存中保存的形式：优先序列化为字节，无法序列化时保存深拷贝
+        """
+        try:
+            return True, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError):
+            return False, copy.deepcopy(result)
+
+    @staticmethod
+    def _thaw(frozen: Tuple[bool, Any]):
+        """
+        由缓存中保存的形式创建结果的新副本
+        """
+        is_bytes, value = frozen
+        return pickle.loads(value) if is_bytes else copy.deepcopy(value)
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        查找结果
+        :param key: 指纹
+        :return: (是否命中, 结果的副本)
+        """
+        with self._lock:
+            frozen = self._results.get(key)
+            if frozen is not None:
+                self._results.move_to_end(key)
+                self.hits += 1
+        if frozen is not None:
+            return True, self._thaw(frozen)
+        if self.path is not None:
+            file_path = self.path / f"{key}.pkl"
+            try:
+                data = file_path.read_bytes()
+                result = pickle.loads(data)
+            except OSError:
+                pass
+            except (EOFError, pickle.UnpicklingError) as e:
+                logger.warning(f"磁盘缓存文件已损坏，忽略：{file_path}（{e}）")
+            else:
+                self._remember(key, (True, data))
+                with self._lock:
+                    self.hits += 1
+                return True, result
+        with self._lock:
+            self.misses += 1
+        return False, None
+
+    def put(self, key: str, result) -> None:
+        """
+        保存结果的副本
+        :param key: 指纹
+        :param result: 算法返回值
+        """
+        is_bytes, value = frozen = self._freeze(result)
+        self._remember(key, frozen)
+        if self.path is not None:
+            if not is_bytes:
+                logger.warning(f"结果无法保存到磁盘缓存: {type(result).__name__} 不支持序列化")
+                return
+            file_path = self.path / f"{key}.pkl"
+            tmp_path = self.path / f"{key}.{threading.get_ident()}.tmp"
+            try:
+                tmp_path.write_bytes(value)
+                os.replace(tmp_path, file_path)
+            except OSError as e:
+                logger.warning(f"结果无法保存到磁盘缓存: {e}")
+                tmp_path.unlink(missing_ok=True)
+
+    def _remember(self, key: str, frozen: Tuple[bool, Any]) -> None:
+        if not self.max_size:
+            return
+        with self._lock:
+            self._results[key] = frozen
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_size:
+                self._results.popitem(last=False)
+
+    def clear(self, disk: bool = False) -> None:
+        """
+        清空缓存
+        :param disk: 是否同时删除磁盘缓存文件
+        """
+        with self._lock:
+            self._results.clear()
+            self.hits = 0
+            self.misses = 0
+        if disk and self.path is not None:
+            for file_path in self.path.glob("*.pkl"):
+                file_path.unlink(missing_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    # endregion
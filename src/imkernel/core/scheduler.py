@@ -0,0 +1,168 @@
+import time
+from collections import defaultdict, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterable, List, Optional, Set
+
+import pandas as pd
+
+
+class ProcedureScheduler:
+    """
+    过程模型调度器：根据方法模型输出参数组与输入参数组在关联单元节点上的匹配关系建立依赖图（DAG），
+    按依赖顺序运行各过程节点，相互独立的分支并行运行。
+    """
+
+    def __init__(self, procedure):
+        """
+        :param procedure: 过程模型 Procedure
+        """
+        self.procedure = procedure
+        # 过程节点ID -> 下游节点ID集合
+        self.edges: Dict[str, Set[str]] = {}
+        # 过程节点ID -> 读取/写入的 (单元节点ID, 参数组名称)
+        self.reads: Dict[str, Set[tuple]] = {}
+        self.writes: Dict[str, Set[tuple]] = {}
+        # 树中的先后顺序，无数据依赖但写入同一参数组时按此顺序运行
+        self.order: List[str] = []
+        # 过程节点ID -> 在 order 中的位置
+        self.position: Dict[str, int] = {}
+        # 最近一次运行各节点的耗时（秒）
+        self.timings: Dict[str, float] = {}
+
+    def build(self) -> Dict[str, Set[str]]:
+        """
+        根据当前的关联关系重新建立依赖图，未关联单元/方法模型的过程节点不参与调度
+        :return: 过程节点ID -> 下游节点ID集合
+        """
+        self.order, self.position, self.reads, self.writes = [], {}, {}, {}
+        for node in self.procedure.tree.get_no_tag_nodes():
+            if node.element_node is None or node.method_node is None:
+                continue
+            input_group = [p["group_name"] for p in node.method_node.input_parameter_list]
+            output_group = [p["group_name"] for p in node.method_node.output_parameter_list]
+            self.position[node.id] = len(self.order)
+            self.order.append(node.id)
+            self.reads[node.id] = {(e.id, g) for e in node.element_node for g in input_group if e.find_parameters_by_group(g) is not None}
+            self.writes[node.id] = {(e.id, g) for e in node.element_node for g in output_group if e.find_parameters_by_group(g) is not None}
+
+        # 按 (单元节点ID, 参数组名称) 索引读写的节点，只比较读写同一参数组的节点对
+        readers, writers = defaultdict(set), defaultdict(set)
+        for i in self.order:
+            for key in self.reads[i]:
+                readers[key].add(i)
+            for key in self.writes[i]:
+                writers[key].add(i)
+
+        self.edges = {i: set() for i in self.order}
+        for a in self.order:
+            related = set()
+            for key in self.writes[a]:
+                related |= readers[key] | writers[key]
+            for key in self.reads[a]:
+                related |= writers[key]
+            # 每对节点只在靠前的节点处比较一次，按树中顺序比较（相互依赖时报告的节点对与逐对比较相同）
+            for b in sorted((b for b in related if self.position[b] > self.position[a]), key=self.position.get):
+                a_to_b = self.writes[a] & self.reads[b]
+                b_to_a = self.writes[b] & self.reads[a]
+                if a_to_b and b_to_a:
+                    raise Exception(f"过程模型{a}与{b}相互依赖")
+                if a_to_b:
+                    self.edges[a].add(b)
+                elif b_to_a:
+                    self.edges[b].add(a)
+                elif self.writes[a] & self.writes[b]:
+                    self.edges[a].add(b)
+        self.topological_order(self.order)
+        return self.edges
+
+    def topological_order(self, ids: Iterable[str]) -> List[str]:
+        """
+        指定节点在依赖图中的运行顺序
+        :param ids: 过程节点ID
+        """
+        ids = set(ids)
+        indegree = self._indegree(ids)
+        ready = deque(i for i in self.order if i in ids and indegree[i] == 0)
+        result = []
+        while ready:
+            node_id = ready.popleft()
+            result.append(node_id)
+            for child in sorted(self.edges[node_id] & ids, key=self.position.get):
+                indegree[child] -= 1
+                if indegree[child] == 0:
+                    ready.append(child)
+        if len(result) != len(ids):
+            raise Exception(f"过程模型存在循环依赖：{sorted(ids - set(result))}")
+        return result
+
+    def _indegree(self, ids: Set[str]) -> Dict[str, int]:
+        indegree = {i: 0 for i in ids}
+        for parent in ids:
+            for child in self.edges[parent] & ids:
+                indegree[child] += 1
+        return indegree
+
+    def downstream(self, changed: Iterable[str]) -> List[str]:
+        """
+        受修改影响的过程节点（含下游），按运行顺序返回
+        :param changed: 过程节点ID，或被修改的单元参数组名称（读取该参数组的过程节点视为受影响）
+        """
+        changed = set(changed)
+        start = {i for i in self.order if i in changed or any(g in changed for _, g in self.reads[i])}
+        stack, affected = list(start), set(start)
+        while stack:
+            for child in self.edges[stack.pop()]:
+                if child not in affected:
+                    affected.add(child)
+                    stack.append(child)
+        return self.topological_order(affected)
+
+    def run(self, element_index: int, workers: Optional[int] = None, changed: Optional[Iterable[str]] = None) -> Dict[str, object]:
+        """
+        按依赖顺序运行过程模型
+        :param element_index: 单元数据索引
+        :param workers: 并行数，None或1时依次运行
+        :param changed: 只重新运行受这些过程节点ID/参数组名称影响的子图，None时运行全部
+        :return: 过程节点ID -> 算法返回值
+        """
+        self.build()
+        ids = self.order if changed is None else self.downstream(changed)
+        self.timings = {}
+        if not workers or workers == 1:
+            return {node_id: self._run_node(node_id, element_index) for node_id in self.topological_order(ids)}
+
+        ids = set(ids)
+        indegree = self._indegree(ids)
+        results = {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            running = {pool.submit(self._run_node, i, element_index): i for i in self.order if i in ids and indegree[i] == 0}
+            while running:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    node_id = running.pop(future)
+                    # 出错时不再提交新节点，等待已提交的节点结束后抛出
+                    results[node_id] = future.result()
+                    for child in self.edges[node_id] & ids:
+                        indegree[child] -= 1
+                        if indegree[child] == 0:
+                            running[pool.submit(self._run_node, child, element_index)] = child
+        return results
+
+    def _run_node(self, node_id: str, element_index: int):
+        start_time = time.perf_counter()
+        result = self.procedure.run(node_id, element_index)
+        self.timings[node_id] = time.perf_counter() - start_time
+        return result
+
+    def get_timings_df(self) -> pd.DataFrame:
+        """
+        最近一次运行各过程节点的耗时
+        """
+        return pd.DataFrame(list(self.timings.items()), columns=["procedure name", "time"])
+
+    def get_dependency_df(self) -> pd.DataFrame:
+        """
+        依赖关系
+        """
+        self.build()
+        return pd.DataFrame([[i, sorted(self.edges[i], key=self.position.get)] for i in self.order], columns=["procedure name", "downstream"])
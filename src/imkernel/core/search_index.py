@@ -0,0 +1,171 @@
+"""
+文本搜索索引
+
+对节点ID、描述等短文本建立字符 n-gram 倒排索引（单字 + 双字），按字符切分，中文无需分词。
+倒排表按添加顺序保存，子串查询遍历最短的倒排表并在其余倒排表中判断，再逐个校验，取够数量即停止；前缀查询额外使用文本开头标记的 n-gram；
+模糊查询按查询串 n-gram 在文本中出现的比例打分。
+"""
+import math
+from itertools import islice
+from typing import Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple
+
+# 文本开头标记，用于前缀查询
+_START = "\x02"
+
+
+def _grams(text: str) -> Set[str]:
+    """
+    文本的单字与双字集合（含开头标记的双字）
+    """
+    grams = set(text)
+    marked = _START + text
+    grams.update(marked[i:i + 2] for i in range(len(marked) - 1))
+    return grams
+
+
+def _query_grams(query: str) -> Set[str]:
+    """
+    查询所需的 n-gram：长度大于1时只用双字
+    """
+    if len(query) == 1:
+        return {query}
+    return {query[i:i + 2] for i in range(len(query) - 1)}
+
+
+class SearchIndex:
+    """
+    n-gram 倒排索引，键为节点ID，值为被索引的文本
+    """
+
+    def __init__(self):
+        self._texts: Dict[Hashable, str] = {}  # 键 -> 原始文本
+        self._folded: Dict[Hashable, str] = {}  # 键 -> 小写化的文本
+        self._order: Dict[Hashable, int] = {}  # 键 -> 添加顺序，用于结果排序
+        self._postings: Dict[str, Dict[Hashable, None]] = {}
+        self._counter = 0
+
+    def add(self, key: Hashable, text: Optional[str]) -> None:
+        """
+        添加或更新文本，text为None时只移除旧文本
+        :param key: 键
+        :param text: 文本
+        """
+        if key in self._texts:
+            self.remove(key)
+        if text is None:
+            return
+        text = str(text)
+        folded = text.casefold()
+        self._texts[key] = text
+        self._folded[key] = folded
+        self._order[key] = self._counter
+        self._counter += 1
+        for gram in _grams(folded):
+            # 倒排表使用字典，保持键的添加顺序
+            self._postings.setdefault(gram, {})[key] = None
+
+    def remove(self, key: Hashable) -> None:
+        """
+        移除文本，键不存在时忽略
+        """
+        folded = self._folded.pop(key, None)
+        if folded is None:
+            return
+        del self._texts[key]
+        del self._order[key]
+        for gram in _grams(folded):
+            posting = self._postings.get(gram)
+            if posting is not None:
+                posting.pop(key, None)
+                if not posting:
+                    del self._postings[gram]
+
+    def __len__(self) -> int:
+        return len(self._texts)
+
+    def __contains__(self, key) -> bool:
+        return key in self._texts
+
+    def _iter_candidates(self, grams: Iterable[str]) -> Iterator[Hashable]:
+        """
+        按添加顺序生成包含全部 n-gram 的键：遍历最短的倒排表，其余倒排表用于判断
+        """
+        postings = []
+        for gram in grams:
+            posting = self._postings.get(gram)
+            if not posting:
+                return
+            postings.append(posting)
+        if not postings:
+            yield from self._texts
+            return
+        postings.sort(key=len)
+        first, rest = postings[0], postings[1:]
+        for key in first:
+            if all(key in posting for posting in rest):
+                yield key
+
+    def iter_substring(self, query: str, case_sensitive: bool = False) -> Iterator[Hashable]:
+        """
+        按添加顺序逐个生成文本包含查询串的键
+        :param query: 查询串，空串匹配全部
+        :param case_sensitive: 是否区分大小写
+        """
+        folded = query.casefold()
+        for key in self._iter_candidates(_query_grams(folded) if folded else ()):
+            if (query in self._texts[key]) if case_sensitive else (folded in self._folded[key]):
+                yield key
+
+    def iter_prefix(self, query: str, case_sensitive: bool = False) -> Iterator[Hashable]:
+        """
+        按添加顺序逐个生成文本以查询串开头的键
+        :param query: 查询串，空串匹配全部
+        :param case_sensitive: 是否区分大小写
+        """
+        folded = query.casefold()
+        for key in self._iter_candidates(_query_grams(_START + folded) if folded else ()):
+            if self._texts[key].startswith(query) if case_sensitive else self._folded[key].startswith(folded):
+                yield key
+
+    def substring(self, query: str, case_sensitive: bool = False, limit: Optional[int] = None) -> List[Hashable]:
+        """
+        文本包含查询串的键（按添加顺序）
+        :param limit: 最多返回的数量
+        """
+        return list(islice(self.iter_substring(query, case_sensitive), limit))
+
+    def prefix(self, query: str, case_sensitive: bool = False, limit: Optional[int] = None) -> List[Hashable]:
+        """
+        文本以查询串开头的键（按添加顺序）
+        :param limit: 最多返回的数量
+        """
+        return list(islice(self.iter_prefix(query, case_sensitive), limit))
+
+    def fuzzy(self, query: str, threshold: float = 0.5, limit: Optional[int] = 20) -> List[Tuple[Hashable, float]]:
+        """
+        模糊查询：得分为查询串的 n-gram 在文本中出现的比例，完全包含查询串的文本得分为1
+        :param query: 查询串
+        :param threshold: 最低得分
+        :param limit: 最多返回的数量
+        :return: (键, 得分) 列表，按得分降序、添加顺序排列
+        """
+        folded = query.casefold()
+        if not folded:
+            return []
+        grams = _query_grams(folded)
+        postings = sorted((self._postings.get(gram, {}) for gram in grams), key=len)
+        # 至少包含 need 个 n-gram 的文本必然出现在最短的 len(grams) - need + 1 个倒排表之一中
+        need = max(math.ceil(threshold * len(grams) - 1e-9), 1)
+        candidates = set()
+        for posting in postings[:len(grams) - need + 1]:
+            candidates.update(posting)
+        scored = []
+        for key in candidates:
+            if folded in self._folded[key]:
+                score = 1.0
+            else:
+                score = sum(key in posting for posting in postings) / len(grams)
+            if score >= threshold:
+                scored.append((key, score))
+        scored.sort(key=lambda item: (-item[1], self._order[item[0]]))
+        return scored if limit is None else scored[:limit]
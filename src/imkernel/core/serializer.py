@@ -0,0 +1,67 @@
+import json
+from typing import Any, Iterable, Iterator, Optional, TextIO
+
+
+class LazyList:
+    """
+    延迟序列化的列表，包装一个可迭代对象，序列化时逐项生成，不在内存中构造完整列表
+    """
+
+    def __init__(self, iterable: Iterable):
+        self.iterable = iterable
+
+    def __iter__(self):
+        return iter(self.iterable)
+
+
+def iter_json(obj: Any, indent: Optional[int] = None, ensure_ascii: bool = False, level: int = 0) -> Iterator[str]:
+    """
+    流式生成JSON文本片段，字典与 LazyList 逐项展开，其余值整体交给json编码
+    :param obj: 要序列化的对象
+    :param indent: 缩进空格数，None 表示紧凑格式
+    :param ensure_ascii: 是否转义非ASCII字符
+    :param level: 当前嵌套层级
+    """
+    if isinstance(obj, dict) and any(isinstance(v, (dict, LazyList)) for v in obj.values()):
+        items = ((json.dumps(str(k), ensure_ascii=ensure_ascii) + ": ", v) for k, v in obj.items())
+        yield from _iter_container("{", "}", items, indent, ensure_ascii, level)
+    elif isinstance(obj, LazyList):
+        items = (("", v) for v in obj)
+        yield from _iter_container("[", "]", items, indent, ensure_ascii, level)
+    else:
+        text = json.dumps(obj, indent=indent, ensure_ascii=ensure_ascii)
+        if indent is not None and level:
+            # 嵌套值需要补上外层缩进
+            text = text.replace("\n", "\n" + " " * (indent * level))
+        yield text
+
+
+def _iter_container(opener: str, closer: str, items: Iterable, indent: Optional[int], ensure_ascii: bool, level: int) -> Iterator[str]:
+    if indent is None:
+        separator, item_prefix, close_prefix = ", ", "", ""
+    else:
+        item_prefix = "\n" + " " * (indent * (level + 1))
+        separator, close_prefix = ",", "\n" + " " * (indent * level)
+    yield opener
+    first = True
+    for key_text, value in items:
+        if not first:
+            yield separator
+        first = False
+        yield item_prefix + key_text
+        yield from iter_json(value, indent=indent, ensure_ascii=ensure_ascii, level=level + 1)
+    if not first:
+        yield close_prefix
+    yield closer
+
+
+def dump_json(obj: Any, fp: TextIO, indent: Optional[int] = None, ensure_ascii: bool = False) -> None:
+    """
+    将对象流式写入文件对象
+    :param obj: 要序列化的对象，可包含 LazyList
+    :param fp: 可写的文本文件对象
+    :param indent: 缩进空格数
+    :param ensure_ascii: 是否转义非ASCII字符
+    """
+    for chunk in iter_json(obj, indent=indent, ensure_ascii=ensure_ascii):
+        fp.write(chunk)
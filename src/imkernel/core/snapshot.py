@@ -0,0 +1,424 @@
+"""
+模型二进制快照
+
+快照为一个目录：
+- manifest.json          树结构、参数组元数据以及各数据文件的引用
+- objects-{代}.pkl       无法用数组表示的数据（对象层数据、非数值的参数数据、方法参数数据等）
+- arrays/{代}-{序号}.npy  数值参数数据及有效位掩码（列式存储，以及每条数据均为同长度同类型数值列表的字典形式参数数据），可按需内存映射
+- journal-{代}.log       快照之后的变更日志（见 journal.py）
+
+每次保存使用新的代号写入数据文件，manifest.json 原子替换后才删除旧代文件，
+因此保存过程中断时旧快照仍然完整，内存映射中的旧文件也不会被覆盖。
+
+加载快照与重放变更日志时会对 objects-{代}.pkl 和 journal-{代}.log 执行 pickle 反序列化，
+反序列化可以执行任意代码，只能加载可信来源的快照目录。
+"""
+import json
+import os
+import pickle
+import re
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .parameter_store import ColumnarParameterData
+
+SNAPSHOT_FORMAT = "imkernel-snapshot"
+# 2: 字典形式的数值参数数据保存为npy（dict_columnar）
+# 3: 值为None的参数数据单独标记（none），加载后仍为None
+SNAPSHOT_VERSION = 3
+MANIFEST_FILE = "manifest.json"
+OBJECTS_FILE = "objects-{generation}.pkl"
+ARRAYS_DIR = "arrays"
+JOURNAL_FILE = "journal-{generation}.log"
+_JOURNAL_PATTERN = re.compile(r"^journal-(\d+)\.log$")
+
+
+class _SnapshotWriter:
+    """
+    快照写入器，收集对象与数组并生成引用，调用 write 时才写入文件
+    """
+
+    def __init__(self, path: Path, generation: int):
+        self.path = path
+        self.generation = generation
+        self.objects: Dict[str, Any] = {}
+        self._arrays: List[Tuple[str, np.ndarray]] = []
+        self._objects_bytes: Optional[bytes] = None
+
+    @property
+    def objects_file(self) -> str:
+        return OBJECTS_FILE.format(generation=self.generation)
+
+    def add_object(self, obj) -> str:
+        key = str(len(self.objects))
+        self.objects[key] = obj
+        return key
+
+    def add_array(self, array: np.ndarray) -> str:
+        file_name = f"{ARRAYS_DIR}/{self.generation}-{len(self._arrays)}.npy"
+        self._arrays.append((file_name, array))
+        return file_name
+
+    def freeze(self) -> None:
+        """
+        固定当前收集到的数据（对象序列化、数组拷贝），之后模型的修改不影响写入内容，用于后台写入
+        """
+        self._objects_bytes = pickle.dumps(self.objects, protocol=pickle.HIGHEST_PROTOCOL)
+        self.objects = {}
+        self._arrays = [(file_name, np.array(array)) for file_name, array in self._arrays]
+
+    def write(self) -> None:
+        (self.path / ARRAYS_DIR).mkdir(parents=True, exist_ok=True)
+        for file_name, array in self._arrays:
+            np.save(self.path / file_name, np.ascontiguousarray(array), allow_pickle=False)
+        with (self.path / self.objects_file).open("wb") as f:
+            if self._objects_bytes is not None:
+                f.write(self._objects_bytes)
+            else:
+                pickle.dump(self.objects, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def add_parameter_data(self, parameter_data) -> Optional[dict]:
+        """
+        参数数据引用：数值列式存储及数值字典写入npy文件，其余写入objects.pkl
+        """
+        if parameter_data is None:
+            return {"kind": "none"}
+        if isinstance(parameter_data, ColumnarParameterData):
+            if parameter_data.is_numeric:
+                size = parameter_data.size
+                return {
+                    "kind": "columnar",
+                    "values": self.add_array(parameter_data.array[:size]),
+                    "mask": self.add_array(parameter_data.mask[:size]),
+                }
+            return {"kind": "columnar_object", "object": self.add_object(dict(parameter_data.items()))}
+        arrays = _numeric_dict_arrays(parameter_data)
+        if arrays is not None:
+            values, mask = arrays
+            return {"kind": "dict_columnar", "values": self.add_array(values), "mask": self.add_array(mask)}
+        return {"kind": "object", "object": self.add_object(parameter_data)}
+
+
+# 每条数据中数值元素的类型及对应的数组类型，类型混合时不转换，保证加载后的值与保存前完全相同
+_SCALAR_DTYPES = {bool: np.bool_, int: np.int64, float: np.float64}
+
+
+def _numeric_dict_arrays(parameter_data) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    字典形式的参数数据 {str(data_index): data_list} 转为按数据索引排列的数值数组与有效位掩码，
+    要求每条数据都是同长度、元素类型相同（bool/int/float）的列表，且数据索引不过于稀疏；不满足时返回None
+    """
+    if not isinstance(parameter_data, dict) or not parameter_data:
+        return None
+    rows = list(parameter_data.values())
+    if any(type(row) is not list for row in rows):
+        return None
+    width = len(rows[0])
+    if width == 0 or any(len(row) != width for row in rows):
+        return None
+    scalar_type = type(rows[0][0])
+    dtype = _SCALAR_DTYPES.get(scalar_type)
+    if dtype is None or any(type(item) is not scalar_type for row in rows for item in row):
+        return None
+    try:
+        indices = np.array([int(key) for key in parameter_data], dtype=np.int64)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    if indices.min() < 0 or any(str(index) != key for index, key in zip(indices.tolist(), parameter_data)):
+        return None
+    size = int(indices.max()) + 1
+    if size > 2 * len(rows) + 1024:
+        return None
+    try:
+        block = np.array(rows, dtype=dtype)
+    except OverflowError:
+        return None
+    values = np.zeros((size, width), dtype=dtype)
+    values[indices] = block
+    mask = np.zeros(size, dtype=bool)
+    mask[indices] = True
+    return values, mask
+
+
+def _group_meta(group, writer: _SnapshotWriter) -> dict:
+    return {
+        "group_name": group["group_name"],
+        "parameters": group.get("parameters", []),
+        "data": writer.add_parameter_data(group["parameter_data"]) if "parameter_data" in group else None,
+    }
+
+
+def _node_meta(node) -> dict:
+    return {
+        "id": node.id,
+        "desc": node.desc,
+        "parent": node.parent.id if node.parent else None,
+        "is_tag": node.is_tag,
+    }
+
+
+def collect_manifest(model, writer: _SnapshotWriter) -> dict:
+    """
+    生成快照清单，数组与对象交给写入器保存
+    :param model: Model
+    :param writer: 快照写入器
+    """
+    element_nodes = []
+    for node in model.element.tree.nodes.values():
+        meta = _node_meta(node)
+        meta["columnar"] = node.columnar
+        meta["groups"] = [_group_meta(g, writer) for g in node.parameter_list]
+        element_nodes.append(meta)
+
+    method_nodes = []
+    for node in model.method.tree.nodes.values():
+        meta = _node_meta(node)
+        meta["program"] = node.program
+        meta["input_groups"] = [_group_meta(g, writer) for g in node.input_parameter_list]
+        meta["output_groups"] = [_group_meta(g, writer) for g in node.output_parameter_list]
+        method_nodes.append(meta)
+
+    procedure_nodes = []
+    for node in model.procedure.tree.nodes.values():
+        meta = _node_meta(node)
+        meta["groups"] = [_group_meta(g, writer) for g in node.parameter_list]
+        meta["element_node"] = [e.id for e in node.element_node] if node.element_node is not None else None
+        meta["method_node"] = node.method_node.id if node.method_node is not None else None
+        procedure_nodes.append(meta)
+
+    return {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "element": {
+            "columnar": model.element.columnar,
+            "nodes": element_nodes,
+            "model_data": writer.add_object(model.element.model_data),
+        },
+        "method": {
+            "nodes": method_nodes,
+            "model_data": writer.add_object(model.method.model_data),
+        },
+        "procedure": {
+            "nodes": procedure_nodes,
+            "model_data": writer.add_object(model.procedure.model_data),
+        },
+    }
+
+
+def list_journal_generations(path: Union[str, os.PathLike]) -> List[int]:
+    """
+    目录下已有变更日志的代号（升序）
+    :param path: 快照目录
+    """
+    path = Path(path)
+    if not path.is_dir():
+        return []
+    generations = [int(m.group(1)) for m in map(_JOURNAL_PATTERN.match, os.listdir(path)) if m]
+    return sorted(generations)
+
+
+def next_generation(path: Union[str, os.PathLike], at_least: int = 0) -> int:
+    """
+    下一次保存使用的代号，大于已有快照及变更日志的代号
+    :param path: 快照目录
+    :param at_least: 代号下限
+    """
+    path = Path(path)
+    generation = at_least
+    if (path / MANIFEST_FILE).exists():
+        generation = max(generation, read_manifest(path).get("generation", 0) + 1)
+    journals = list_journal_generations(path)
+    if journals:
+        generation = max(generation, journals[-1] + 1)
+    return generation
+
+
+def prepare_snapshot(model, path: Union[str, os.PathLike], generation: int) -> Tuple[_SnapshotWriter, dict]:
+    """
+    收集快照内容，不写入文件
+    :param model: Model
+    :param path: 快照目录
+    :param generation: 快照代号
+    """
+    writer = _SnapshotWriter(Path(path), generation)
+    manifest = collect_manifest(model, writer)
+    manifest["generation"] = generation
+    manifest["objects"] = writer.objects_file
+    return writer, manifest
+
+
+def commit_snapshot(writer: _SnapshotWriter, manifest: dict) -> Path:
+    """
+    写入数据文件，原子替换 manifest.json 后删除旧代文件
+    """
+    writer.write()
+    _write_manifest(writer.path, manifest)
+    remove_stale_files(writer.path, writer.generation)
+    return writer.path
+
+
+def save_model(model, path: Union[str, os.PathLike]) -> Path:
+    """
+    保存模型快照，manifest.json 最后以原子替换方式写入
+    :param model: Model
+    :param path: 快照目录
+    """
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    writer, manifest = prepare_snapshot(model, path, next_generation(path))
+    return commit_snapshot(writer, manifest)
+
+
+def remove_stale_files(path: Path, generation: int) -> None:
+    """
+    删除不属于当前代的快照文件以及已并入快照的变更日志，删除失败（如文件仍被映射）时忽略
+    :param path: 快照目录
+    :param generation: 当前快照代号
+    """
+    objects_file = OBJECTS_FILE.format(generation=generation)
+    stale = []
+    for name in os.listdir(path):
+        match = _JOURNAL_PATTERN.match(name)
+        if match and int(match.group(1)) < generation:
+            stale.append(path / name)
+        elif name.startswith("objects") and name.endswith(".pkl") and name != objects_file:
+            stale.append(path / name)
+    arrays_path = path / ARRAYS_DIR
+    if arrays_path.is_dir():
+        stale += [arrays_path / name for name in os.listdir(arrays_path) if not name.startswith(f"{generation}-")]
+    for file_path in stale:
+        try:
+            file_path.unlink()
+        except OSError:
+            pass
+
+
+def _write_manifest(path: Path, manifest: dict) -> None:
+    tmp_path = path / (MANIFEST_FILE + ".tmp")
+    with tmp_path.open("w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(tmp_path, path / MANIFEST_FILE)
+
+
+def read_manifest(path: Union[str, os.PathLike]) -> dict:
+    """
+    读取快照清单
+    :param path: 快照目录
+    """
+    manifest_path = Path(path) / MANIFEST_FILE
+    if not manifest_path.exists():
+        raise FileNotFoundError(f"未找到快照{manifest_path}")
+    with manifest_path.open("r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    if manifest.get("format") != SNAPSHOT_FORMAT:
+        raise ValueError(f"{manifest_path}不是模型快照")
+    if manifest.get("version", 0) > SNAPSHOT_VERSION:
+        raise ValueError(f"快照版本{manifest.get('version')}过高，当前仅支持{SNAPSHOT_VERSION}")
+    return manifest
+
+
+class _SnapshotReader:
+    def __init__(self, path: Path, objects: dict, mmap: bool):
+        self.path = path
+        self.objects = objects
+        # copy-on-write 映射：按需分页读取，修改只作用于本进程
+        self.mmap_mode = "c" if mmap else None
+
+    def parameter_data(self, ref: dict, columnar: bool = False):
+        """
+        :param ref: 参数数据引用
+        :param columnar: 字典形式的数值数据在内存映射时是否以列式存储加载（仅单元节点，加载后节点改为列式存储）
+        """
+        if ref["kind"] == "none":
+            return None
+        if ref["kind"] in ("columnar", "dict_columnar"):
+            values = np.load(self.path / ref["values"], mmap_mode=self.mmap_mode, allow_pickle=False)
+            mask = np.load(self.path / ref["mask"], allow_pickle=False)
+            store = ColumnarParameterData.from_arrays(values, mask)
+            if ref["kind"] == "dict_columnar" and (self.mmap_mode is None or not columnar):
+                # 不使用内存映射或节点不支持列式存储时恢复为字典
+                return dict(store.items())
+            return store
+        if ref["kind"] == "columnar_object":
+            store = ColumnarParameterData()
+            for k, v in self.objects[ref["object"]].items():
+                store[k] = v
+            return store
+        return self.objects[ref["object"]]
+
+
+def _restore_groups(group_list: list, metas: list, reader: _SnapshotReader, columnar: bool = False) -> None:
+    for group, meta in zip(group_list, metas):
+        group["parameters"] = meta["parameters"]
+        if meta["data"] is not None:
+            group["parameter_data"] = reader.parameter_data(meta["data"], columnar=columnar)
+
+
+def _use_columnar(node) -> None:
+    """
+    单元节点有参数数据以列式存储加载时，节点改为列式存储：其余字典形式的参数数据转为列式存储，之后新建的参数组也使用列式存储
+    """
+    if node.columnar or not any(isinstance(g.get("parameter_data"), ColumnarParameterData) for g in node.parameter_list):
+        return
+    node.columnar = True
+    for group in node.parameter_list:
+        parameter_data = group.get("parameter_data")
+        if isinstance(parameter_data, dict):
+            store = node.create_parameter_data()
+            for key, value in parameter_data.items():
+                store[key] = value
+            group["parameter_data"] = store
+
+
+def load_model(model, path: Union[str, os.PathLike], mmap: bool = True):
+    """
+    从快照恢复模型。objects-{代}.pkl 以 pickle 读取，可执行任意代码，只能加载可信的快照目录
+    :param model: 空的 Model
+    :param path: 快照目录
+    :param mmap: 数值参数数据是否以内存映射方式加载
+    """
+    path = Path(path)
+    manifest = read_manifest(path)
+    with (path / manifest["objects"]).open("rb") as f:
+        objects = pickle.load(f)
+    reader = _SnapshotReader(path, objects, mmap)
+
+    # 单元模型
+    element = model.element
+    element.columnar = manifest["element"]["columnar"]
+    for meta in manifest["element"]["nodes"]:
+        element.create(meta["id"], meta["desc"], meta["parent"], meta["is_tag"])
+        node = element.get_by_id(meta["id"])
+        node.columnar = meta["columnar"]
+        element.set_parameter_group(node, [g["group_name"] for g in meta["groups"]])
+        _restore_groups(node.parameter_list, meta["groups"], reader, columnar=True)
+        _use_columnar(node)
+    element.model_data = objects[manifest["element"]["model_data"]]
+
+    # 方法模型
+    method = model.method
+    for meta in manifest["method"]["nodes"]:
+        method.create(meta["id"], meta["desc"], meta["parent"], meta["is_tag"])
+        node = method.get_by_id(meta["id"])
+        node.program = meta["program"]
+        method.set_input_parameter_group(node, [g["group_name"] for g in meta["input_groups"]])
+        method.set_output_parameter_group(node, [g["group_name"] for g in meta["output_groups"]])
+        _restore_groups(node.input_parameter_list, meta["input_groups"], reader)
+        _restore_groups(node.output_parameter_list, meta["output_groups"], reader)
+    method.model_data = objects[manifest["method"]["model_data"]]
+
+    # 过程模型
+    procedure = model.procedure
+    for meta in manifest["procedure"]["nodes"]:
+        procedure.create(meta["id"], meta["desc"], meta["parent"], meta["is_tag"])
+        node = procedure.get_by_id(meta["id"])
+        procedure.set_parameter_group(node, [g["group_name"] for g in meta["groups"]])
+        _restore_groups(node.parameter_list, meta["groups"], reader)
+        if meta["element_node"] is not None:
+            node.element_node = [element.get_by_id(i) for i in meta["element_node"]]
+        if meta["method_node"] is not None:
+            node.method_node = method.get_by_id(meta["method_node"])
+    procedure.model_data = objects[manifest["procedure"]["model_data"]]
+    return model
@@ -0,0 +1,221 @@
+"""
+运行遥测
+
+方法模型、过程模型每次运行生成一条 RunRecord：各阶段耗时（resolve 解析、import 导入算法、match 匹配输入、
+execute 运行算法、write_back 写回结果，单位纳秒），设置 telemetry.measure_size = True 后还估算输入输出数据量。记录保存在最近记录队列中，并依次交给注册的钩子，
+用于导出到外部采集系统。运行过程的提示信息默认不打印，设置 telemetry.verbose = True 后打印。
+"""
+import sys
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+PHASES = ("resolve", "import", "match", "execute", "write_back")
+
+
+def _shallow_size(obj) -> int:
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    return sys.getsizeof(obj)
+
+
+def data_size(obj) -> int:
+    """
+    粗略估算数据占用的字节数：数组按 nbytes，列表/字典只累加第一层元素自身的大小（不递归），其余对象按 sys.getsizeof
+    """
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if isinstance(obj, (list, tuple)):
+        return sum(_shallow_size(item) for item in obj)
+    if isinstance(obj, dict):
+        return sum(_shallow_size(item) for item in obj.values())
+    return sys.getsizeof(obj)
+
+
+class RunRecord:
+    """
+    一次运行的遥测记录
+    """
+
+    __slots__ = ("kind", "id", "method_name", "element_index", "start_time", "phases", "total_ns",
+                 "input_bytes", "output_bytes", "cache_hit", "cancelled", "error")
+
+    def __init__(self, kind: str, id: str, element_index: Optional[int] = None):
+        self.kind = kind
+        self.id = id
+        self.method_name: Optional[str] = None
+        self.element_index = element_index
+        self.start_time = time.time()
+        self.phases: Dict[str, int] = {}
+        self.total_ns = 0
+        self.input_bytes = 0
+        self.output_bytes = 0
+        self.cache_hit = False
+        self.cancelled = False
+        self.error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        record = {name: getattr(self, name) for name in self.__slots__ if name != "phases"}
+        for phase in PHASES:
+            record[f"{phase}_ns"] = self.phases.get(phase, 0)
+        return record
+
+    def __repr__(self) -> str:
+        phases = ", ".join(f"{k}={v / 1e6:.3f}ms" for k, v in self.phases.items())
+        return f"RunRecord({self.kind} {self.id}, total={self.total_ns / 1e6:.3f}ms, {phases})"
+
+
+class RunTrace:
+    """
+    运行计时器：mark(phase) 把距上一次标记的耗时计入该阶段
+    """
+
+    __slots__ = ("telemetry", "record", "_start", "_last")
+
+    def __init__(self, telemetry: "Telemetry", record: RunRecord):
+        self.telemetry = telemetry
+        self.record = record
+        self._start = self._last = time.perf_counter_ns()
+
+    def set(self, **attrs) -> None:
+        """
+        设置记录的字段（method_name、cache_hit、cancelled 等）
+        """
+        for name, value in attrs.items():
+            setattr(self.record, name, value)
+
+    def mark(self, phase: str) -> None:
+        now = time.perf_counter_ns()
+        self.record.phases[phase] = self.record.phases.get(phase, 0) + now - self._last
+        self._last = now
+
+    def finish(self, inputs=None, outputs=None, error: Optional[BaseException] = None) -> Optional[RunRecord]:
+        """
+        结束记录并交给收集器
+        :param inputs: 输入数据，用于统计数据量
+        :param outputs: 输出数据，用于统计数据量
+        :param error: 运行出错时的异常
+        """
+        self.record.total_ns = time.perf_counter_ns() - self._start
+        if self.telemetry.measure_size:
+            self.record.input_bytes = data_size(inputs) if inputs is not None else 0
+            self.record.output_bytes = data_size(outputs) if outputs is not None else 0
+        if error is not None:
+            self.record.error = f"{type(error).__name__}: {error}"
+        self.telemetry.emit(self.record)
+        return self.record
+
+
+class _NullTrace(RunTrace):
+    """
+    遥测关闭时使用，不做任何记录
+    """
+
+    def __init__(self):
+        pass
+
+    def set(self, **attrs) -> None:
+        pass
+
+    def mark(self, phase: str) -> None:
+        pass
+
+    def finish(self, inputs=None, outputs=None, error: Optional[BaseException] = None) -> Optional[RunRecord]:
+        return None
+
+
+_NULL_TRACE = _NullTrace()
+
+
+class Telemetry:
+    """
+    遥测收集器
+    """
+
+    def __init__(self, max_records: int = 1000):
+        """
+        :param max_records: 保留的最近记录条数
+        """
+        self.enabled = True
+        self.verbose = False
+        # 是否估算输入输出数据量（每次运行需遍历输入输出的第一层，默认关闭）
+        self.measure_size = False
+        self.records: deque = deque(maxlen=max_records)
+        self._hooks: List[Callable[[RunRecord], None]] = []
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook: Callable[[RunRecord], None]) -> None:
+        """
+        注册钩子，每次运行结束时以 RunRecord 调用
+        """
+        with self._lock:
+            self._hooks.append(hook)
+
+    def remove_hook(self, hook: Callable[[RunRecord], None]) -> None:
+        with self._lock:
+            self._hooks.remove(hook)
+
+    def start(self, kind: str, id: str, element_index: Optional[int] = None) -> RunTrace:
+        """
+        开始记录一次运行，未启用时返回不做记录的计时器
+        :param kind: method / procedure
+        :param id: 节点ID
+        :param element_index: 单元数据索引
+        """
+        if not self.enabled:
+            return _NULL_TRACE
+        return RunTrace(self, RunRecord(kind, id, element_index))
+
+    def emit(self, record: RunRecord) -> None:
+        with self._lock:
+            self.records.append(record)
+            hooks = list(self._hooks)
+        for hook in hooks:
+            try:
+                hook(record)
+            except Exception as e:
+                print(f"遥测钩子运行出错: {e}")
+        if self.verbose:
+            print(record)
+
+    def echo(self, message: str) -> None:
+        """
+        打印运行提示（verbose 为True时）
+        """
+        if self.verbose:
+            print(message)
+
+    def clear(self) -> None:
+        with self._lock:
+            self.records.clear()
+
+    def get_records_df(self) -> pd.DataFrame:
+        """
+        最近的运行记录
+        """
+        with self._lock:
+            records = [record.to_dict() for record in self.records]
+        return pd.DataFrame(records)
+
+    def get_summary_df(self) -> pd.DataFrame:
+        """
+        按节点汇总运行次数与各阶段平均耗时（毫秒），按总耗时降序排列
+        """
+        df = self.get_records_df()
+        if df.empty:
+            return df
+        columns = ["total_ns"] + [f"{phase}_ns" for phase in PHASES]
+        grouped = df.groupby(["kind", "id"])
+        summary = grouped[columns].mean() / 1e6
+        summary.columns = [c.replace("_ns", "_ms") for c in columns]
+        summary.insert(0, "count", grouped.size())
+        summary["sum_ms"] = grouped["total_ns"].sum() / 1e6
+        return summary.sort_values("sum_ms", ascending=False)
+
+
+# 全局遥测收集器
+telemetry = Telemetry()
@@ -1,9 +1,14 @@
-from typing import Optional
+from typing import Optional, Sequence
 
 from .node_base import NodeBase
+from .tree_base import TreePrintMixin
 
 
-class Tree:
+class Tree(TreePrintMixin):
+    """
+    树（森林），文本输出由 TreePrintMixin 迭代生成
+    """
+
     def __init__(self):
         self.roots: dict[str, NodeBase] = {}  # 用于存储森林中的根节点
         self.nodes: dict[str, NodeBase] = {}  # 用于存储所有节点
@@ -40,46 +45,16 @@ class Tree:
     def find_node_by_id(self, node_id) -> Optional[NodeBase]:
         return self.nodes.get(node_id)
 
-    def _format_node(self, node: NodeBase, format_type) -> str:
-        if format_type == "id":
-            return node.id
-        elif format_type == "desc":
-            return node.desc
-
-    def _print_tree(self, node: NodeBase, prefix: str = "", is_last: bool = True, format_type: str = 'id') -> str:
-        """Helper method to print the tree structure"""
-        connector = "└── " if is_last else "├── "
-        result = prefix + connector + f"{self._format_node(node, format_type)}\n"
-        prefix += "    " if is_last else "│   "
-        children = node.children
-        for i, child in enumerate(children):
-            result += self._print_tree(child, prefix, i == len(children) - 1, format_type=format_type)
-        return result
-
-    def _print_tree_with_type(self, format_type: str = "id"):
-        tree_str = ""
-        for i, root in enumerate(self.roots.values()):
-            tree_str += f"{self._format_node(root, format_type)}\n"
-            children = root.children
-            for j, child in enumerate(children):
-                tree_str += self._print_tree(child, "", j == len(children) - 1, format_type=format_type)
-            if i < len(self.roots) - 1:
-                tree_str += "\n"  # 在根节点之间添加空行
-        return tree_str
-
-    def print_id(self):
-        """
-        返回Id树
-        :return:
-        """
-        return self._print_tree_with_type(format_type="id")
+    def _line_roots(self, root_id: Optional[str]) -> Sequence[NodeBase]:
+        if root_id is None:
+            return list(self.roots.values())
+        root = self.find_node_by_id(root_id)
+        if root is None:
+            raise Exception(f"未找到名为{root_id}的节点")
+        return [root]
 
-    def print_desc(self):
-        """
-        返回描述树
-        :return:
-        """
-        return self._print_tree_with_type(format_type="desc")
+    def _line_node(self, handle: NodeBase) -> NodeBase:
+        return handle
 
-    def __str__(self) -> str:
-        return self.print_id()
+    def _line_children(self, handle: NodeBase) -> Sequence[NodeBase]:
+        return handle.children
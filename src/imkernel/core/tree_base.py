@@ -1,9 +1,99 @@
-from typing import Optional
+from typing import Iterator, Optional, Sequence, TextIO
 
 from .node_base import NodeBase
 
 
-class TreeBase:
+class TreePrintMixin:
+    """
+    树的文本输出，迭代实现，不受递归深度限制。
+    子类通过 _line_roots / _line_node / _line_children 提供节点句柄（节点对象或数组下标）的访问。
+    """
+
+    def _line_roots(self, root_id: Optional[str]) -> Sequence:
+        """
+        输出的根节点句柄，root_id为None时为所有根节点
+        """
+        raise NotImplementedError
+
+    def _line_node(self, handle) -> NodeBase:
+        """
+        句柄对应的节点
+        """
+        raise NotImplementedError
+
+    def _line_children(self, handle) -> Sequence:
+        """
+        按顺序返回子节点句柄
+        """
+        raise NotImplementedError
+
+    def _format_node(self, node: NodeBase, format_type) -> str:
+        if format_type == "id":
+            return node.id
+        elif format_type == "desc":
+            return node.desc
+
+    def iter_tree_lines(self, format_type: str = "id", root_id: str = None, max_depth: Optional[int] = None) -> Iterator[str]:
+        """
+        逐行生成树的文本（不含换行符），迭代实现，不受递归深度限制
+        :param format_type: id / desc
+        :param root_id: 只输出以该节点为根的子树，None时输出所有根节点（根节点之间以空行分隔）
+        :param max_depth: 最大输出深度（根节点深度为0），None时不限制
+        """
+        for i, root in enumerate(self._line_roots(root_id)):
+            if i > 0:
+                yield ""  # 在根节点之间添加空行
+            yield f"{self._format_node(self._line_node(root), format_type)}"
+            if max_depth is not None and max_depth < 1:
+                continue
+            children = self._line_children(root)
+            # 栈中保存 (节点, 前缀, 是否为最后一个子节点, 深度)，子节点逆序入栈以保证输出顺序
+            stack = [(child, "", j == len(children) - 1, 1) for j, child in reversed(list(enumerate(children)))]
+            while stack:
+                node, prefix, is_last, depth = stack.pop()
+                connector = "└── " if is_last else "├── "
+                yield prefix + connector + f"{self._format_node(self._line_node(node), format_type)}"
+                if max_depth is not None and depth >= max_depth:
+                    continue
+                prefix += "    " if is_last else "│   "
+                children = self._line_children(node)
+                for j in range(len(children) - 1, -1, -1):
+                    stack.append((children[j], prefix, j == len(children) - 1, depth + 1))
+
+    def write_tree(self, file: TextIO, format_type: str = "id", root_id: str = None, max_depth: Optional[int] = None) -> None:
+        """
+        将树逐行写入文件
+        :param file: 文本文件对象，如 sys.stdout
+        :param format_type: id / desc
+        :param root_id: 子树根节点ID
+        :param max_depth: 最大输出深度
+        """
+        for line in self.iter_tree_lines(format_type, root_id=root_id, max_depth=max_depth):
+            file.write(line)
+            file.write("\n")
+
+    def _print_tree_with_type(self, format_type: str = "id"):
+        return "".join(line + "\n" for line in self.iter_tree_lines(format_type))
+
+    def print_id(self):
+        """
+        返回Id树
+        :return:
+        """
+        return self._print_tree_with_type(format_type="id")
+
+    def print_desc(self):
+        """
+        返回描述树
+        :return:
+        """
+        return self._print_tree_with_type(format_type="desc")
+
+    def __str__(self) -> str:
+        return self.print_id()
+
+
+class TreeBase(TreePrintMixin):
     def __init__(self):
         self.roots: dict[str, NodeBase] = {}  # 用于存储森林中的根节点
         self.nodes: dict[str, NodeBase] = {}  # 用于存储所有节点
@@ -40,46 +130,16 @@ class TreeBase:
     def find_node_by_id(self, node_id) -> Optional[NodeBase]:
         return self.nodes.get(node_id)
 
-    def _format_node(self, node: NodeBase, format_type) -> str:
-        if format_type == "id":
-            return node.id
-        elif format_type == "desc":
-            return node.desc
-
-    def _print_tree(self, node: NodeBase, prefix: str = "", is_last: bool = True, format_type: str = 'id') -> str:
-        """Helper method to print the tree structure"""
-        connector = "└── " if is_last else "├── "
-        result = prefix + connector + f"{self._format_node(node, format_type)}\n"
-        prefix += "    " if is_last else "│   "
-        children = node.children
-        for i, child in enumerate(children):
-            result += self._print_tree(child, prefix, i == len(children) - 1, format_type=format_type)
-        return result
-
-    def _print_tree_with_type(self, format_type: str = "id"):
-        tree_str = ""
-        for i, root in enumerate(self.roots.values()):
-            tree_str += f"{self._format_node(root, format_type)}\n"
-            children = root.children
-            for j, child in enumerate(children):
-                tree_str += self._print_tree(child, "", j == len(children) - 1, format_type=format_type)
-            if i < len(self.roots) - 1:
-                tree_str += "\n"  # 在根节点之间添加空行
-        return tree_str
-
-    def print_id(self):
-        """
-        返回Id树
-        :return:
-        """
-        return self._print_tree_with_type(format_type="id")
+    def _line_roots(self, root_id: Optional[str]) -> Sequence[NodeBase]:
+        if root_id is None:
+            return list(self.roots.values())
+        root = self.find_node_by_id(root_id)
+        if root is None:
+            raise Exception(f"未找到名为{root_id}的节点")
+        return [root]
 
-    def print_desc(self):
-        """
-        返回描述树
-        :return:
-        """
-        return self._print_tree_with_type(format_type="desc")
+    def _line_node(self, handle: NodeBase) -> NodeBase:
+        return handle
 
-    def __str__(self) -> str:
-        return self.print_id()
+    def _line_children(self, handle: NodeBase) -> Sequence[NodeBase]:
+        return handle.children
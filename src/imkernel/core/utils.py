@@ -2,10 +2,17 @@ import importlib.util
 import sys
 import json
 import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
 import pandas as pd
 import time
 import random
 
+# 传统雪花算法生成器已移至 imkernel.utils.id_generator.snowflake_classic，保留此处的导入
+from imkernel.utils.id_generator.snowflake_classic import SnowflakeIDGenerator
+
 
 def get_root_path():
     interpreter_path = sys.executable
@@ -15,19 +22,104 @@ def get_root_path():
     return root_dir
 
 
-def get_algorithm_by_path(algo_file, algo_name):
+# 算法模块缓存：绝对路径 -> (修改时间, 文件大小, 模块)，按最近使用顺序排列
+_algorithm_cache: "OrderedDict[str, tuple]" = OrderedDict()
+_algorithm_cache_lock = threading.RLock()
+_algorithm_cache_size = 32
+# 导入锁：按路径哈希分配到固定数量的锁上，导入（执行用户代码）时只持有该路径对应的锁，
+# 其他文件的查找不受影响；锁的数量固定，不随导入过的文件数增长
+_algorithm_load_locks = tuple(threading.Lock() for _ in range(64))
+
+
+def _algorithm_load_lock(key: str) -> threading.Lock:
+    return _algorithm_load_locks[hash(key) % len(_algorithm_load_locks)]
+
+
+def set_algorithm_cache_size(size: int) -> None:
+    """
+    设置算法模块缓存容量，超出时淘汰最久未使用的模块
+    @param size:缓存的模块数量，0表示不缓存
+    """
+    global _algorithm_cache_size
+    with _algorithm_cache_lock:
+        _algorithm_cache_size = max(int(size), 0)
+        while len(_algorithm_cache) > _algorithm_cache_size:
+            _algorithm_cache.popitem(last=False)
+
+
+def clear_algorithm_cache(algo_file: Optional[str] = None) -> None:
+    """
+    清除算法模块缓存
+    @param algo_file:算法文件的路径，为None时清除全部
+    """
+    with _algorithm_cache_lock:
+        if algo_file is None:
+            _algorithm_cache.clear()
+        else:
+            _algorithm_cache.pop(os.path.abspath(algo_file), None)
+
+
+def _load_algorithm_module(algo_file):
+    """
+    执行算法文件并返回模块。模块名为文件名（不含扩展名），不同目录下的同名文件得到 __name__ 相同的两个独立模块；
+    模块不加入 sys.modules
+    """
+    spec = importlib.util.spec_from_file_location(name=os.path.splitext(os.path.basename(algo_file))[0], location=algo_file)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _remember_algorithm_module(key: str, cached: tuple) -> None:
+    with _algorithm_cache_lock:
+        if _algorithm_cache_size:
+            _algorithm_cache[key] = cached
+            _algorithm_cache.move_to_end(key)
+            while len(_algorithm_cache) > _algorithm_cache_size:
+                _algorithm_cache.popitem(last=False)
+
+
+def _get_cached_algorithm_module(key: str, hot_reload: bool):
+    """
+    从缓存取模块，缺失或过期时在该文件的导入锁内导入；全局锁只在读写缓存时持有
+    """
+    with _algorithm_cache_lock:
+        cached = _algorithm_cache.get(key)
+    if cached is None or hot_reload:
+        stat = os.stat(key)
+        version = (stat.st_mtime_ns, stat.st_size)
+        if cached is None or cached[:2] != version:
+            with _algorithm_load_lock(key):
+                # 等待期间其他线程可能已完成导入
+                with _algorithm_cache_lock:
+                    cached = _algorithm_cache.get(key)
+                if cached is None or cached[:2] != version:
+                    cached = (*version, _load_algorithm_module(key))
+                    _remember_algorithm_module(key, cached)
+                    return cached[2]
+    _remember_algorithm_module(key, cached)
+    return cached[2]
+
+
+def get_algorithm_by_path(algo_file, algo_name, use_cache: bool = True, hot_reload: bool = True):
     """
     通过文件路径获取算法函数。
+    同一文件只执行一次，之后从缓存取模块；缓存以(路径, 修改时间, 文件大小)判断是否过期。
+    导入时只锁定该文件对应的导入锁，一个文件导入较慢时不影响其他文件的查找。
+    模块名为算法文件名（不含扩展名，此前为算法函数名）。
     @param algo_file:算法文件的路径
     @param algo_name:算法函数的名称
+    @param use_cache:是否使用模块缓存
+    @param hot_reload:文件修改后是否重新导入，为False时一直使用已缓存的模块
     @return:algo_func: 算法函数，如果获取失败则返回None。
 
     """
     try:
         # print(f"正在尝试导入算法文件: {algo_file}")
-        spec = importlib.util.spec_from_file_location(name=algo_name, location=algo_file)
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
+        if not use_cache:
+            module = _load_algorithm_module(algo_file)
+        else:
+            module = _get_cached_algorithm_module(os.path.abspath(algo_file), hot_reload)
 
         # print(f"成功导入模块")
 
@@ -174,64 +266,3 @@ def runMethod(index: int, method_input_data, method_program, method_parameter, m
     print(f"算法运行完毕")
     # logger.info(result)
     return result
-
-
-import threading
-import time
-
-
-class SnowflakeIDGenerator:
-    def __init__(self, datacenter_id, worker_id, sequence=0):
-        self.epoch = 1288834974657
-        self.datacenter_id_bits = 5
-        self.worker_id_bits = 5
-        self.sequence_bits = 12
-
-        self.max_datacenter_id = -1 ^ (-1 << self.datacenter_id_bits)
-        self.max_worker_id = -1 ^ (-1 << self.worker_id_bits)
-        self.max_sequence = -1 ^ (-1 << self.sequence_bits)
-
-        self.worker_id_shift = self.sequence_bits
-        self.datacenter_id_shift = self.sequence_bits + self.worker_id_bits
-        self.timestamp_left_shift = self.sequence_bits + self.worker_id_bits + self.datacenter_id_bits
-
-        self.datacenter_id = datacenter_id
-        self.worker_id = worker_id
-        self.sequence = sequence
-        self.last_timestamp = -1
-
-        if datacenter_id > self.max_datacenter_id or datacenter_id < 0:
-            raise ValueError("Datacenter ID out of range")
-        if worker_id > self.max_worker_id or worker_id < 0:
-            raise ValueError("Worker ID out of range")
-
-    def _current_timestamp(self):
-        return int(time.time() * 1000)
-
-    def _wait_for_next_millis(self, last_timestamp):
-        timestamp = self._current_timestamp()
-        while timestamp <= last_timestamp:
-            timestamp = self._current_timestamp()
-        return timestamp
-
-    def generate_id(self):
-        timestamp = self._current_timestamp()
-
-        if timestamp < self.last_timestamp:
-            raise Exception("Clock moved backwards. Refusing to generate id")
-
-        if timestamp == self.last_timestamp:
-            self.sequence = (self.sequence + 1) & self.max_sequence
-            if self.sequence == 0:
-                timestamp = self._wait_for_next_millis(self.last_timestamp)
-        else:
-            self.sequence = 0
-
-        self.last_timestamp = timestamp
-
-        id = ((timestamp - self.epoch) << self.timestamp_left_shift) | \
-             (self.datacenter_id << self.datacenter_id_shift) | \
-             (self.worker_id << self.worker_id_shift) | \
-             self.sequence
-
-        return id
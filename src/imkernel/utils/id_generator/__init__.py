@@ -1,5 +1,5 @@
 from .options import IdGeneratorOptions
-from .generator import DefaultIdGenerator
+from .generator import DefaultIdGenerator, STRATEGIES, register_strategy
 
 # 声明id生成器参数，需要自己构建一个worker_id
 options = IdGeneratorOptions(worker_id=23)
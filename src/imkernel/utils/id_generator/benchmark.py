@@ -0,0 +1,132 @@
+"""
+ID生成器性能测试：各生成策略的吞吐量与单次延迟分位数，以及多线程竞争测试
+python -m imkernel.utils.id_generator.benchmark
+"""
+
+# !/usr/bin/python
+# coding=UTF-8
+
+import threading
+import time
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from .generator import STRATEGIES
+from .options import IdGeneratorOptions
+from .snowflake import SnowFlake
+from .snowflake_m1 import SnowFlakeM1
+from .snowflake_sharded import SnowFlakeSharded
+
+
+def _run_threads(generator: SnowFlake, thread_count: int, ids_per_thread: int) -> float:
+    """
+    多个线程同时生成ID，返回总耗时（秒）
+    """
+    barrier = threading.Barrier(thread_count + 1)
+    results: List[list] = [None] * thread_count
+
+    def work(index: int):
+        next_id = generator.next_id
+        barrier.wait()
+        results[index] = [next_id() for _ in range(ids_per_thread)]
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(thread_count)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    total = sum(len(r) for r in results)
+    if len({i for r in results for i in r}) != total:
+        raise Exception("生成了重复的ID")
+    return elapsed
+
+
+def run_contention_benchmark(thread_counts=(1, 8, 32), ids_per_thread: int = 20000, worker_id: int = 1,
+                             seq_bit_length: int = 12, shard_bit_length: int = 5) -> List[Dict]:
+    """
+    比较单锁生成器与分片生成器在多线程下的吞吐量
+    :param thread_counts: 线程数
+    :param ids_per_thread: 每个线程生成的ID数
+    :param worker_id: 机器码
+    :param seq_bit_length: 序列数位长（两种方式相同，分片方式中包含分片位）
+    :param shard_bit_length: 分片位长
+    :return: 每种方式、每个线程数一行的结果
+    """
+    factories: Dict[str, Callable[[], SnowFlake]] = {
+        "locked": lambda: SnowFlakeM1(IdGeneratorOptions(worker_id=worker_id, seq_bit_length=seq_bit_length)),
+        "sharded": lambda: SnowFlakeSharded(IdGeneratorOptions(worker_id=worker_id, seq_bit_length=seq_bit_length,
+                                                               shard_bit_length=shard_bit_length)),
+    }
+    rows = []
+    for thread_count in thread_counts:
+        for name, factory in factories.items():
+            elapsed = _run_threads(factory(), thread_count, ids_per_thread)
+            total = thread_count * ids_per_thread
+            rows.append({
+                "generator": name,
+                "threads": thread_count,
+                "ids": total,
+                "seconds": elapsed,
+                "ids_per_second": total / elapsed,
+            })
+    return rows
+
+
+def run_strategy_benchmark(strategies=("drift", "classic", "batch", "sharded", "sequential"), count: int = 100000,
+                           options: IdGeneratorOptions = None) -> List[Dict]:
+    """
+    单线程下各生成策略的吞吐量与 next_id 延迟分位数
+    :param strategies: 策略名称
+    :param count: 每种策略生成的ID数
+    :param options: 生成器配置，默认 worker_id=1、seq_bit_length=12、shard_bit_length=5
+    :return: 每种策略一行的结果，延迟单位为微秒
+    """
+    if options is None:
+        options = IdGeneratorOptions(worker_id=1, seq_bit_length=12, shard_bit_length=5)
+    rows = []
+    for name in strategies:
+        generator = STRATEGIES[name](options)
+        next_id = generator.next_id
+        latencies = np.empty(count, dtype=np.int64)
+        ids = [0] * count
+        clock = time.perf_counter_ns
+        start = clock()
+        for i in range(count):
+            t = clock()
+            ids[i] = next_id()
+            latencies[i] = clock() - t
+        elapsed = (clock() - start) / 1e9
+        if len(set(ids)) != count:
+            raise Exception(f"{name}生成了重复的ID")
+
+        start = clock()
+        generator.next_ids(count)
+        batch_elapsed = (clock() - start) / 1e9
+
+        p50, p99, p999 = np.percentile(latencies, [50, 99, 99.9]) / 1e3
+        rows.append({
+            "strategy": name,
+            "ids_per_second": count / elapsed,
+            "next_ids_per_second": count / batch_elapsed,
+            "p50_us": p50,
+            "p99_us": p99,
+            "p999_us": p999,
+            "max_us": latencies.max() / 1e3,
+        })
+    return rows
+
+
+if __name__ == "__main__":
+    print(f"{'strategy':<12}{'ids/s':>12}{'next_ids/s':>14}{'p50 us':>10}{'p99 us':>10}{'p99.9 us':>10}{'max us':>12}")
+    for row in run_strategy_benchmark():
+        print(f"{row['strategy']:<12}{row['ids_per_second']:>12.0f}{row['next_ids_per_second']:>14.0f}"
+              f"{row['p50_us']:>10.2f}{row['p99_us']:>10.2f}{row['p999_us']:>10.2f}{row['max_us']:>12.1f}")
+    print()
+    print(f"{'generator':<10}{'threads':>8}{'ids':>10}{'seconds':>10}{'ids/s':>14}")
+    for row in run_contention_benchmark():
+        print(f"{row['generator']:<10}{row['threads']:>8}{row['ids']:>10}{row['seconds']:>10.3f}{row['ids_per_second']:>14.0f}")
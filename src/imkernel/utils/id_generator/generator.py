@@ -5,9 +5,39 @@
 # !/usr/bin/python
 # coding=UTF-8
 
+from typing import Callable, Dict
 
 from . import options
+from . import snowflake
+from . import snowflake_batch
+from . import snowflake_classic
 from . import snowflake_m1
+from . import snowflake_sequential
+from . import snowflake_sharded
+
+# 生成策略名称 -> 以 IdGeneratorOptions 创建生成器的函数
+STRATEGIES: Dict[str, Callable[[options.IdGeneratorOptions], snowflake.SnowFlake]] = {
+    # 漂移算法（M1）
+    "drift": snowflake_m1.SnowFlakeM1,
+    # 传统算法：41位时间戳 + 10位机器码 + 12位序列号
+    "classic": snowflake_classic.SnowflakeIDGenerator.from_options,
+    # 漂移算法，每次预留 batch_size 个ID
+    "batch": snowflake_batch.SnowFlakeBatch,
+    # 漂移算法，每个线程使用独立的分片
+    "sharded": snowflake_sharded.SnowFlakeSharded,
+    # 从1开始依次加1，仅用于测试
+    "sequential": snowflake_sequential.SnowFlakeSequential,
+}
+
+
+def register_strategy(name: str, factory: Callable[[options.IdGeneratorOptions], snowflake.SnowFlake]) -> None:
+    """
+    注册生成策略
+    :param name: 策略名称
+    :param factory: 以 IdGeneratorOptions 创建生成器（需实现 next_id、next_ids）的函数
+    """
+
+    STRATEGIES[name] = factory
 
 
 class DefaultIdGenerator:
@@ -17,16 +47,40 @@ class DefaultIdGenerator:
 
     def __init__(self):
         self.snowflake = None
+        self.options = None
+        self.strategy = None
 
     def set_id_generator(self, option: options.IdGeneratorOptions):
         """
-        设置id生成规则信息
+        设置id生成规则信息：method 为2时使用传统算法；设置了 shard_bit_length 时使用分片的漂移算法
+        """
+
+        if option.method == 2:
+            strategy = "classic"
+        elif option.shard_bit_length > 0:
+            strategy = "sharded"
+        else:
+            strategy = "drift"
+        self.set_strategy(strategy, option)
+
+    def set_strategy(self, strategy: str, option: options.IdGeneratorOptions = None):
+        """
+        按名称选择生成策略
+        :param strategy: drift / classic / batch / sharded / sequential 或通过 register_strategy 注册的名称
+        :param option: 生成器配置，None时沿用当前配置
         """
 
+        option = option or self.options
+        if option is None:
+            raise ValueError("please set id generator options at first.")
         if option.base_time < 100000:
             raise ValueError("base time error.")
+        if strategy not in STRATEGIES:
+            raise ValueError(f"unknown id generator strategy: {strategy}.")
 
-        self.snowflake = snowflake_m1.SnowFlakeM1(option)
+        self.snowflake = STRATEGIES[strategy](option)
+        self.options = option
+        self.strategy = strategy
 
     def next_id(self) -> int:
         """
@@ -36,3 +90,14 @@ class DefaultIdGenerator:
         if self.snowflake is None:
             raise ValueError("please set id generator at first.")
         return self.snowflake.next_id()
+
+    def next_ids(self, count: int, as_array: bool = False):
+        """
+        获取count个新的UUID，只加锁一次
+        :param count: 数量
+        :param as_array: 为True时返回 numpy int64 数组，否则返回列表
+        """
+
+        if self.snowflake is None:
+            raise ValueError("please set id generator at first.")
+        return self.snowflake.next_ids(count, as_array=as_array)
@@ -6,10 +6,169 @@ worker id generator
 # coding=UTF-8
 
 
-from threading import Thread
+from threading import Event, Lock, Thread
 import time
 import logging
-import redis
+import uuid
+
+# 所有键使用同一个哈希标签 {IdGen:WorkerId}，在 Redis Cluster 中位于同一个槽，脚本只访问 KEYS 中声明的键
+INDEX_KEY = "{IdGen:WorkerId}:Index"
+# 哈希：worker id -> 持有者标识
+OWNER_KEY = "{IdGen:WorkerId}:Owner"
+# 有序集合：worker id -> 租约到期时间（毫秒）
+EXPIRE_KEY = "{IdGen:WorkerId}:Expire"
+
+# 先清除已到期的租约，再从上次分配的位置起依次尝试占用 worker id（HSETNX），一次调用最多尝试 max_worker_id + 1 个
+ACQUIRE_SCRIPT = """
+local max_id = tonumber(ARGV[1])
+local ttl = tonumber(ARGV[2])
+local owner = ARGV[3]
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local expired = redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', now)
+for _, id in ipairs(expired) do
+    redis.call('HDEL', KEYS[2], id)
+end
+if #expired > 0 then
+    redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', now)
+end
+for i = 0, max_id do
+    local cur = redis.call('INCR', KEYS[1])
+    if cur > max_id then
+        redis.call('SET', KEYS[1], 0)
+        cur = 0
+    end
+    if redis.call('HSETNX', KEYS[2], cur, owner) == 1 then
+        redis.call('ZADD', KEYS[3], now + ttl * 1000, cur)
+        return cur
+    end
+end
+return -1
+"""
+
+# 只有持有者才能续期
+RENEW_SCRIPT = """
+if redis.call('HGET', KEYS[1], ARGV[1]) == ARGV[2] then
+    local t = redis.call('TIME')
+    local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+    redis.call('ZADD', KEYS[2], now + tonumber(ARGV[3]) * 1000, ARGV[1])
+    return 1
+end
+return 0
+"""
+
+# 只有持有者才能释放
+RELEASE_SCRIPT = """
+if redis.call('HGET', KEYS[1], ARGV[1]) == ARGV[2] then
+    redis.call('HDEL', KEYS[1], ARGV[1])
+    redis.call('ZREM', KEYS[2], ARGV[1])
+    return 1
+end
+return 0
+"""
+
+
+class RedisBackend:
+    """
+    基于redis的worker id租约存储，占用、续期、释放各为一次Lua脚本调用
+    租约保存在一个哈希与一个有序集合中（键带相同的哈希标签），可用于单机 Redis 与 Redis Cluster
+    同一地址的多个实例共用一个连接池
+    """
+
+    _pools = {}
+    _pools_lock = Lock()
+
+    def __init__(self, host, port, password=None, db=0):
+        try:
+            import redis
+        except ImportError as ept:
+            raise ImportError("RedisBackend 需要安装 redis: pip install redis") from ept
+
+        key = (host, port, db, password)
+        with RedisBackend._pools_lock:
+            pool = RedisBackend._pools.get(key)
+            if pool is None:
+                pool = redis.ConnectionPool(host=host, port=port, db=db, password=password)
+                RedisBackend._pools[key] = pool
+        self.redis_impl = redis.StrictRedis(connection_pool=pool)
+        self.__acquire = self.redis_impl.register_script(ACQUIRE_SCRIPT)
+        self.__renew = self.redis_impl.register_script(RENEW_SCRIPT)
+        self.__release = self.redis_impl.register_script(RELEASE_SCRIPT)
+
+    def acquire(self, max_worker_id, expire_time, owner) -> int:
+        return int(self.__acquire(keys=[INDEX_KEY, OWNER_KEY, EXPIRE_KEY], args=[max_worker_id, expire_time, owner]))
+
+    def renew(self, worker_id, owner, expire_time) -> bool:
+        return bool(self.__renew(keys=[OWNER_KEY, EXPIRE_KEY], args=[worker_id, owner, expire_time]))
+
+    def release(self, worker_id, owner) -> bool:
+        return bool(self.__release(keys=[OWNER_KEY, EXPIRE_KEY], args=[worker_id, owner]))
+
+    def set_if_absent(self, key, value, expire_time) -> bool:
+        return bool(self.redis_impl.set(key, value, nx=True, ex=expire_time))
+
+
+class InMemoryBackend:
+    """
+    进程内的租约存储，语义与 RedisBackend 相同，用于测试或单进程运行
+    多个 Register 共用同一个实例即相当于连接同一个redis
+    """
+
+    def __init__(self):
+        self.index = 0
+        self.leases = {}  # worker id -> (持有者, 过期时间)
+        self.values = {}  # key -> (value, 过期时间)
+        self.lock = Lock()
+
+    def __get(self, key):
+        item = self.values.get(key)
+        if item is None:
+            return None
+        if item[1] <= time.monotonic():
+            del self.values[key]
+            return None
+        return item[0]
+
+    def __owner(self, worker_id):
+        item = self.leases.get(worker_id)
+        if item is None:
+            return None
+        if item[1] <= time.monotonic():
+            del self.leases[worker_id]
+            return None
+        return item[0]
+
+    def acquire(self, max_worker_id, expire_time, owner) -> int:
+        with self.lock:
+            for _ in range(max_worker_id + 1):
+                self.index += 1
+                if self.index > max_worker_id:
+                    self.index = 0
+                if self.__owner(self.index) is None:
+                    self.leases[self.index] = (owner, time.monotonic() + expire_time)
+                    return self.index
+            return -1
+
+    def renew(self, worker_id, owner, expire_time) -> bool:
+        with self.lock:
+            if self.__owner(worker_id) != owner:
+                return False
+            self.leases[worker_id] = (owner, time.monotonic() + expire_time)
+            return True
+
+    def release(self, worker_id, owner) -> bool:
+        with self.lock:
+            if self.__owner(worker_id) != owner:
+                return False
+            del self.leases[worker_id]
+            return True
+
+    def set_if_absent(self, key, value, expire_time) -> bool:
+        with self.lock:
+            if self.__get(key) is not None:
+                return False
+            self.values[key] = (value, time.monotonic() + expire_time)
+            return True
 
 
 class Register:
@@ -19,35 +178,50 @@ class Register:
     - port 代表redis端口
     - max_worker_id worker_id的最大值, 默认为100
     - password redis的密码, 默认为空
+    - backend 租约存储, 默认按 host/port 连接redis, 也可传入 InMemoryBackend
+    - on_lost 租约失效（被其他进程占用或在过期时间内一直无法续期）时以 worker id 调用, 此时 worker_id 已置为-1,
+      调用方应停止使用该 worker id 生成ID
     """
 
-    def __init__(self, host, port, max_worker_id=100, password=None):
-        self.redis_impl = redis.StrictRedis(host=host, port=port, db=0, password=password)
+    def __init__(self, host=None, port=None, max_worker_id=100, password=None, backend=None, on_lost=None):
+        self.backend = backend if backend is not None else RedisBackend(host, port, password=password)
+        self.on_lost = on_lost
         self.loop_count = 0
         self.max_loop_count = 10
         self.worker_id_expire_time = 15
         self.max_worker_id = max_worker_id
         self.worker_id = -1
-        self.is_stop = False
+        # 租约持有者标识，续期与释放时校验，避免误操作其他进程占用的worker id
+        self.owner = uuid.uuid4().hex
+        self.__stop_event = Event()
+        self.__renew_thread = None
+
+    @property
+    def is_stop(self):
+        return self.__stop_event.is_set()
 
     def get_lock(self, key):
         """
         获取分布式全局锁,并设置过期时间为30秒
         """
 
-        if self.redis_impl.setnx(key, 1):
-            self.redis_impl.expire(key, 30)
-            return True
-        if self.redis_impl.ttl(key) < 0:
-            self.redis_impl.expire(key, 30)
-        return False
+        return self.backend.set_if_absent(key, 1, 30)
 
     def stop(self):
         """
-        退出注册器的线程
+        退出注册器的线程并释放worker id
         """
 
-        self.is_stop = True
+        self.__stop_event.set()
+        if self.__renew_thread is not None:
+            self.__renew_thread.join(timeout=self.worker_id_expire_time)
+            self.__renew_thread = None
+        if self.worker_id > -1:
+            try:
+                self.backend.release(self.worker_id, self.owner)
+            except Exception as exe:
+                logging.error(exe)
+            self.worker_id = -1
 
     def get_worker_id(self):
         """
@@ -55,80 +229,61 @@ class Register:
         失败返回-1
         """
 
-        self.loop_count = 0
-
-        def extern_life(my_id):
-            while 1:
-                time.sleep(self.worker_id_expire_time / 3)
-                # 是否关闭了
-                if self.is_stop:
-                    return
-                # 更新生命周期
-                if self.worker_id != my_id:
-                    break
-                try:
-                    self.redis_impl.expire(
-                        f"IdGen:WorkerId:Value:{my_id}",
-                        self.worker_id_expire_time)
-                except Exception as exe:
-                    logging.error(exe)
-                continue
-
+        self.__stop_event.clear()
         self.worker_id = self.__get_next_worker_id()
         if self.worker_id > -1:
-            Thread(target=extern_life, args=[self.worker_id]).start()
+            self.__renew_thread = Thread(target=self.__extern_life, args=[self.worker_id], daemon=True)
+            self.__renew_thread.start()
         return self.worker_id
 
-    def __get_next_worker_id(self):
+    def __extern_life(self, my_id):
         """
-        获取全局唯一worker id内部实现
+        每隔过期时间的1/3续期一次，stop 后立即退出；
+        续期被拒绝或自上次成功续期起已超过过期时间时视为租约失效
         """
 
-        cur = self.redis_impl.incrby("IdGen:WorkerId:Index", 1)
-
-        def can_reset():
+        renewed_at = time.monotonic()
+        while not self.__stop_event.wait(self.worker_id_expire_time / 3):
+            if self.worker_id != my_id:
+                return
             try:
-                reset_value = self.redis_impl.incr("IdGen:WorkerId:Value:Edit")
-                return reset_value != 1
-            except Exception as ept:
-                logging.error(ept)
-                return False
+                if self.backend.renew(my_id, self.owner, self.worker_id_expire_time):
+                    renewed_at = time.monotonic()
+                    continue
+                logging.error(f"worker id {my_id} 的租约已失效")
+            except Exception as exe:
+                logging.error(exe)
+                if time.monotonic() - renewed_at < self.worker_id_expire_time:
+                    continue
+                logging.error(f"worker id {my_id} 超过 {self.worker_id_expire_time} 秒未能续期")
+            self.__lost(my_id)
+            return
 
-        def end_reset():
+    def __lost(self, my_id):
+        if self.worker_id != my_id:
+            return
+        self.worker_id = -1
+        if self.on_lost is not None:
             try:
-                self.redis_impl.set("IdGen:WorkerId:Value:Edit", 0)
-            except Exception as ept:
-                logging.error(ept)
+                self.on_lost(my_id)
+            except Exception as exe:
+                logging.error(exe)
 
-        def is_available(worker_id: int):
+    def __get_next_worker_id(self):
+        """
+        获取全局唯一worker id内部实现：每次尝试为一次后端调用，失败后退避重试，最多 max_loop_count 次
+        """
+
+        for self.loop_count in range(1, self.max_loop_count + 1):
             try:
-                rst = self.redis_impl.get(f"IdGen:WorkerId:Value:{worker_id}")
-                return rst != "Y"
+                worker_id = self.backend.acquire(self.max_worker_id, self.worker_id_expire_time, self.owner)
             except Exception as ept:
                 logging.error(ept)
-                return False
-
-        if cur > self.max_worker_id:
-            if can_reset():
-                self.redis_impl.set("IdGen:WorkerId:Index", -1)
-                end_reset()
-                self.loop_count += 1
-
-                if self.loop_count > self.max_loop_count:
-                    self.loop_count = 0
-                    return -1
-
-                time.sleep(0.2 * self.loop_count)
-                return self.__get_next_worker_id()
-            time.sleep(0.2)
-            return self.__get_next_worker_id()
-        if is_available(cur):
-            self.redis_impl.setex(
-                f"IdGen:WorkerId:Value:{cur}",
-                self.worker_id_expire_time,
-                "Y"
-            )
-            self.loop_count = 0
-            return cur
-
-        return self.__get_next_worker_id()
+                worker_id = -1
+            if worker_id > -1:
+                self.loop_count = 0
+                return worker_id
+            if self.__stop_event.wait(0.2 * self.loop_count):
+                break
+        self.loop_count = 0
+        return -1
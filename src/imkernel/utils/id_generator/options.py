@@ -12,11 +12,12 @@ class IdGeneratorOptions:
     - worker_id 全局唯一id, 区分不同uuid生成器实例
     - worker_id_bit_length 生成的uuid中worker_id占用的位数
     - seq_bit_length 生成的uuid中序列号占用的位数
+    - shard_bit_length 序列号中分片号占用的位数
     """
 
-    def __init__(self, worker_id=0, worker_id_bit_length=6, seq_bit_length=6):
+    def __init__(self, worker_id=0, worker_id_bit_length=6, seq_bit_length=6, shard_bit_length=0):
 
-        # 雪花计算方法,（1-漂移算法|2-传统算法）, 默认1。目前只实现了1。
+        # 雪花计算方法,（1-漂移算法|2-传统算法）, 默认1。也可通过 DefaultIdGenerator.set_strategy 按名称选择
         self.method = 1
 
         # 基础时间（ms单位）, 不能超过当前系统时间
@@ -41,3 +42,10 @@ class IdGeneratorOptions:
 
         # 最大漂移次数（含）, 默认2000, 推荐范围500-10000（与计算能力有关）
         self.top_over_cost_count = 2000
+
+        # 分片位长, 默认0表示不分片。大于0时序列数的高位作为分片号, 每个线程使用独立的分片生成ID
+        # （要求：序列数位长-分片位长对应的最大序列数不小于最小序列数）
+        self.shard_bit_length = shard_bit_length
+
+        # 批量预留策略每次预留的ID数, 默认1000
+        self.batch_size = 1000
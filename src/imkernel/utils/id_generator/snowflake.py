@@ -6,6 +6,8 @@
 # !/usr/bin/python
 # coding=UTF-8
 
+import numpy as np
+
 
 class SnowFlake():
 
@@ -18,3 +20,11 @@ class SnowFlake():
         """
         
         return 0
+
+    def next_ids(self, count: int, as_array: bool = False):
+        """
+        获取count个新的UUID
+        """
+
+        ids = [self.next_id() for _ in range(count)]
+        return np.array(ids, dtype=np.int64) if as_array else ids
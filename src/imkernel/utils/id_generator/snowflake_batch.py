@@ -0,0 +1,41 @@
+"""
+批量预留生成器
+"""
+
+# !/usr/bin/python
+# coding=UTF-8
+
+import threading
+from collections import deque
+
+from .options import IdGeneratorOptions
+from .snowflake import SnowFlake
+from .snowflake_m1 import SnowFlakeM1
+
+
+class SnowFlakeBatch(SnowFlake):
+    """
+    批量预留规则ID生成器
+    每次从M1生成器预留 batch_size 个ID放入缓冲区，next_id 直接从缓冲区取出，缓冲区为空时才加锁补充。
+    ID按预留的时间戳生成，取出时间晚于生成时间，ID的大小顺序在多线程间不保证与取出顺序一致。
+    """
+
+    def __init__(self, options: IdGeneratorOptions):
+        super().__init__(options)
+        self.batch_size = max(int(options.batch_size), 1)
+        self.generator = SnowFlakeM1(options)
+        self.__buffer = deque()
+        self.__refill_lock = threading.Lock()
+
+    def next_id(self) -> int:
+        while True:
+            try:
+                # deque.popleft 是原子操作，不需要加锁
+                return self.__buffer.popleft()
+            except IndexError:
+                with self.__refill_lock:
+                    if not self.__buffer:
+                        self.__buffer.extend(self.generator.next_ids(self.batch_size))
+
+    def next_ids(self, count: int, as_array: bool = False):
+        return self.generator.next_ids(count, as_array=as_array)
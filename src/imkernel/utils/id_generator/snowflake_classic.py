@@ -0,0 +1,131 @@
+"""
+传统雪花算法生成器
+"""
+
+# !/usr/bin/python
+# coding=UTF-8
+
+import threading
+import time
+
+import numpy as np
+
+from .options import IdGeneratorOptions
+from .snowflake import SnowFlake
+
+
+class SnowflakeIDGenerator(SnowFlake):
+    """
+    传统雪花算法ID生成器（41位时间戳 + 5位数据中心 + 5位机器码 + 12位序列号）
+
+    同一毫秒内序列号用尽时不再忙等，而是借用下一毫秒继续生成（逻辑时间超前于系统时钟），
+    超前超过 max_drift_ms 时才短暂休眠等待时钟追上；系统时钟回拨不超过 max_rollback_ms 时沿用逻辑时间继续生成，
+    超过时报错。借用、休眠、回拨的次数记录在 metrics 中。
+    """
+
+    def __init__(self, datacenter_id, worker_id, sequence=0, max_drift_ms: int = 1000, max_rollback_ms: int = 5000):
+        """
+        :param datacenter_id: 数据中心ID
+        :param worker_id: 机器码
+        :param sequence: 初始序列号
+        :param max_drift_ms: 借用时间最多超前系统时钟的毫秒数
+        :param max_rollback_ms: 可容忍的时钟回拨毫秒数
+        """
+        self.epoch = 1288834974657
+        self.datacenter_id_bits = 5
+        self.worker_id_bits = 5
+        self.sequence_bits = 12
+
+        self.max_datacenter_id = -1 ^ (-1 << self.datacenter_id_bits)
+        self.max_worker_id = -1 ^ (-1 << self.worker_id_bits)
+        self.max_sequence = -1 ^ (-1 << self.sequence_bits)
+
+        self.worker_id_shift = self.sequence_bits
+        self.datacenter_id_shift = self.sequence_bits + self.worker_id_bits
+        self.timestamp_left_shift = self.sequence_bits + self.worker_id_bits + self.datacenter_id_bits
+
+        self.datacenter_id = datacenter_id
+        self.worker_id = worker_id
+        self.sequence = sequence
+        self.last_timestamp = -1
+        self.max_drift_ms = max_drift_ms
+        self.max_rollback_ms = max_rollback_ms
+
+        # 最近一次读取的系统时钟，用于识别时钟回拨
+        self._last_clock = -1
+        self._lock = threading.Lock()
+        self.metrics = {"generated": 0, "borrowed": 0, "sleeps": 0, "clock_rollbacks": 0, "max_drift_ms": 0}
+
+        if datacenter_id > self.max_datacenter_id or datacenter_id < 0:
+            raise ValueError("Datacenter ID out of range")
+        if worker_id > self.max_worker_id or worker_id < 0:
+            raise ValueError("Worker ID out of range")
+
+    def _current_timestamp(self):
+        return int(time.time() * 1000)
+
+    def _wait_for_next_millis(self, last_timestamp):
+        """
+        休眠到系统时钟超过 last_timestamp
+        """
+        timestamp = self._current_timestamp()
+        while timestamp <= last_timestamp:
+            time.sleep((last_timestamp - timestamp + 1) / 1000)
+            timestamp = self._current_timestamp()
+        return timestamp
+
+    @classmethod
+    def from_options(cls, options: IdGeneratorOptions) -> "SnowflakeIDGenerator":
+        """
+        由ID生成器配置创建：worker_id 的高5位作为数据中心ID、低5位作为机器码，base_time 作为起始时间
+        """
+        generator = cls(datacenter_id=(options.worker_id >> 5) & 0x1F, worker_id=options.worker_id & 0x1F)
+        if (options.worker_id >> 10) != 0:
+            raise ValueError("Worker ID out of range")
+        generator.epoch = int(options.base_time)
+        return generator
+
+    def generate_id(self):
+        with self._lock:
+            return self.__generate_id()
+
+    def next_id(self) -> int:
+        return self.generate_id()
+
+    def next_ids(self, count: int, as_array: bool = False):
+        """
+        在一次加锁内获取count个新的ID
+        """
+        with self._lock:
+            ids = [self.__generate_id() for _ in range(count)]
+        return np.array(ids, dtype=np.int64) if as_array else ids
+
+    def __generate_id(self):
+        timestamp = self._current_timestamp()
+        if timestamp < self._last_clock:
+            self.metrics["clock_rollbacks"] += 1
+        self._last_clock = timestamp
+
+        if timestamp > self.last_timestamp:
+            self.sequence = 0
+            self.last_timestamp = timestamp
+        else:
+            lag = self.last_timestamp - timestamp
+            if lag > max(self.max_rollback_ms, self.max_drift_ms):
+                raise Exception(f"Clock moved backwards by {lag} ms. Refusing to generate id")
+            self.sequence = (self.sequence + 1) & self.max_sequence
+            if self.sequence == 0:
+                # 序列号用尽，借用下一毫秒
+                self.last_timestamp += 1
+                self.metrics["borrowed"] += 1
+                drift = self.last_timestamp - timestamp
+                if drift > self.max_drift_ms:
+                    self.metrics["sleeps"] += 1
+                    self._wait_for_next_millis(self.last_timestamp - self.max_drift_ms - 1)
+                self.metrics["max_drift_ms"] = max(self.metrics["max_drift_ms"], drift)
+
+        self.metrics["generated"] += 1
+        return ((self.last_timestamp - self.epoch) << self.timestamp_left_shift) | \
+            (self.datacenter_id << self.datacenter_id_shift) | \
+            (self.worker_id << self.worker_id_shift) | \
+            self.sequence
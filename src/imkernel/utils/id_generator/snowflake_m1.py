@@ -7,6 +7,9 @@ M1生成器
 
 import threading
 import time
+
+import numpy as np
+
 from .snowflake import SnowFlake
 from .options import IdGeneratorOptions
 
@@ -54,6 +57,7 @@ class SnowFlakeM1(SnowFlake):
         self.__turn_back_index: int = 0
         self.__is_over_cost = False
         self.___over_cost_count_in_one_term: int = 0
+        self.__is_turn_back = False
         self.__id_lock = threading.Lock()
 
     def __next_over_cost_id(self) -> int:
@@ -112,15 +116,19 @@ class SnowFlakeM1(SnowFlake):
         return self.__calc_id(self.__last_time_tick)
 
     def __calc_id(self, use_time_tick) -> int:
+        # 先使用当前序列数再递增，序列数不会超过 max_seq_number 而溢出到机器码位
+        result = (
+                         (use_time_tick << self.__timestamp_shift) +
+                         (self.worker_id << self.seq_bit_length) +
+                         self.__current_seq_number
+                 ) % int(1e64)
         self.__current_seq_number += 1
-        return (
-                       (use_time_tick << self.__timestamp_shift) +
-                       (self.worker_id << self.seq_bit_length) +
-                       self.__current_seq_number
-               ) % int(1e64)
+        self.__is_turn_back = False
+        return result
 
     def __calc_turn_back_id(self, use_time_tick) -> int:
         self.__turn_back_time_tick -= 1
+        self.__is_turn_back = True
         return (
                        (use_time_tick << self.__timestamp_shift) +
                        (self.worker_id << self.seq_bit_length) +
@@ -138,10 +146,39 @@ class SnowFlakeM1(SnowFlake):
             temp_time_ticker = self.__get_current_time_tick()
         return temp_time_ticker
 
+    def __next_id(self) -> int:
+        if self.__is_over_cost:
+            return self.__next_over_cost_id()
+        return self.__next_normal_id()
+
     def next_id(self) -> int:
         with self.__id_lock:
-            if self.__is_over_cost:
-                nextid = self.__next_over_cost_id()
-            else:
-                nextid = self.__next_normal_id()
-            return nextid
+            return self.__next_id()
+
+    def next_ids(self, count: int, as_array: bool = False):
+        """
+        在一次加锁内获取count个新的UUID
+        同一时间戳内的ID是连续整数，按段分配：每段的第一个ID按单个生成的规则（含漂移、时间回拨）取得，
+        其余ID直接使用该时间戳剩余的序列数，时钟不变时结果与连续调用count次 next_id 相同
+        :param count: 数量
+        :param as_array: 为True时返回 numpy int64 数组，否则返回列表
+        """
+        runs = []
+        with self.__id_lock:
+            remaining = count
+            while remaining > 0:
+                first = self.__next_id()
+                size = 1
+                # 漂移次数达到上限后，单个生成会等待下一个时间戳，不再使用本时间戳剩余的序列数
+                over_cost_limited = self.__is_over_cost and self.___over_cost_count_in_one_term >= self.top_over_cost_count
+                if not self.__is_turn_back and not over_cost_limited:
+                    size += min(remaining - 1, self.max_seq_number - self.__current_seq_number + 1)
+                    self.__current_seq_number += size - 1
+                runs.append((first, size))
+                remaining -= size
+
+        if as_array:
+            if not runs:
+                return np.empty(0, dtype=np.int64)
+            return np.concatenate([np.arange(first, first + size, dtype=np.int64) for first, size in runs])
+        return [i for first, size in runs for i in range(first, first + size)]
@@ -0,0 +1,45 @@
+"""
+顺序生成器
+"""
+
+# !/usr/bin/python
+# coding=UTF-8
+
+import threading
+
+import numpy as np
+
+from .options import IdGeneratorOptions
+from .snowflake import SnowFlake
+
+
+class SnowFlakeSequential(SnowFlake):
+    """
+    顺序ID生成器，从 start 开始依次加1，用于测试中得到可重复的ID
+    """
+
+    def __init__(self, options: IdGeneratorOptions = None, start: int = 1):
+        super().__init__(options)
+        self.__next = start
+        self.__id_lock = threading.Lock()
+
+    def reset(self, start: int = 1) -> None:
+        """
+        重新从 start 开始生成
+        """
+        with self.__id_lock:
+            self.__next = start
+
+    def next_id(self) -> int:
+        with self.__id_lock:
+            nextid = self.__next
+            self.__next += 1
+            return nextid
+
+    def next_ids(self, count: int, as_array: bool = False):
+        with self.__id_lock:
+            first = self.__next
+            self.__next += count
+        if as_array:
+            return np.arange(first, first + count, dtype=np.int64)
+        return list(range(first, first + count))
@@ -0,0 +1,123 @@
+"""
+分片生成器
+"""
+
+# !/usr/bin/python
+# coding=UTF-8
+
+import copy
+import queue
+import threading
+from contextlib import contextmanager
+from typing import List
+
+from .options import IdGeneratorOptions
+from .snowflake import SnowFlake
+from .snowflake_m1 import SnowFlakeM1
+
+
+class _Lease:
+    """
+    线程持有的分片，线程结束、线程局部存储被回收时归还
+    回收可能发生在任意线程（包括正持有分片池锁的线程），因此只放入归还队列，不加锁
+    """
+
+    def __init__(self, owner: "SnowFlakeSharded", shard: int):
+        self.returned = owner._returned
+        self.shard = shard
+        self.generator = owner.shard_generator(shard)
+
+    def __del__(self):
+        if self.shard >= 0:
+            # SimpleQueue.put 可重入，可在析构函数中调用
+            self.returned.put(self.shard)
+
+
+class SnowFlakeSharded(SnowFlake):
+    """
+    分片规则ID生成器
+    序列数的高 shard_bit_length 位作为分片号，每个分片是一个独立的M1生成器，使用剩余的序列数位。
+    每个线程首次生成ID时独占一个分片，之后不再与其他线程竞争同一把锁；
+    线程数超过分片数时，多出的线程按顺序共用分片（分片自身加锁，ID仍然唯一）。
+    分片的ID与未分片时同一 worker_id 的ID处于同一空间，同一 worker_id 不能同时使用两种方式。
+    """
+
+    def __init__(self, options: IdGeneratorOptions):
+        self.shard_bit_length = int(options.shard_bit_length)
+        if self.shard_bit_length < 1:
+            raise ValueError("shard_bit_length error.")
+
+        worker_id_bit_length = int(options.worker_id_bit_length) or 6
+        seq_bit_length = int(options.seq_bit_length) or 6
+        shard_seq_bit_length = seq_bit_length - self.shard_bit_length
+        if (1 << shard_seq_bit_length) - 1 < int(options.min_seq_number):
+            raise ValueError("seq_bit_length too small for shard_bit_length.")
+
+        self.options = options
+        self.shards: List[SnowFlakeM1] = []
+        for shard in range(1 << self.shard_bit_length):
+            shard_options = copy.copy(options)
+            shard_options.worker_id = (options.worker_id << self.shard_bit_length) | shard
+            shard_options.worker_id_bit_length = worker_id_bit_length + self.shard_bit_length
+            shard_options.seq_bit_length = shard_seq_bit_length
+            shard_options.max_seq_number = 0
+            self.shards.append(SnowFlakeM1(shard_options))
+
+        self.__free = list(range(len(self.shards) - 1, -1, -1))
+        self.__shared_index = 0
+        self.__pool_lock = threading.Lock()
+        self.__local = threading.local()
+        # 线程结束时归还的分片，由 _acquire 取回
+        self._returned = queue.SimpleQueue()
+
+    def _acquire(self) -> int:
+        with self.__pool_lock:
+            while True:
+                try:
+                    self.__free.append(self._returned.get_nowait())
+                except queue.Empty:
+                    break
+            if self.__free:
+                return self.__free.pop()
+            # 分片用尽时共用分片，以负数区分，归还时忽略
+            shard = self.__shared_index % len(self.shards)
+            self.__shared_index += 1
+            return -1 - shard
+
+    def _release(self, shard: int) -> None:
+        if shard < 0:
+            return
+        with self.__pool_lock:
+            self.__free.append(shard)
+
+    def shard_generator(self, shard: int) -> SnowFlakeM1:
+        """
+        分片号对应的生成器（负数表示共用的分片）
+        """
+        return self.shards[shard if shard >= 0 else -1 - shard]
+
+    def __current(self) -> SnowFlakeM1:
+        lease = getattr(self.__local, "lease", None)
+        if lease is None:
+            lease = _Lease(self, self._acquire())
+            self.__local.lease = lease
+        return lease.generator
+
+    @contextmanager
+    def lease(self):
+        """
+        显式占用一个分片，用于 asyncio 任务组等不以线程区分的场景
+        with generator.lease() as shard:
+            shard.next_id()
+        """
+        shard = self._acquire()
+        try:
+            yield self.shard_generator(shard)
+        finally:
+            self._release(shard)
+
+    def next_id(self) -> int:
+        return self.__current().next_id()
+
+    def next_ids(self, count: int, as_array: bool = False):
+        return self.__current().next_ids(count, as_array=as_array)
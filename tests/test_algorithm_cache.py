@@ -0,0 +1,44 @@
+import threading
+import time
+
+from imkernel.core import utils
+from imkernel.core.utils import clear_algorithm_cache, get_algorithm_by_path, set_algorithm_cache_size
+
+
+def test_slow_import_does_not_block_other_files(tmp_path):
+    slow = tmp_path / "slow.py"
+    slow.write_text("import time\ntime.sleep(0.5)\ndef f():\n    return 1\n")
+    # 选择与慢文件不共用导入锁的文件名
+    fast = next(path for path in (tmp_path / f"fast{i}.py" for i in range(1000))
+                if utils._algorithm_load_lock(str(path)) is not utils._algorithm_load_lock(str(slow)))
+    fast.write_text("def g():\n    return 2\n")
+    clear_algorithm_cache()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(get_algorithm_by_path(str(slow), "f"))) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.1)
+    start = time.perf_counter()
+    assert get_algorithm_by_path(str(fast), "g")() == 2
+    assert time.perf_counter() - start < 0.3
+    for thread in threads:
+        thread.join()
+    # 同一文件只导入一次
+    assert len({id(f) for f in results}) == 1
+
+
+def test_load_locks_do_not_grow(tmp_path):
+    set_algorithm_cache_size(4)
+    clear_algorithm_cache()
+    locks = utils._algorithm_load_locks
+    try:
+        for i in range(200):
+            algo = tmp_path / f"algo{i}.py"
+            algo.write_text(f"def f():\n    return {i}\n")
+            assert get_algorithm_by_path(str(algo), "f")() == i
+        assert utils._algorithm_load_locks is locks and len(locks) == 64
+        assert len(utils._algorithm_cache) == 4
+    finally:
+        set_algorithm_cache_size(32)
+        clear_algorithm_cache()
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from imkernel.core.model import Model
+
+ROWS = [["r0", "a0", "b0"], ["r1", "a1", "b1"], ["r2", "a2", "b2"]]
+DATA = [[[1, 2], [0.5]], [[3, 4], [1.5]], [[5, 6], [2.5]]]
+
+
+def _model(columnar=False):
+    model = Model(columnar=columnar)
+    model.element.create("root")
+    model.element.create("a", parent_id="root")
+    model.element.create("b", parent_id="root")
+    model.element.parameter_group("a", ["x", "y"])
+    model.element.parameter("a", [["x"], ["y"]])
+    return model
+
+
+def _parameter_data(model):
+    node = model.element.tree.find_node_by_id("a")
+    return {name: {key: value for key, value in node.find_parameters_by_group(name)["parameter_data"].items()} for name in ("x", "y")}
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+@pytest.mark.parametrize("as_input", [
+    lambda rows: rows,
+    lambda rows: iter(tuple(row) for row in rows),
+    lambda rows: np.array(rows, dtype=object),
+    # 列名包含所有节点ID时按节点ID重排
+    lambda rows: pd.DataFrame(rows, columns=["root", "a", "b"])[["b", "root", "a"]],
+    lambda rows: np.array([(a, root, b) for root, a, b in rows], dtype=[("a", "U2"), ("root", "U2"), ("b", "U2")]),
+])
+def test_bulk_api_matches_per_row_api(columnar, as_input):
+    expected = _model(columnar)
+    for index, row in enumerate(ROWS):
+        expected.element.add_model_data(row)
+        expected.element.add_parameter_data(index, "a", "x", DATA[index][0])
+        expected.element.add_parameter_data(index, "a", "y", DATA[index][1])
+
+    model = _model(columnar)
+    assert model.element.add_model_data_many(as_input(ROWS)) == range(3)
+    assert model.element.add_parameter_data_bulk("a", "x", np.array([d[0] for d in DATA])) == range(3)
+    assert model.element.add_parameter_data_bulk("a", "y", pd.DataFrame([d[1] for d in DATA])) == range(3)
+
+    assert model.element.model_data == expected.element.model_data
+    assert _parameter_data(model) == _parameter_data(expected)
+    for name, data in _parameter_data(model).items():
+        assert all(type(v) is type(e) for key in data for v, e in zip(data[key], _parameter_data(expected)[name][key]))
+
+
+def test_mismatched_row_length_raises_without_partial_write():
+    model = _model()
+    model.element.add_model_data(ROWS[0])
+    with pytest.raises(ValueError, match="第1行"):
+        model.element.add_model_data_many([ROWS[1], ROWS[2][:2], ROWS[2]])
+    assert model.element.model_data == [ROWS[0]]
+
+    for columnar in (False, True):
+        model = _model(columnar)
+        model.element.add_model_data_many(ROWS[:2])
+        # 数据条数超过对象层数据时整体拒绝，不写入前面的数据
+        with pytest.raises(KeyError):
+            model.element.add_parameter_data_bulk("a", "x", np.array([d[0] for d in DATA]))
+        with pytest.raises(KeyError):
+            model.element.add_parameter_data_bulk("a", "y", [d[1] for d in DATA], start_index=1)
+        assert _parameter_data(model) == {"x": {}, "y": {}}
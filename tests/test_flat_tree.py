@@ -0,0 +1,97 @@
+import io
+import random
+
+import numpy as np
+import pytest
+
+from imkernel.core.flat_tree import FlatTreeBase
+from imkernel.core.node_base import NodeBase
+from imkernel.core.tree_base import TreeBase
+
+
+def _random_trees(count, seed=0):
+    rng = random.Random(seed)
+    flat, tree = FlatTreeBase(capacity=4), TreeBase()
+    ids = []
+    for i in range(count):
+        parent_id = rng.choice(ids) if ids and rng.random() < 0.9 else None
+        node_id = f"n{i}"
+        flat.create_node(NodeBase(node_id, f"描述{i}" if i % 3 else None), parent_id)
+        tree.create_node(NodeBase(node_id, f"描述{i}" if i % 3 else None), parent_id)
+        ids.append(node_id)
+    return flat, tree, ids
+
+
+def _brute_subtree(flat, node_id):
+    found = set()
+    for node_id_ in flat.nodes:
+        current = node_id_
+        while current is not None:
+            if current == node_id:
+                found.add(node_id_)
+                break
+            parent = flat.get_parent(current)
+            current = None if parent is None else parent.id
+    return found
+
+
+def test_subtree_mask_matches_parent_walk():
+    flat, _, ids = _random_trees(300)
+    for node_id in random.Random(1).sample(ids, 30):
+        mask = flat.subtree_mask(node_id)
+        assert {flat._node_list[i].id for i in np.flatnonzero(mask)} == _brute_subtree(flat, node_id)
+    union = flat.subtree_mask(ids[:3])
+    assert np.array_equal(union, flat.subtree_mask(ids[0]) | flat.subtree_mask(ids[1]) | flat.subtree_mask(ids[2]))
+
+
+def test_deep_chain():
+    flat = FlatTreeBase()
+    flat.create_node(NodeBase("0"))
+    for i in range(1, 5000):
+        flat.create_node(NodeBase(str(i)), str(i - 1))
+    assert flat.subtree_mask("4000").sum() == 1000
+    assert flat.depths()[flat.index_of("4999")] == 4999
+    assert len(flat.print_id().splitlines()) == 5000
+
+
+def test_arrays_round_trip(tmp_path):
+    flat, _, _ = _random_trees(200)
+    np.savez(tmp_path / "tree.npz", **flat.to_arrays())
+    with np.load(tmp_path / "tree.npz") as arrays:
+        loaded = FlatTreeBase.from_arrays(arrays)
+    assert loaded.print_id() == flat.print_id()
+    assert loaded.print_desc() == flat.print_desc()
+    assert {i: n.desc for i, n in loaded.nodes.items()} == {i: n.desc for i, n in flat.nodes.items()}
+
+
+def test_remove_and_recreate_under_new_parent():
+    flat, tree, ids = _random_trees(100, seed=2)
+    removed = _brute_subtree(flat, "n5")
+    flat.remove_node(flat.nodes["n5"])
+    tree.remove_node(tree.nodes["n5"])
+    assert not removed & set(flat.nodes)
+    assert flat.print_id() == tree.print_id()
+    # 重新以同一ID挂到其他父节点下，复用空出的数组位置
+    capacity = len(flat.parent)
+    new_parent = next(i for i in ids if i in flat.nodes and i != "n0")
+    flat.create_node(NodeBase("n5"), new_parent)
+    tree.create_node(NodeBase("n5"), new_parent)
+    assert len(flat.parent) == capacity
+    assert flat.get_parent("n5").id == new_parent
+    assert flat.get_children(new_parent)[-1].id == "n5"
+    assert flat.print_id() == tree.print_id()
+    with pytest.raises(ValueError):
+        flat.create_node(NodeBase("n5"), "n0")
+
+
+@pytest.mark.parametrize("max_depth", [None, 0, 1, 3])
+def test_printing_matches_tree_base(max_depth):
+    flat, tree, ids = _random_trees(150, seed=3)
+    for format_type in ("id", "desc"):
+        for root_id in (None, ids[0]):
+            lines = list(flat.iter_tree_lines(format_type, root_id=root_id, max_depth=max_depth))
+            assert lines == list(tree.iter_tree_lines(format_type, root_id=root_id, max_depth=max_depth))
+            out = io.StringIO()
+            flat.write_tree(out, format_type, root_id=root_id, max_depth=max_depth)
+            assert out.getvalue() == "".join(line + "\n" for line in lines)
+    assert str(flat) == str(tree) == tree.print_id()
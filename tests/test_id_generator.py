@@ -0,0 +1,125 @@
+import threading
+
+import numpy as np
+import pytest
+
+from imkernel.core import model_3
+from imkernel.utils.id_generator import DefaultIdGenerator, STRATEGIES, register_strategy
+from imkernel.utils.id_generator.options import IdGeneratorOptions
+from imkernel.utils.id_generator.snowflake_batch import SnowFlakeBatch
+from imkernel.utils.id_generator.snowflake_classic import SnowflakeIDGenerator
+from imkernel.utils.id_generator.snowflake_m1 import SnowFlakeM1
+from imkernel.utils.id_generator.snowflake_sequential import SnowFlakeSequential
+from imkernel.utils.id_generator.snowflake_sharded import SnowFlakeSharded
+
+STRATEGY_TYPES = {
+    "drift": SnowFlakeM1,
+    "classic": SnowflakeIDGenerator,
+    "batch": SnowFlakeBatch,
+    "sharded": SnowFlakeSharded,
+    "sequential": SnowFlakeSequential,
+}
+
+
+def _options(**attrs):
+    options = IdGeneratorOptions(worker_id=5, seq_bit_length=10, shard_bit_length=2)
+    for name, value in attrs.items():
+        setattr(options, name, value)
+    return options
+
+
+@pytest.mark.parametrize("attrs, strategy", [
+    ({"shard_bit_length": 0}, "drift"),
+    ({"method": 2, "shard_bit_length": 0}, "classic"),
+    ({"method": 2}, "classic"),
+    ({}, "sharded"),
+])
+def test_set_id_generator_selects_strategy(attrs, strategy):
+    generator = DefaultIdGenerator()
+    generator.set_id_generator(_options(**attrs))
+    assert generator.strategy == strategy and type(generator.snowflake) is STRATEGY_TYPES[strategy]
+
+
+@pytest.mark.parametrize("strategy", sorted(STRATEGY_TYPES))
+def test_every_strategy_generates_unique_ids(strategy):
+    generator = DefaultIdGenerator()
+    generator.set_strategy(strategy, _options())
+    assert type(generator.snowflake) is STRATEGY_TYPES[strategy]
+    ids = [generator.next_id() for _ in range(100)] + generator.next_ids(3000)
+    array = generator.next_ids(50, as_array=True)
+    assert isinstance(array, np.ndarray) and array.dtype == np.int64
+    ids += array.tolist()
+    assert len(set(ids)) == len(ids) and all(isinstance(i, int) for i in ids)
+
+    results = []
+
+    def work():
+        results.append(generator.next_ids(500))
+
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    merged = ids + [i for batch in results for i in batch]
+    assert len(set(merged)) == len(merged)
+
+
+def test_strategy_errors():
+    generator = DefaultIdGenerator()
+    with pytest.raises(ValueError, match="please set id generator at first"):
+        generator.next_id()
+    with pytest.raises(ValueError, match="please set id generator options at first"):
+        generator.set_strategy("drift")
+    with pytest.raises(ValueError, match="unknown id generator strategy: missing"):
+        generator.set_strategy("missing", _options())
+    with pytest.raises(ValueError, match="base time error"):
+        generator.set_strategy("drift", _options(base_time=1))
+    # 出错时不改变当前策略
+    generator.set_strategy("sequential", _options())
+    with pytest.raises(ValueError):
+        generator.set_strategy("missing")
+    assert generator.strategy == "sequential" and generator.next_id() == 1
+    # 不传配置时沿用当前配置
+    generator.set_strategy("drift")
+    assert generator.strategy == "drift" and generator.options.worker_id == 5
+
+
+def test_register_strategy():
+    created = []
+
+    def factory(options):
+        created.append(options)
+        return SnowFlakeSequential(options, start=100)
+
+    register_strategy("custom", factory)
+    try:
+        generator = DefaultIdGenerator()
+        options = _options()
+        generator.set_strategy("custom", options)
+        assert created == [options] and generator.strategy == "custom"
+        assert generator.next_ids(3) == [100, 101, 102] and generator.next_id() == 103
+    finally:
+        STRATEGIES.pop("custom")
+
+
+def test_model_3_reserves_unique_ids(monkeypatch, capsys):
+    generator = DefaultIdGenerator()
+    generator.set_strategy("sequential", _options())
+    monkeypatch.setattr(model_3, "idgen", generator)
+
+    trees = [
+        model_3.system("sup", "sys", "sub"),
+        model_3.system("sup", "sys", ["a", None, "b"]),
+        model_3.system("sup", ["s1", "s2", "s3"], [["a", "b"], "c", None]),
+    ]
+    ids = [node.identifier for tree in trees for node in tree.all_nodes()]
+    assert len(ids) == 3 + 4 + 7
+    # 每棵树的ID一次预留且连续，与预计的节点数一致，所有树之间不重复
+    assert sorted(ids) == list(range(1, len(ids) + 1))
+    assert generator.next_id() == len(ids) + 1
+
+    # 使用默认生成器时各次调用的ID同样不重复
+    monkeypatch.undo()
+    default_ids = [node.identifier for _ in range(20) for node in model_3.system("sup", ["s1", "s2"], [["a"], ["b", "c"]]).all_nodes()]
+    assert len(set(default_ids)) == len(default_ids) == 20 * 6
@@ -0,0 +1,28 @@
+import time
+
+from imkernel.utils.id_generator.idregister import InMemoryBackend, Register
+
+
+def test_workers_get_distinct_ids_and_release_them():
+    backend = InMemoryBackend()
+    registers = [Register(backend=backend, max_worker_id=300) for _ in range(200)]
+    ids = [register.get_worker_id() for register in registers]
+    assert len(set(ids)) == 200 and -1 not in ids
+    for register in registers:
+        register.stop()
+    assert not backend.leases
+
+
+def test_lost_lease_is_reported():
+    backend = InMemoryBackend()
+    lost = []
+    register = Register(backend=backend, on_lost=lost.append)
+    register.worker_id_expire_time = 0.3
+    worker_id = register.get_worker_id()
+    # 模拟租约过期后被其他进程占用
+    with backend.lock:
+        backend.leases[worker_id] = ("other", time.monotonic() + 10)
+    time.sleep(0.35)
+    assert lost == [worker_id] and register.worker_id == -1
+    register.stop()
+    assert backend.leases[worker_id][0] == "other"
@@ -0,0 +1,75 @@
+import pickle
+import threading
+import time
+
+import pytest
+
+from imkernel.core import journal as journal_module
+from imkernel.core.model import Model
+
+
+def test_compact_during_mutation(tmp_path):
+    model = Model()
+    model.element.create("root")
+    model.enable_journal(tmp_path)
+
+    tree = model.element.tree
+    create_node = tree.create_node
+    entered, release = threading.Event(), threading.Event()
+
+    def slow_create_node(*args, **kwargs):
+        entered.set()
+        release.wait(5)
+        return create_node(*args, **kwargs)
+
+    tree.create_node = slow_create_node
+    mutation = threading.Thread(target=model.element.create, args=("late",))
+    mutation.start()
+    assert entered.wait(5)
+    compaction = threading.Thread(target=model.compact)
+    compaction.start()
+    # 压缩需要等待正在进行的修改及其日志写入完成
+    time.sleep(0.1)
+    assert compaction.is_alive()
+    release.set()
+    mutation.join(5)
+    compaction.join(5)
+    tree.create_node = create_node
+    model.disable_journal()
+
+    loaded = Model.load(tmp_path)
+    assert set(loaded.element.tree.nodes) == {"root", "late"}
+
+
+def test_unpicklable_argument_does_not_mutate(tmp_path):
+    model = Model()
+    model.enable_journal(tmp_path)
+    with pytest.raises((pickle.PicklingError, AttributeError, TypeError)):
+        model.element.create("node", description=lambda: None)
+    assert "node" not in model.element.tree.nodes
+    model.disable_journal()
+
+
+def test_mutation_during_synchronous_compact_is_not_duplicated(tmp_path, monkeypatch):
+    model = Model()
+    model.element.create("root")
+    model.element.create("a", parent_id="root")
+    model.element.add_model_data(["r0", "a0"])
+    model.enable_journal(tmp_path)
+
+    commit = journal_module.commit_snapshot
+    mutation = threading.Thread(target=model.element.add_model_data, args=(["r1", "a1"],))
+
+    def slow_commit(writer, manifest):
+        # 日志已切换到新一代、快照尚未写入时修改模型
+        mutation.start()
+        mutation.join(0.2)
+        return commit(writer, manifest)
+
+    monkeypatch.setattr(journal_module, "commit_snapshot", slow_commit)
+    model.compact()
+    mutation.join(5)
+    model.disable_journal()
+
+    loaded = Model.load(tmp_path)
+    assert loaded.element.model_data == [["r0", "a0"], ["r1", "a1"]]
@@ -0,0 +1,85 @@
+import copy
+import pickle
+
+import pytest
+
+from imkernel.core.model import ElementNode, MethodNode, Model, ModelType, ParameterGroup, ProcedureNode
+from imkernel.core.node import Node
+from imkernel.core.node_base import NodeBase
+
+# 改用 __slots__ 之前各节点实例字典中的属性
+ATTRIBUTES = {
+    NodeBase: ["children", "data", "desc", "id", "parent"],
+    Node: ["children", "id", "name", "node_type", "parent", "parent_id"],
+    ElementNode: ["children", "data", "desc", "id", "is_tag", "model_type", "parameter_list", "parent"],
+    MethodNode: ["children", "data", "desc", "id", "input_parameter_list", "is_tag", "model_type", "output_parameter_list", "parent", "program"],
+    ProcedureNode: ["children", "data", "desc", "element_node", "id", "is_tag", "method_node", "model_type", "parameter_list", "parent"],
+}
+
+
+def _instance(cls):
+    if cls is NodeBase:
+        return NodeBase("n", "desc", {"k": 1})
+    if cls is Node:
+        return Node(1, "n", "type")
+    model_type = {ElementNode: ModelType.Element, MethodNode: ModelType.Method, ProcedureNode: ModelType.Procedure}[cls]
+    return cls(model_type, "n", "desc")
+
+
+@pytest.mark.parametrize("cls", list(ATTRIBUTES))
+def test_previous_attributes_are_kept(cls):
+    node = _instance(cls)
+    assert not hasattr(node, "__dict__")
+    for name in ATTRIBUTES[cls]:
+        value = getattr(node, name)
+        setattr(node, name, value)
+    with pytest.raises(AttributeError):
+        node.unknown_attribute = 1
+
+    restored = pickle.loads(pickle.dumps(node))
+    assert type(restored) is cls
+    for name in ATTRIBUTES[cls]:
+        assert getattr(restored, name) == getattr(node, name)
+
+
+def _model():
+    model = Model()
+    model.element.create("root", "根节点")
+    model.element.create("a", parent_id="root")
+    model.element.parameter_group("a", ["x", "y"])
+    model.element.parameter("a", [["p"], ["q"]])
+    model.element.add_model_data(["r", "a"])
+    model.element.set_parameter_data_by_id_index(0, "a", "x", [1, 2])
+    model.method.create("m")
+    model.method.input_parameter_group("m", ["x"])
+    model.method.output_parameter_group("m", ["y"])
+    model.procedure.create("P")
+    model.procedure.relate("P", "a", "m")
+    return model
+
+
+@pytest.mark.parametrize("clone", [lambda obj: pickle.loads(pickle.dumps(obj)), copy.deepcopy])
+def test_node_graph_round_trip(clone):
+    model = _model()
+    element_root = model.element.tree.find_node_by_id("root")
+    procedure = model.procedure.get_by_id("P")
+
+    root, restored_procedure = clone((element_root, procedure))
+    a = root.children[0]
+    assert a.parent is root and root.desc == "根节点"
+    assert restored_procedure.element_node == [a] and restored_procedure.method_node.id == "m"
+    assert [dict(g) for g in a.parameter_list] == [dict(g) for g in element_root.children[0].parameter_list]
+    # 参数组索引在复制后仍与列表同步
+    assert a.find_parameters_by_group("x")["parameter_data"] == {"0": [1, 2]}
+    a.parameter_list[1].group_name = "z"
+    assert a.find_parameters_by_group("z") is a.parameter_list[1]
+    a.parameter_list.append(ParameterGroup("w"))
+    assert a.find_parameters_by_group("w") is a.parameter_list[2]
+
+
+def test_parameter_group_round_trip():
+    group = ParameterGroup("g", ["p"], parameter_data={"0": [1]})
+    empty = ParameterGroup("e")
+    for clone in (pickle.loads(pickle.dumps(group)), copy.deepcopy(group)):
+        assert dict(clone) == {"group_name": "g", "parameters": ["p"], "parameter_data": {"0": [1]}}
+    assert "parameter_data" not in pickle.loads(pickle.dumps(empty))
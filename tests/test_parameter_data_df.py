@@ -0,0 +1,71 @@
+import pandas as pd
+import pytest
+
+from imkernel.core.model import Model
+
+
+def _model(columnar):
+    model = Model(columnar=columnar)
+    model.element.create("root", is_tag=True)
+    model.element.create("a", parent_id="root")
+    model.element.create("b", parent_id="root")
+    model.element.create("c", parent_id="root")
+    model.element.parameter_group("a", ["x", "y"])
+    model.element.parameter("a", [["x"], ["y"]])
+    model.element.parameter_group("b", ["z"])
+    model.element.parameter("b", [["z"]])
+    model.element.add_model_data_many([["a", "b", "c"]] * 5)
+    # 缺失与稀疏的索引：x 缺少1，y 只有0和3，z 只有4（最大索引决定行数）
+    for index in (0, 2, 3):
+        model.element.add_parameter_data(index, "a", "x", [index, index + 1])
+    model.element.add_parameter_data(3, "a", "y", ["s", 1.5])
+    model.element.add_parameter_data(0, "a", "y", [None])
+    model.element.add_parameter_data(4, "b", "z", [4.0])
+    return model
+
+
+def _baseline_wide(element):
+    # 逐单元格查字典的原实现，行数为最大data索引+1
+    nodes = element.tree.get_no_tag_nodes()
+    groups = [[para.get('parameter_data') or {} for para in node.parameter_list] for node in nodes]
+    length = max((int(key) + 1 for column in groups for data in column for key in data), default=0)
+    rows = [[[data.get(str(i), None) for data in column] for column in groups] for i in range(length)]
+    return pd.DataFrame(rows, index=[f'element [{i}]' for i in range(length)], columns=[node.id for node in nodes])
+
+
+def _baseline_long(element):
+    records = []
+    for node in element.tree.get_no_tag_nodes():
+        for para in node.parameter_list:
+            data = para.get('parameter_data') or {}
+            for key in sorted(data, key=int):
+                records.append((node.id, para['group_name'], int(key), data[key]))
+    return records
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_wide_matches_baseline(columnar):
+    element = _model(columnar).element
+    df = element.get_all_parameter_data_df()
+    expected = _baseline_wide(element)
+    assert list(df.index) == list(expected.index) and list(df.columns) == ["a", "b", "c"]
+    assert df.to_dict() == expected.to_dict()
+    assert df.loc["element [1]", "a"] == [None, None]
+    assert df.loc["element [0]", "c"] == []
+
+
+@pytest.mark.parametrize("columnar", [False, True])
+def test_long_format_matches_baseline(columnar):
+    element = _model(columnar).element
+    df = element.get_all_parameter_data_df(long_format=True)
+    assert df.index.names == ['element', 'group', 'data_index']
+    records = [(*index, value) for index, value in df['parameter_data'].items()]
+    assert records == _baseline_long(element)
+
+
+def test_empty_model():
+    model = Model()
+    model.element.create("a")
+    assert model.element.get_all_parameter_data_df().empty
+    long_df = model.element.get_all_parameter_data_df(long_format=True)
+    assert long_df.empty and long_df.index.names == ['element', 'group', 'data_index']
@@ -0,0 +1,70 @@
+import pickle
+
+from imkernel.core.model import Model, ParameterGroup, ParameterGroupList
+
+
+def _element():
+    model = Model()
+    model.element.create("E")
+    model.element.parameter_group("E", ["a", "b", "c"])
+    node = model.element.tree.nodes["E"]
+    # 先查询一次，建立索引
+    assert node.find_parameters_by_group("b") is node.parameter_list[1]
+    return node
+
+
+def test_replace_in_place():
+    node = _element()
+    replacement = ParameterGroup("x")
+    node.parameter_list[1] = replacement
+    assert node.find_parameters_by_group("x") is replacement
+    assert node.find_parameters_by_group("b") is None
+    node.parameter_list[0:1] = [ParameterGroup("b")]
+    assert node.find_parameters_by_group("b") is node.parameter_list[0]
+    assert node.find_parameters_by_group("a") is None
+
+
+def test_rename():
+    node = _element()
+    group = node.parameter_list[2]
+    group["group_name"] = "renamed"
+    assert node.find_parameters_by_group("renamed") is group
+    assert node.find_parameters_by_group("c") is None
+    group.group_name = "a"
+    # 同名时以第一个为准
+    assert node.find_parameters_by_group("a") is node.parameter_list[0]
+    del node.parameter_list[0]
+    assert node.find_parameters_by_group("a") is group
+
+
+def test_add_after_mutation_does_not_duplicate():
+    node = _element()
+    node.parameter_list.insert(0, ParameterGroup("d"))
+    assert node.add_parameter_group("d") is node.parameter_list[0]
+    assert [g["group_name"] for g in node.parameter_list] == ["d", "a", "b", "c"]
+    node.add_parameter_group("e")
+    assert node.find_parameters_by_group("e") is node.parameter_list[-1]
+
+
+def test_method_groups_and_plain_list():
+    model = Model()
+    model.method.create("M")
+    model.method.input_parameter_group("M", ["i"])
+    node = model.method.tree.nodes["M"]
+    assert node.find_input_parameter_group("i") is not None
+    node.input_parameter_list[0].group_name = "j"
+    assert node.find_input_parameter_group("j") is node.input_parameter_list[0]
+    # 替换为普通列表时每次查询都重建，结果仍然正确
+    node.input_parameter_list = [ParameterGroup("k")]
+    assert node.find_input_parameter_group("k") is node.input_parameter_list[0]
+    node.input_parameter_list.append(ParameterGroup("l"))
+    assert node.find_input_parameter_group("l") is node.input_parameter_list[1]
+
+
+def test_pickle_keeps_tracking():
+    node = pickle.loads(pickle.dumps(_element()))
+    assert isinstance(node.parameter_list, ParameterGroupList)
+    assert node.find_parameters_by_group("c") is node.parameter_list[2]
+    node.parameter_list[2]["group_name"] = "z"
+    assert node.find_parameters_by_group("z") is node.parameter_list[2]
+    assert dict(node.parameter_list[2])["group_name"] == "z"
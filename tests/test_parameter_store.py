@@ -0,0 +1,82 @@
+import numpy as np
+import pytest
+
+from imkernel.core.model import take_parameter_data
+from imkernel.core.parameter_store import ColumnarParameterData
+
+ROWS = [
+    [1, 2, 3],
+    [1.5, 2.5, 3.5],
+    [True, False, True],
+    [1, 2.5, 3],
+    [[1, 2], [3, 4]],
+    ["a", "b", "c"],
+    [1, None, 3],
+    [],
+    [1, [2, 3]],
+]
+
+
+@pytest.mark.parametrize("first", ROWS)
+@pytest.mark.parametrize("second", ROWS)
+def test_round_trip_keeps_values_and_types(first, second):
+    store = ColumnarParameterData()
+    store["0"] = first
+    store["2"] = second
+    assert store["0"] == first and _types(store["0"]) == _types(first)
+    assert store["2"] == second and _types(store["2"]) == _types(second)
+    assert list(store.to_object_array(3)) == [first, None, second]
+
+
+def _types(value):
+    if isinstance(value, list):
+        return [_types(item) for item in value]
+    return type(value)
+
+
+def test_int_then_float_rows_are_not_upcast():
+    store = ColumnarParameterData()
+    store["0"] = [1, 2]
+    assert store.is_numeric
+    store["1"] = [0.5, 1.5]
+    assert store["0"] == [1, 2] and type(store["0"][0]) is int
+    assert store["1"] == [0.5, 1.5]
+
+
+def test_bulk_write_of_other_kind_keeps_existing_types():
+    store = ColumnarParameterData()
+    store.update_many([0, 1], np.array([[1, 2], [3, 4]]))
+    store.update_many([2], np.array([[0.5, 1.5]]))
+    assert [store[i] for i in range(3)] == [[1, 2], [3, 4], [0.5, 1.5]]
+    assert type(store[0][0]) is int and type(store[2][0]) is float
+
+
+def test_mutating_numeric_result_does_not_change_store():
+    store = ColumnarParameterData()
+    store["0"] = [1, 2, 3]
+    row = store["0"]
+    row[0] = 100
+    row.append(4)
+    assert store["0"] == [1, 2, 3]
+    # 修改需要赋值写回
+    store["0"] = row
+    assert store["0"] == [100, 2, 3, 4]
+
+
+def test_mutating_object_result_matches_dict():
+    store, reference = ColumnarParameterData(), {}
+    for data in (store, reference):
+        data["0"] = ["a", 1]
+        data["0"].append("b")
+    assert store["0"] == reference["0"] == ["a", 1, "b"]
+
+
+def test_take_parameter_data_matches_per_index_access():
+    store = ColumnarParameterData()
+    store.update_many([0, 1, 3], np.arange(9).reshape(3, 3))
+    indices = [3, 0, 2, 5, 1]
+    assert take_parameter_data(store, indices) == [store.get(i) for i in indices]
+    arrays = take_parameter_data(store, indices, as_array=True)
+    assert [a.tolist() if a is not None else None for a in arrays] == [store.get(i) for i in indices]
+    reference = {str(i): store[i] for i in store}
+    assert take_parameter_data(reference, indices) == [store.get(i) for i in indices]
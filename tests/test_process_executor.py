@@ -0,0 +1,97 @@
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
+import pytest
+
+from imkernel.core import executor as executor_module
+from imkernel.core.executor import ProcessExecutor
+from imkernel.core.model import Model
+
+ALGORITHM = '''
+import numpy as np
+
+def kind(a):
+    return [type(a).__name__], [float(np.sum(a))]
+'''
+
+
+def test_columnar_inputs_reach_process_as_arrays(tmp_path):
+    (tmp_path / "algo.py").write_text(ALGORITHM)
+    model = Model(columnar=True)
+    model.element.create("E")
+    model.element.parameter_group("E", ["a", "t", "s"])
+    model.element.parameter("E", [["a"], ["t"], ["s"]])
+    model.element.add_model_data_many([["e"]] * 2)
+    model.element.add_parameter_data_bulk("E", "a", np.ones((2, 1000)))
+    model.method.create("kind")
+    model.method.set_program("kind", [f"{tmp_path / 'algo.py'}/kind"])
+    model.method.input_parameter_group("kind", ["a"])
+    model.method.output_parameter_group("kind", ["t", "s"])
+    model.procedure.create("P")
+    model.procedure.relate("P", "E", "kind")
+
+    with ProcessExecutor(max_workers=1, shared_memory_threshold=1024) as executor:
+        results = model.procedure.run_batch("P", [0, 1], executor=executor)
+        single = model.procedure.run("P", 0, executor=executor)
+    assert [r[0] for r in results] == [["ndarray"], ["ndarray"]]
+    assert single[0] == ["ndarray"] and single[1] == [1000.0]
+    # 线程中运行时仍为列表
+    assert model.procedure.run_batch("P", [0])[0][0] == ["list"]
+
+
+def test_method_run(tmp_path):
+    (tmp_path / "algo.py").write_text("def add(a, b):\n    return [a[0] + b[0]]\n")
+    model = Model()
+    model.method.create("add")
+    model.method.set_program("add", [f"{tmp_path / 'algo.py'}/add"])
+    model.method.input_parameter_group("add", ["a", "b"])
+    model.method.output_parameter_group("add", ["s"])
+    model.method.input_parameter("add", [["a"], ["b"]])
+    model.method.output_parameter("add", [["s"]])
+    model.method.input_parameter_data("add", [[3], [4]])
+    assert model.method.run("add") == [7]
+
+
+def _assert_unlinked(names):
+    assert names
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            SharedMemory(name=name)
+
+
+def test_input_segments_unlinked_when_worker_raises(tmp_path, monkeypatch):
+    (tmp_path / "algo.py").write_text("def fail(a):\n    raise ValueError('boom')\n")
+    names = []
+    pack = executor_module._pack
+
+    def recording_pack(obj, threshold, segments):
+        result = pack(obj, threshold, segments)
+        names.extend(shm.name for shm in segments)
+        return result
+
+    monkeypatch.setattr(executor_module, "_pack", recording_pack)
+    with ProcessExecutor(max_workers=1, shared_memory_threshold=1024) as executor:
+        with pytest.raises(ValueError):
+            executor.run(str(tmp_path / "algo.py"), "fail", [np.ones(1000)])
+        with pytest.raises(ValueError):
+            executor.map(str(tmp_path / "algo.py"), "fail", [[np.ones(1000)], [np.ones(1000)]])
+    _assert_unlinked(names)
+
+
+def test_output_segments_unlinked_when_worker_raises(tmp_path, monkeypatch):
+    (tmp_path / "algo.py").write_text("import numpy as np\n\ndef big():\n    return [np.ones(1000), object()]\n")
+    names = []
+    pack = executor_module._pack
+
+    def failing_pack(obj, threshold, segments):
+        if not isinstance(obj, np.ndarray):
+            return pack(obj, threshold, segments)
+        result = pack(obj, threshold, segments)
+        names.extend(shm.name for shm in segments)
+        raise MemoryError("no space")
+
+    # 在当前进程中执行子进程任务，输出写入共享内存的中途出错
+    monkeypatch.setattr(executor_module, "_pack", failing_pack)
+    with pytest.raises(MemoryError):
+        executor_module._execute(str(tmp_path / "algo.py"), "big", (), 1024)
+    _assert_unlinked(names)
@@ -0,0 +1,34 @@
+import logging
+
+from imkernel.core.result_cache import ResultCache
+
+
+def test_results_are_copied(tmp_path):
+    for cache in (ResultCache(), ResultCache(path=tmp_path)):
+        result = [[1, 2], {"a": 1}]
+        cache.put("key", result)
+        result[0].append(3)
+        hit, first = cache.get("key")
+        assert hit and first == [[1, 2], {"a": 1}]
+        first[1]["a"] = 2
+        assert cache.get("key")[1] == [[1, 2], {"a": 1}]
+
+
+def test_unpicklable_result_is_kept_in_memory():
+    cache = ResultCache()
+    result = [lambda: None]
+    cache.put("key", result)
+    hit, copy = cache.get("key")
+    assert hit and copy == result and copy is not result
+
+
+def test_disk_errors_are_logged_not_printed(tmp_path, caplog, capsys):
+    cache = ResultCache(path=tmp_path)
+    with caplog.at_level(logging.WARNING, logger="imkernel.core.result_cache"):
+        cache.put("lambda", [lambda: None])
+        (tmp_path / "broken.pkl").write_bytes(b"not a pickle")
+        assert cache.get("broken") == (False, None)
+    assert capsys.readouterr().out == ""
+    messages = [record.getMessage() for record in caplog.records]
+    assert len(messages) == 2 and all(record.levelno == logging.WARNING for record in caplog.records)
+    assert "不支持序列化" in messages[0] and "broken.pkl" in messages[1]
@@ -0,0 +1,104 @@
+import asyncio
+import threading
+
+import pytest
+
+from imkernel.core.model import Model
+
+ALGORITHM = '''
+import os
+import time
+
+def add(a, b):
+    return [a[0] + b[0]]
+
+def gated(a, b):
+    # 等待测试创建 release 文件后再返回
+    release = os.path.join(os.path.dirname(__file__), "release")
+    deadline = time.time() + 5
+    while not os.path.exists(release) and time.time() < deadline:
+        time.sleep(0.01)
+    return [a[0] + b[0]]
+'''
+
+
+def _model(tmp_path, function="add"):
+    (tmp_path / "algo.py").write_text(ALGORITHM)
+    model = Model()
+    model.method.create("m")
+    model.method.set_program("m", [f"{tmp_path / 'algo.py'}/{function}"])
+    model.method.input_parameter_group("m", ["a", "b"])
+    model.method.output_parameter_group("m", ["s"])
+    model.method.input_parameter("m", [["a"], ["b"]])
+    model.method.output_parameter("m", [["s"]])
+    model.method.input_parameter_data("m", [[3], [4]])
+
+    model.element.create("E")
+    model.element.parameter_group("E", ["a", "b", "s"])
+    model.element.parameter("E", [["a"], ["b"], ["s"]])
+    model.element.add_model_data_many([["e"]] * 3)
+    for index in range(3):
+        model.element.set_parameter_data_by_id_index(index, "E", "a", [index])
+        model.element.set_parameter_data_by_id_index(index, "E", "b", [10])
+    model.procedure.create("P")
+    model.procedure.relate("P", "E", "m")
+    return model
+
+
+def _method_output(model):
+    return model.method.get_by_id("m").output_parameter_list[0].get("parameter_data")
+
+
+def _element_output(model):
+    return dict(model.element.tree.find_node_by_id("E").find_parameters_by_group("s")["parameter_data"])
+
+
+def test_run_async_returns_result(tmp_path):
+    model = _model(tmp_path)
+
+    async def main():
+        method_result = await model.method.run_async("m")
+        procedure_results = await asyncio.gather(*(model.procedure.run_async("P", i) for i in range(3)))
+        return method_result, procedure_results
+
+    method_result, procedure_results = asyncio.run(main())
+    assert method_result == [7]
+    assert _method_output(model) == [7]
+    assert procedure_results == [[10], [11], [12]]
+    assert _element_output(model) == {"0": [10], "1": [11], "2": [12]}
+
+
+@pytest.mark.parametrize("stop", ["timeout", "cancel"])
+def test_stopped_run_does_not_write_back(tmp_path, stop):
+    model = _model(tmp_path, "gated")
+
+    async def main():
+        for run in (lambda timeout: model.method.run_async("m", timeout=timeout),
+                    lambda timeout: model.procedure.run_async("P", 1, timeout=timeout)):
+            if stop == "timeout":
+                with pytest.raises(asyncio.TimeoutError):
+                    await run(0.05)
+            else:
+                task = asyncio.ensure_future(run(None))
+                await asyncio.sleep(0.05)
+                task.cancel()
+                with pytest.raises(asyncio.CancelledError):
+                    await task
+        # 算法在后台继续运行，结束后不写回结果
+        (tmp_path / "release").write_text("")
+
+    # asyncio.run 返回前等待默认线程池中的算法运行结束
+    asyncio.run(main())
+    assert _method_output(model) is None
+    assert _element_output(model) == {}
+
+
+def test_cancel_event_skips_write_back(tmp_path):
+    model = _model(tmp_path)
+    cancel_event = threading.Event()
+    cancel_event.set()
+    assert model.method.run("m", cancel_event=cancel_event) == [7]
+    assert model.procedure.run("P", 2, cancel_event=cancel_event) == [12]
+    assert _method_output(model) is None and _element_output(model) == {}
+    assert model.procedure.run("P", 2, cancel_event=threading.Event()) == [12]
+    assert _element_output(model) == {"2": [12]}
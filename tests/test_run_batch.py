@@ -0,0 +1,63 @@
+import pytest
+
+from imkernel.core.model import Model
+
+ALGORITHM = '''
+def add(a, b):
+    if a[0] == 1:
+        return ([a[0] + b[0]],)
+    return [a[0] + b[0]], [a[0] * b[0]]
+'''
+
+
+def test_short_result_keeps_other_indices(tmp_path):
+    (tmp_path / "algo.py").write_text(ALGORITHM)
+    model = Model()
+    model.element.create("E")
+    model.element.parameter_group("E", ["a", "b", "s", "p"])
+    model.element.parameter("E", [["a"], ["b"], ["s"], ["p"]])
+    model.element.add_model_data_many([["e"]] * 3)
+    for index in range(3):
+        model.element.set_parameter_data_by_id_index(index, "E", "a", [index])
+        model.element.set_parameter_data_by_id_index(index, "E", "b", [2])
+    model.method.create("add")
+    model.method.set_program("add", [f"{tmp_path / 'algo.py'}/add"])
+    model.method.input_parameter_group("add", ["a", "b"])
+    model.method.output_parameter_group("add", ["s", "p"])
+    model.procedure.create("P")
+    model.procedure.relate("P", "E", "add")
+
+    model.procedure.run_batch("P", range(3))
+
+    node = model.element.tree.find_node_by_id("E")
+    group = {name: node.find_parameters_by_group(name)["parameter_data"] for name in ("s", "p")}
+    assert [group["s"][str(i)] for i in range(3)] == [[2], [3], [4]]
+    assert group["p"]["0"] == [0] and group["p"]["2"] == [4] and "1" not in group["p"]
+
+
+def test_run_and_run_batch_reject_the_same_indices(tmp_path):
+    (tmp_path / "algo.py").write_text(ALGORITHM)
+    model = Model()
+    model.element.create("E")
+    model.element.parameter_group("E", ["a", "b", "s", "p"])
+    model.element.parameter("E", [["a"], ["b"], ["s"], ["p"]])
+    model.element.add_model_data_many([["e"]] * 2)
+    for index in range(2):
+        model.element.set_parameter_data_by_id_index(index, "E", "a", [index])
+        model.element.set_parameter_data_by_id_index(index, "E", "b", [2])
+    model.method.create("add")
+    model.method.set_program("add", [f"{tmp_path / 'algo.py'}/add"])
+    model.method.input_parameter_group("add", ["a", "b"])
+    model.method.output_parameter_group("add", ["s", "p"])
+    model.procedure.create("P")
+    model.procedure.relate("P", "E", "add")
+
+    for bad in (-1, 2, 5):
+        with pytest.raises(Exception, match=f"数据索引{bad}超出范围"):
+            model.procedure.run("P", bad)
+        with pytest.raises(Exception, match=f"数据索引{bad}超出范围"):
+            model.procedure.run_batch("P", [0, bad])
+    node = model.element.tree.find_node_by_id("E")
+    # 出错时不写回任何结果
+    assert len(node.find_parameters_by_group("s")["parameter_data"]) == 0
+    assert model.procedure.run("P", 1) == model.procedure.run_batch("P", [1])[0]
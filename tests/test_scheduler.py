@@ -0,0 +1,93 @@
+import pytest
+
+from imkernel.core.model import Model
+
+ALGORITHM = '''
+def inc(a):
+    return ([a[0] + 1],)
+
+def fail(a):
+    raise ValueError("boom")
+'''
+
+
+def _model(tmp_path, steps, groups="xyzw"):
+    """
+    :param steps: (过程名称, 输入参数组, 输出参数组, 算法函数名)
+    """
+    (tmp_path / "algo.py").write_text(ALGORITHM)
+    model = Model()
+    model.element.create("E")
+    model.element.parameter_group("E", list(groups))
+    model.element.parameter("E", [[g] for g in groups])
+    model.element.add_model_data(["e"])
+    model.element.set_parameter_data_by_id_index(0, "E", "x", [1])
+    for name, inputs, outputs, function in steps:
+        model.method.create(f"m_{name}")
+        model.method.set_program(f"m_{name}", [f"{tmp_path / 'algo.py'}/{function}"])
+        model.method.input_parameter_group(f"m_{name}", list(inputs))
+        model.method.output_parameter_group(f"m_{name}", list(outputs))
+        model.procedure.create(name)
+        model.procedure.relate(name, "E", f"m_{name}")
+    return model
+
+
+def _data(model, group):
+    return dict(model.element.tree.find_node_by_id("E").find_parameters_by_group(group)["parameter_data"])
+
+
+def test_dependencies_and_downstream(tmp_path):
+    model = _model(tmp_path, [("P2", "y", "z", "inc"), ("P1", "x", "y", "inc"), ("P3", "x", "w", "inc")])
+    scheduler = model.procedure.scheduler
+    assert scheduler.build() == {"P1": {"P2"}, "P2": set(), "P3": set()}
+    assert scheduler.topological_order(["P2", "P1", "P3"]) == ["P1", "P3", "P2"]
+    assert scheduler.downstream(["P1"]) == ["P1", "P2"]
+    assert scheduler.downstream(["x"]) == ["P1", "P3", "P2"]
+    assert scheduler.downstream(["y"]) == ["P2"]
+    assert scheduler.downstream(["w"]) == []
+
+    for workers in (None, 2):
+        assert model.procedure.run_all(0, workers=workers) == {"P1": ([2],), "P2": ([3],), "P3": ([2],)}
+    assert _data(model, "z") == {"0": [3]}
+    assert set(scheduler.timings) == {"P1", "P2", "P3"}
+    # 只重新运行受影响的子图
+    assert model.procedure.run_all(0, changed=["P2"]) == {"P2": ([3],)}
+
+
+def test_build_matches_pairwise_comparison(tmp_path):
+    steps = [("A", "x", "y", "inc"), ("B", "y", "z", "inc"), ("C", "x", "z", "inc"),
+             ("D", "w", "w", "inc"), ("E2", "z", "w", "inc"), ("F", "", "y", "inc")]
+    scheduler = _model(tmp_path, steps).procedure.scheduler
+    edges = scheduler.build()
+
+    # 逐对比较的原实现
+    expected = {i: set() for i in scheduler.order}
+    for index, a in enumerate(scheduler.order):
+        for b in scheduler.order[index + 1:]:
+            if scheduler.writes[a] & scheduler.reads[b]:
+                expected[a].add(b)
+            elif scheduler.writes[b] & scheduler.reads[a]:
+                expected[b].add(a)
+            elif scheduler.writes[a] & scheduler.writes[b]:
+                expected[a].add(b)
+    assert edges == expected
+
+
+def test_cycles_are_detected(tmp_path):
+    model = _model(tmp_path, [("A", "x", "y", "inc"), ("B", "y", "x", "inc")])
+    with pytest.raises(Exception, match="A与B相互依赖"):
+        model.procedure.scheduler.build()
+
+    # A→B→C→A：逐对比较时没有相互依赖，排序时发现循环
+    model = _model(tmp_path, [("A", "z", "x", "inc"), ("B", "x", "y", "inc"), ("C", "y", "z", "inc")])
+    with pytest.raises(Exception, match="循环依赖"):
+        model.procedure.run_all(0)
+
+
+@pytest.mark.parametrize("workers", [None, 2])
+def test_failure_stops_downstream(tmp_path, workers):
+    model = _model(tmp_path, [("P1", "x", "y", "fail"), ("P2", "y", "z", "inc")])
+    with pytest.raises(ValueError, match="boom"):
+        model.procedure.run_all(0, workers=workers)
+    assert _data(model, "y") == {} and _data(model, "z") == {}
+    assert "P2" not in model.procedure.scheduler.timings
@@ -0,0 +1,120 @@
+import random
+
+import pytest
+
+from imkernel.core.model import Model
+from imkernel.core.search_index import SearchIndex
+
+TEXTS = ["叶片型线生成", "Blade Profile", "型线优化", "blade root", "叶根", "BLADE", "profile-blade", "叶片", "", "a"]
+
+
+def _index(texts=TEXTS):
+    index = SearchIndex()
+    for key, text in enumerate(texts):
+        index.add(key, text)
+    return index
+
+
+def _queries(texts=TEXTS):
+    # 每个文本的所有子串，以及若干不存在的串
+    queries = {text[i:j] for text in texts for i in range(len(text)) for j in range(i + 1, min(len(text), i + 4) + 1)}
+    return sorted(queries | {"xyz", "型线叶", "Bl", "bL", "PROF"})
+
+
+def test_substring_and_prefix_match_brute_force():
+    index = _index()
+    for query in _queries():
+        assert index.substring(query) == [k for k, t in enumerate(TEXTS) if query.casefold() in t.casefold()]
+        assert index.substring(query, case_sensitive=True) == [k for k, t in enumerate(TEXTS) if query in t]
+        assert index.prefix(query) == [k for k, t in enumerate(TEXTS) if t.casefold().startswith(query.casefold())]
+        assert index.prefix(query, case_sensitive=True) == [k for k, t in enumerate(TEXTS) if t.startswith(query)]
+    assert index.substring("") == list(range(len(TEXTS)))
+    assert index.substring("blade", limit=2) == [1, 3]
+
+
+def test_case_sensitivity():
+    index = _index()
+    assert index.substring("blade") == [1, 3, 5, 6]
+    assert index.substring("blade", case_sensitive=True) == [3, 6]
+    assert index.prefix("Bla", case_sensitive=True) == [1]
+    assert index.prefix("bla") == [1, 3, 5]
+
+
+def test_fuzzy_scores():
+    index = _index()
+    result = dict(index.fuzzy("叶片型线", threshold=0.3, limit=None))
+    assert result[0] == 1.0
+    # 叶片 / 片型 / 型线 三个双字中出现的比例
+    assert result[2] == pytest.approx(1 / 3) and result[7] == pytest.approx(1 / 3)
+    assert 4 not in result
+    assert [key for key, _ in index.fuzzy("叶片型线", threshold=0.3)][0] == 0
+    assert index.fuzzy("") == []
+    assert index.fuzzy("叶片型线", threshold=0.3, limit=1) == [(0, 1.0)]
+
+
+def test_update_and_remove_match_brute_force():
+    rng = random.Random(0)
+    alphabet = "abAB叶片型线"
+    texts = {}
+    index = SearchIndex()
+    for step in range(500):
+        key = rng.randrange(30)
+        if rng.random() < 0.3:
+            texts.pop(key, None)
+            index.remove(key)
+        else:
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randrange(6)))
+            # 更新时键移到添加顺序的末尾
+            texts.pop(key, None)
+            texts[key] = text
+            index.add(key, text)
+        query = "".join(rng.choice(alphabet) for _ in range(rng.randrange(1, 3)))
+        assert index.substring(query) == [k for k, t in texts.items() if query.casefold() in t.casefold()]
+        assert index.prefix(query, case_sensitive=True) == [k for k, t in texts.items() if t.startswith(query)]
+    assert len(index) == len(texts)
+    index.add(0, None)
+    assert 0 not in index
+
+
+def _model():
+    model = Model()
+    model.element.create("root", "叶片")
+    model.element.create("profile", "型线生成", parent_id="root")
+    model.element.create("section", "截面", parent_id="profile")
+    model.element.create("hub", "叶根", parent_id="root")
+    return model
+
+
+def test_tree_index_follows_description_changes(tmp_path):
+    model = _model()
+    element = model.element
+    assert [n.id for n in element.get_by_description("型线")] == ["profile"]
+    assert [n.id for n in element.search("PRO", mode="prefix")] == ["profile"]
+
+    element.set_description("profile", "叶型")
+    assert element.get_by_description("型线") == []
+    assert [n.id for n in element.get_by_description("叶", mode="prefix")] == ["root", "hub", "profile"]
+    assert element.get_by_id("profile").desc == "叶型"
+    element.set_description("hub", None)
+    assert [n.id for n in element.search("叶")] == ["root", "profile"]
+    with pytest.raises(KeyError):
+        element.set_description("missing", "x")
+
+    # 变更日志重放与快照加载后的索引与描述一致
+    model.enable_journal(tmp_path)
+    element.set_description("section", "Section 截面")
+    model.disable_journal()
+    loaded = Model.load(tmp_path)
+    assert [n.id for n in loaded.element.search("section", field="desc")] == ["section"]
+    assert loaded.element.get_by_description("型线") == []
+
+
+def test_tree_index_drops_removed_subtree():
+    model = _model()
+    model.element.delete("profile")
+    assert model.element.search("截面") == [] and model.element.search("profile") == []
+    assert model.element.search("sec", mode="fuzzy") == []
+    assert [n.id for n in model.element.search("叶")] == ["root", "hub"]
+    # 重新创建同名节点后按新描述查找
+    model.element.create("section", "新截面", parent_id="root")
+    assert [n.id for n in model.element.search("截面")] == ["section"]
@@ -0,0 +1,68 @@
+import numpy as np
+
+from imkernel.core.model import Model
+from imkernel.core.parameter_store import ColumnarParameterData
+
+
+def _groups(model):
+    node = model.element.tree.find_node_by_id("E")
+    return {name: node.find_parameters_by_group(name)["parameter_data"] for name in "abcd"}
+
+
+def test_numeric_dict_data_is_memory_mapped(tmp_path):
+    model = Model()
+    model.element.create("E")
+    model.element.parameter_group("E", ["a", "b", "c", "d"])
+    model.element.parameter("E", [["a"], ["b"], ["c"], ["d"]])
+    model.element.add_model_data_many([["e"]] * 4)
+    for i in range(4):
+        model.element.set_parameter_data_by_id_index(i, "E", "a", [i, i + 1])
+        model.element.set_parameter_data_by_id_index(i, "E", "b", [1.5 * i])
+        # 整数与浮点数混合时保存在 pickle 中，保持原有类型
+        model.element.set_parameter_data_by_id_index(i, "E", "c", [i, 1.0])
+        if i != 2:
+            model.element.set_parameter_data_by_id_index(i, "E", "d", [True])
+    model.save(tmp_path)
+    expected = _groups(model)
+
+    for mmap in (True, False):
+        loaded_model = Model.load(tmp_path, mmap=mmap)
+        node = loaded_model.element.tree.find_node_by_id("E")
+        groups = _groups(loaded_model)
+        for name, parameter_data in groups.items():
+            loaded = {key: parameter_data[key] for key in parameter_data}
+            assert loaded == expected[name]
+            assert all(type(x) is type(y) for key in loaded for x, y in zip(loaded[key], expected[name][key]))
+            # 映射后节点改为列式存储，保存在 pickle 中的数据也转为列式存储
+            assert isinstance(parameter_data, ColumnarParameterData) == mmap
+        assert node.columnar == mmap
+        assert isinstance(node.create_parameter_data(), ColumnarParameterData) == mmap
+        if mmap:
+            assert isinstance(groups["a"].array, np.memmap)
+
+
+def test_none_parameter_data_round_trip(tmp_path):
+    model = Model()
+    model.element.create("E")
+    model.element.parameter_group("E", ["a", "b"])
+    model.element.parameter("E", [["a"], ["b"]])
+    model.element.add_model_data(["e"])
+    model.element.set_parameter_data_by_id_index(0, "E", "b", [1, 2])
+    model.method.create("m")
+    model.method.input_parameter_group("m", ["x"])
+    model.method.output_parameter_group("m", ["y"])
+    model.method.input_parameter("m", [["x"]])
+    model.method.input_parameter_data("m", [[3]])
+    node = model.element.tree.find_node_by_id("E")
+    node.find_parameters_by_group("a")["parameter_data"] = None
+    model.method.get_by_id("m").output_parameter_list[0]["parameter_data"] = None
+    model.save(tmp_path)
+
+    for mmap in (True, False):
+        loaded = Model.load(tmp_path, mmap=mmap)
+        group = loaded.element.tree.find_node_by_id("E").find_parameters_by_group("a")
+        assert "parameter_data" in group and group["parameter_data"] is None
+        assert loaded.method.get_by_id("m").output_parameter_list[0]["parameter_data"] is None
+        input_data = loaded.method.get_by_id("m").input_parameter_list[0]["parameter_data"]
+        assert input_data == model.method.get_by_id("m").input_parameter_list[0]["parameter_data"]
+        assert not isinstance(input_data, ColumnarParameterData)
@@ -0,0 +1,105 @@
+import pytest
+
+from imkernel.utils.id_generator import snowflake_classic
+from imkernel.utils.id_generator.snowflake_classic import SnowflakeIDGenerator
+
+SEQUENCE_SIZE = 4096
+
+
+class _Clock:
+    """
+    手动拨动的时钟，只在 sleep 或测试修改 ms 时变化
+    """
+
+    def __init__(self):
+        self.ms = 1700000000000
+        self.slept = []
+
+    def time(self):
+        # 取毫秒中间值，避免浮点误差使 int(time() * 1000) 少1
+        return (self.ms + 0.5) / 1000
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.ms += max(1, round(seconds * 1000))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(snowflake_classic, "time", clock)
+    return clock
+
+
+def _timestamp(generator, id):
+    return (id >> generator.timestamp_left_shift) + generator.epoch
+
+
+def _sequence(generator, id):
+    return id & generator.max_sequence
+
+
+def test_rollback_within_tolerance_keeps_logical_time(clock):
+    generator = SnowflakeIDGenerator(1, 2, max_rollback_ms=100)
+    ids = generator.next_ids(3)
+    clock.ms -= 100
+    ids += generator.next_ids(3)
+    assert ids == sorted(set(ids))
+    assert {_timestamp(generator, i) for i in ids} == {clock.ms + 100}
+    assert [_sequence(generator, i) for i in ids] == list(range(6))
+    assert generator.metrics["clock_rollbacks"] == 1 and clock.slept == []
+
+    # 时钟追上后回到系统时间，序列号从0开始
+    clock.ms += 101
+    new_id = generator.next_id()
+    assert _timestamp(generator, new_id) == clock.ms and _sequence(generator, new_id) == 0 and new_id > ids[-1]
+
+
+def test_rollback_beyond_tolerance_raises(clock):
+    generator = SnowflakeIDGenerator(1, 2, max_drift_ms=10, max_rollback_ms=100)
+    last = generator.next_id()
+    clock.ms -= 101
+    with pytest.raises(Exception, match="Clock moved backwards by 101 ms"):
+        generator.next_id()
+    assert generator.metrics["generated"] == 1
+    # 时钟恢复后继续生成
+    clock.ms += 101
+    assert generator.next_id() > last
+
+
+def test_borrowed_millis_are_repaid(clock):
+    generator = SnowflakeIDGenerator(0, 0, max_drift_ms=5)
+    start = clock.ms
+    ids = generator.next_ids(SEQUENCE_SIZE * 2 + 10)
+    assert ids == sorted(set(ids))
+    # 序列号用尽后借用后两毫秒，不休眠
+    assert [_timestamp(generator, ids[i]) for i in (0, SEQUENCE_SIZE, -1)] == [start, start + 1, start + 2]
+    assert generator.metrics["borrowed"] == 2 and generator.metrics["max_drift_ms"] == 2
+    assert generator.metrics["sleeps"] == 0 and clock.slept == []
+
+    # 系统时钟未超过借用的时间前沿用逻辑时间
+    clock.ms = start + 2
+    same = generator.next_id()
+    assert _timestamp(generator, same) == start + 2 and _sequence(generator, same) == 10
+    # 系统时钟超过借用的时间后，回到系统时间
+    clock.ms = start + 3
+    repaid = generator.next_id()
+    assert _timestamp(generator, repaid) == start + 3 and _sequence(generator, repaid) == 0
+
+
+def test_drift_beyond_limit_sleeps_until_clock_catches_up(clock):
+    generator = SnowflakeIDGenerator(0, 0, max_drift_ms=1)
+    start = clock.ms
+    ids = generator.next_ids(SEQUENCE_SIZE * 3)
+    assert ids == sorted(set(ids))
+    assert generator.metrics["borrowed"] == 2 and generator.metrics["sleeps"] == 1
+    # 休眠到逻辑时间超前系统时钟不超过 max_drift_ms
+    assert generator.last_timestamp == start + 2 and clock.ms >= generator.last_timestamp - generator.max_drift_ms
+    assert len(clock.slept) == 1
+
+
+def test_next_ids_matches_next_id(clock):
+    a, b = SnowflakeIDGenerator(3, 4), SnowflakeIDGenerator(3, 4)
+    batch = a.next_ids(SEQUENCE_SIZE + 10, as_array=True)
+    assert batch.tolist() == [b.next_id() for _ in range(SEQUENCE_SIZE + 10)]
+    assert batch.dtype.name == "int64"
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+
+from imkernel.utils.id_generator import snowflake_m1
+from imkernel.utils.id_generator.options import IdGeneratorOptions
+from imkernel.utils.id_generator.snowflake_m1 import SnowFlakeM1
+
+
+class _Clock:
+    """
+    只在 sleep 时前进的时钟，两个生成器看到相同的时间
+    """
+
+    def __init__(self):
+        self.ms = 1700000000000
+
+    def time_ns(self):
+        return self.ms * 1000000
+
+    def sleep(self, seconds):
+        self.ms += max(1, round(seconds * 1000))
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(snowflake_m1, "time", clock)
+    return clock
+
+
+def _generator():
+    options = IdGeneratorOptions(worker_id=3)
+    options.top_over_cost_count = 5
+    return SnowFlakeM1(options)
+
+
+@pytest.mark.parametrize("count", [1, 58, 59, 60, 1000])
+def test_next_ids_matches_next_id(clock, count):
+    start = clock.ms
+    ids = _generator().next_ids(count)
+    assert len(ids) == count
+    assert all(a < b for a, b in zip(ids, ids[1:]))
+    clock.ms = start
+    single = _generator()
+    assert ids == [single.next_id() for _ in range(count)]
+
+
+def test_next_ids_continues_after_next_id(clock):
+    start = clock.ms
+    generator = _generator()
+    ids = [generator.next_id()] + generator.next_ids(400, as_array=True).tolist() + [generator.next_id()]
+    clock.ms = start
+    reference = _generator()
+    assert ids == [reference.next_id() for _ in range(402)]
+    assert isinstance(generator.next_ids(3, as_array=True), np.ndarray)
+    assert generator.next_ids(0) == []
+
+
+def test_sequence_stays_within_its_bits(clock):
+    options = IdGeneratorOptions(worker_id=3)
+    ids = _generator().next_ids(500)
+    seq_mask = (1 << options.seq_bit_length) - 1
+    worker_mask = (1 << options.worker_id_bit_length) - 1
+    assert {(i >> options.seq_bit_length) & worker_mask for i in ids} == {3}
+    assert min(i & seq_mask for i in ids) == options.min_seq_number
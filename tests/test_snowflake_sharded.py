@@ -0,0 +1,18 @@
+import gc
+import threading
+
+from imkernel.utils.id_generator.options import IdGeneratorOptions
+from imkernel.utils.id_generator.snowflake_sharded import SnowFlakeSharded
+
+
+def test_shards_of_finished_threads_are_reused():
+    generator = SnowFlakeSharded(IdGeneratorOptions(worker_id=1, seq_bit_length=8, shard_bit_length=2))
+    ids = []
+    for _ in range(8):
+        thread = threading.Thread(target=lambda: ids.extend(generator.next_ids(50)))
+        thread.start()
+        thread.join()
+        gc.collect()
+    assert len(set(ids)) == len(ids)
+    # 每个线程结束后归还分片，之后的线程不必共用分片
+    assert generator._acquire() >= 0
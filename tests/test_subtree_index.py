@@ -0,0 +1,93 @@
+import random
+import time
+
+import pytest
+
+from imkernel.core.model import ElementNode, IndustryTree, ModelType
+
+
+def _intervals(tree):
+    tree._ensure_preorder_index()
+    return [node.id for node in tree._preorder], {node_id: tree._get_interval(node_id) for node_id in tree.nodes}
+
+
+def test_incremental_index_matches_rebuild():
+    rng = random.Random(0)
+    tree = IndustryTree()
+    ids = []
+    for i in range(300):
+        parent_id = rng.choice(ids) if ids and rng.random() < 0.9 else None
+        tree.create_node(ElementNode(model_type=ModelType.Element, id=str(i)), parent_id)
+        ids.append(str(i))
+        if i % 37 == 0:
+            # 建立索引后继续增量更新
+            tree.get_descendants(ids[0])
+    incremental = _intervals(tree)
+    tree._preorder = None
+    assert incremental == _intervals(tree)
+
+
+def test_duplicate_child_id_is_rejected():
+    tree = IndustryTree()
+    tree.create_node(ElementNode(model_type=ModelType.Element, id="a"))
+    tree.create_node(ElementNode(model_type=ModelType.Element, id="b"), "a")
+    with pytest.raises(ValueError):
+        tree.create_node(ElementNode(model_type=ModelType.Element, id="b"), "a")
+    assert tree.get_no_tag_nodes_id_list() == ["a", "b"]
+    assert len(tree.nodes["a"].children) == 1
+
+
+def _brute_descendants(tree, node_id):
+    result, stack = [], list(reversed(tree.nodes[node_id].children))
+    while stack:
+        node = stack.pop()
+        result.append(node.id)
+        stack.extend(reversed(node.children))
+    return result
+
+
+def test_interleaved_create_remove_query_matches_walk():
+    rng = random.Random(1)
+    tree = IndustryTree()
+    counter = 0
+    for step in range(3000):
+        ids = list(tree.nodes)
+        action = rng.random()
+        if action < 0.6 or len(ids) < 5:
+            parent_id = rng.choice(ids) if ids and rng.random() < 0.95 else None
+            tree.create_node(ElementNode(model_type=ModelType.Element, id=f"n{counter}"), parent_id)
+            counter += 1
+        elif action < 0.7:
+            tree.remove_node(tree.nodes[rng.choice(ids)])
+        else:
+            node_id = rng.choice(ids)
+            assert [n.id for n in tree.get_descendants(node_id)] == _brute_descendants(tree, node_id)
+            other = rng.choice(ids)
+            assert tree.is_descendant(other, node_id) == (other in _brute_descendants(tree, node_id))
+    incremental = _intervals(tree)
+    tree._invalidate_preorder_index()
+    assert incremental == _intervals(tree)
+
+
+def _build(count, indexed=True, query_every=None):
+    rng = random.Random(2)
+    tree = IndustryTree()
+    tree.create_node(ElementNode(model_type=ModelType.Element, id="0"))
+    if indexed:
+        tree.get_descendants("0")
+    ids = ["0"]
+    start = time.perf_counter()
+    for i in range(1, count):
+        tree.create_node(ElementNode(model_type=ModelType.Element, id=str(i)), rng.choice(ids))
+        ids.append(str(i))
+        if query_every and i % query_every == 0:
+            tree.get_descendants(rng.choice(ids))
+    assert len(tree.get_descendants("0")) == count - 1
+    return time.perf_counter() - start
+
+
+def test_bulk_create_with_index_is_not_quadratic():
+    # 索引建立后批量创建不逐个插入，只在之后的第一次查询时重建一次，耗时与未建立索引时相近
+    assert _build(30000) < _build(30000, indexed=False) * 2 + 0.5
+    # 创建与查询交替时，每次查询只插入之前新建的少量节点
+    assert _build(20000, query_every=10) < 10.0
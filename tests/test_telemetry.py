@@ -0,0 +1,133 @@
+import pytest
+
+from imkernel.core.model import Model
+from imkernel.core.telemetry import PHASES, Telemetry, _NullTrace, telemetry
+
+ALGORITHM = '''
+def add(a, b):
+    return [a[0] + b[0]]
+
+def fail(a, b):
+    raise ValueError("boom")
+'''
+
+
+@pytest.fixture(autouse=True)
+def clean_telemetry():
+    state = telemetry.enabled, telemetry.verbose, telemetry.measure_size
+    telemetry.clear()
+    yield
+    telemetry.enabled, telemetry.verbose, telemetry.measure_size = state
+    telemetry.clear()
+
+
+def _model(tmp_path, function="add"):
+    (tmp_path / "algo.py").write_text(ALGORITHM)
+    model = Model()
+    model.method.create("m")
+    model.method.set_program("m", [f"{tmp_path / 'algo.py'}/{function}"])
+    model.method.input_parameter_group("m", ["a", "b"])
+    model.method.output_parameter_group("m", ["s"])
+    model.method.input_parameter("m", [["a"], ["b"]])
+    model.method.output_parameter("m", [["s"]])
+    model.method.input_parameter_data("m", [[3], [4]])
+    model.element.create("E")
+    model.element.parameter_group("E", ["a", "b", "s"])
+    model.element.parameter("E", [["a"], ["b"], ["s"]])
+    model.element.add_model_data_many([["e"]] * 2)
+    for index in range(2):
+        model.element.set_parameter_data_by_id_index(index, "E", "a", [index])
+        model.element.set_parameter_data_by_id_index(index, "E", "b", [10])
+    model.procedure.create("P")
+    model.procedure.relate("P", "E", "m")
+    return model
+
+
+def test_runs_record_phases_and_call_hooks(tmp_path):
+    model = _model(tmp_path)
+    received = []
+    telemetry.add_hook(received.append)
+    try:
+        model.method.run("m")
+        model.procedure.run("P", 1)
+        model.procedure.run_batch("P", [0, 1])
+    finally:
+        telemetry.remove_hook(received.append)
+    model.method.run("m")
+
+    assert [(r.kind, r.id, r.element_index) for r in received] == [("method", "m", None), ("procedure", "P", 1), ("procedure_batch", "P", None)]
+    assert list(telemetry.records)[:3] == received and len(telemetry.records) == 4
+    for record in received:
+        assert set(record.phases) == set(PHASES)
+        assert record.method_name == "add" and record.error is None
+        assert record.total_ns >= sum(record.phases.values()) > 0
+
+    df = telemetry.get_records_df()
+    assert [f"{phase}_ns" for phase in PHASES] == [c for c in df.columns if c.endswith("_ns") and c != "total_ns"]
+    summary = telemetry.get_summary_df()
+    assert summary.loc[("method", "m"), "count"] == 2
+
+
+def test_failed_run_records_error(tmp_path):
+    model = _model(tmp_path, "fail")
+    with pytest.raises(ValueError):
+        model.procedure.run("P", 0)
+    record = telemetry.records[-1]
+    assert record.error == "ValueError: boom"
+    assert "write_back" not in record.phases
+
+
+def test_hook_error_does_not_break_run(tmp_path):
+    def broken(record):
+        raise RuntimeError("hook")
+
+    telemetry.add_hook(broken)
+    try:
+        assert _model(tmp_path).method.run("m") == [7]
+    finally:
+        telemetry.remove_hook(broken)
+    assert len(telemetry.records) == 1
+
+
+def test_measure_size(tmp_path):
+    model = _model(tmp_path)
+    model.method.run("m")
+    assert telemetry.records[-1].input_bytes == 0
+    telemetry.measure_size = True
+    model.method.run("m")
+    assert telemetry.records[-1].input_bytes > 0 and telemetry.records[-1].output_bytes > 0
+
+
+def test_disabled_telemetry_uses_null_trace(tmp_path):
+    collector = Telemetry()
+    collector.enabled = False
+    trace = collector.start("method", "m")
+    assert isinstance(trace, _NullTrace)
+    trace.set(method_name="x")
+    trace.mark("execute")
+    assert trace.finish() is None and len(collector.records) == 0
+
+    telemetry.enabled = False
+    received = []
+    telemetry.add_hook(received.append)
+    try:
+        model = _model(tmp_path)
+        assert model.method.run("m") == [7]
+        assert model.procedure.run_batch("P", [0, 1]) == [[10], [11]]
+    finally:
+        telemetry.remove_hook(received.append)
+    assert received == [] and len(telemetry.records) == 0
+
+
+def test_verbose_off_prints_nothing(tmp_path, capsys):
+    model = _model(tmp_path)
+    model.method.run("m")
+    model.procedure.run("P", 0)
+    model.procedure.run_batch("P", [0, 1])
+    model.procedure.run_all(1)
+    assert capsys.readouterr().out == ""
+
+    telemetry.verbose = True
+    model.procedure.run("P", 0)
+    out = capsys.readouterr().out
+    assert "RunRecord(procedure P" in out and "方法：add" in out
@@ -0,0 +1,38 @@
+import io
+import json
+
+from imkernel.core.model import Model
+
+
+def _build_model():
+    model = Model()
+    model.element.create("整机", description="整机描述")
+    model.element.create("部件", parent_id="整机", description="部件")
+    model.element.parameter_group("部件", ["尺寸"])
+    model.element.parameter("部件", [["长", "宽"]])
+    model.element.add_model_data(["整机0", "部件0"])
+    model.element.add_parameter_data(0, "部件", "尺寸", [1.5, None])
+    model.method.create("计算")
+    model.procedure.create("流程")
+    return model
+
+
+def _baseline(model):
+    return {
+        "element": model.element.to_json(),
+        "method": model.method.to_json(),
+        "procedure": model.procedure.to_json(),
+    }
+
+
+def test_to_json_matches_baseline_output(tmp_path, monkeypatch):
+    model = _build_model()
+    fp = io.StringIO()
+    text = model.to_json(fp=fp)
+    # 返回值与原实现 json.dumps 的结果相同，写入内容为缩进且不转义的格式
+    assert text == json.dumps(_baseline(model))
+    assert fp.getvalue() == json.dumps(_baseline(model), ensure_ascii=False, indent=4)
+
+    monkeypatch.chdir(tmp_path)
+    assert model.to_json(return_string=False) is None
+    assert (tmp_path / "data.json").read_text(encoding="utf-8") == fp.getvalue()
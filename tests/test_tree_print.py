@@ -0,0 +1,71 @@
+import io
+
+import pytest
+
+from imkernel.core.node_base import NodeBase
+from imkernel.core.tree import Tree
+from imkernel.core.tree_base import TreeBase
+
+
+def _recursive_lines(tree, format_type, max_depth=None):
+    # 原递归实现，增加按深度截断
+    def node_lines(node, prefix, is_last, depth):
+        connector = "└── " if is_last else "├── "
+        result = [prefix + connector + f"{tree._format_node(node, format_type)}"]
+        if max_depth is not None and depth >= max_depth:
+            return result
+        prefix += "    " if is_last else "│   "
+        for i, child in enumerate(node.children):
+            result += node_lines(child, prefix, i == len(node.children) - 1, depth + 1)
+        return result
+
+    lines = []
+    for i, root in enumerate(tree.roots.values()):
+        if i > 0:
+            lines.append("")
+        lines.append(f"{tree._format_node(root, format_type)}")
+        if max_depth is not None and max_depth < 1:
+            continue
+        for j, child in enumerate(root.children):
+            lines += node_lines(child, "", j == len(root.children) - 1, 1)
+    return lines
+
+
+def _build(cls):
+    tree = cls()
+    for node_id, parent_id in [("r1", None), ("a", "r1"), ("a1", "a"), ("a2", "a"), ("a21", "a2"), ("b", "r1"),
+                               ("b1", "b"), ("c", "r1"), ("r2", None), ("d", "r2"), ("d1", "d")]:
+        tree.create_node(NodeBase(node_id, f"desc-{node_id}"), parent_id)
+    return tree
+
+
+@pytest.mark.parametrize("cls", [Tree, TreeBase])
+@pytest.mark.parametrize("format_type", ["id", "desc"])
+def test_output_matches_recursive_rendering(cls, format_type):
+    tree = _build(cls)
+    expected = _recursive_lines(tree, format_type)
+    assert tree._print_tree_with_type(format_type) == "".join(line + "\n" for line in expected)
+    assert (tree.print_id() if format_type == "id" else tree.print_desc()).splitlines() == expected
+    for max_depth in (0, 1, 2, 3, 10):
+        assert list(tree.iter_tree_lines(format_type, max_depth=max_depth)) == _recursive_lines(tree, format_type, max_depth)
+
+
+def test_subtree_and_file_output():
+    tree = _build(Tree)
+    assert str(tree) == "r1\n├── a\n│   ├── a1\n│   └── a2\n│       └── a21\n├── b\n│   └── b1\n└── c\n\nr2\n└── d\n    └── d1\n"
+    assert list(tree.iter_tree_lines(root_id="a")) == ["a", "├── a1", "└── a2", "    └── a21"]
+    assert list(tree.iter_tree_lines(root_id="a", max_depth=1)) == ["a", "├── a1", "└── a2"]
+    with pytest.raises(Exception, match="未找到名为x的节点"):
+        list(tree.iter_tree_lines(root_id="x"))
+    file = io.StringIO()
+    tree.write_tree(file, format_type="desc")
+    assert file.getvalue() == tree.print_desc()
+
+
+def test_deep_tree_does_not_recurse():
+    tree = Tree()
+    tree.create_node(NodeBase("0"))
+    for i in range(1, 5000):
+        tree.create_node(NodeBase(str(i)), str(i - 1))
+    lines = tree.print_id().splitlines()
+    assert len(lines) == 5000 and lines[-1] == " " * 4 * 4998 + "└── 4999"